@@ -0,0 +1,267 @@
+import asyncio
+import json
+from urllib.parse import urlparse
+from crawler import fetch_url, extract_data_fast, get_priority, process_page_response
+from robots_cache import RobotsCache
+from fetcher import Fetcher
+from crawl_state import CrawlState, CHECKPOINT_INTERVAL
+from frontier import Frontier, canonicalize_url
+
+# Number of pages fetched concurrently
+DEFAULT_WORKERS = 16
+
+# Minimum delay (in seconds) between two requests to the same host
+DEFAULT_CRAWL_DELAY = 1.0
+
+
+class HostPoliteness:
+    """
+    Per-host politeness scheduler, replacing the global `time.sleep(1)` of `crawler.crawl`.
+
+    Attributes
+    ----------
+    default_delay : float
+        Minimum delay (in seconds) between two requests to a host without a specific delay.
+
+    Implementation Details
+    ----------------------------
+    Each host has the time of its next free request slot. A worker reserves the next slot
+    of the host of its URL (synchronously, so no lock is needed within the event loop) and
+    sleeps until then. Requests to a same host are therefore spaced by its crawl delay, while
+    requests to different hosts run concurrently: throughput grows with the number of hosts.
+    """
+
+    def __init__(self, default_delay=DEFAULT_CRAWL_DELAY):
+        self.default_delay = default_delay
+        self._delays = {}
+        self._next_slot = {}
+
+    def set_delay(self, host, delay):
+        """
+        Sets the crawl delay of a host (e.g. the `Crawl-delay` of its robots.txt).
+
+        Parameters
+        ----------
+        host : str
+            The host (network location) of the URLs.
+        delay : float
+            The minimum delay (in seconds) between two requests to the host.
+        """
+        self._delays[host] = delay
+
+    def reserve(self, host):
+        """
+        Reserves the next request slot of a host.
+
+        Parameters
+        ----------
+        host : str
+            The host (network location) of the URL to fetch.
+
+        Returns
+        -------
+        float
+            The number of seconds to wait before sending the request.
+        """
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self._delays.get(host, self.default_delay)
+        return slot - now
+
+    async def wait(self, host):
+        """
+        Waits for the next request slot of a host.
+
+        Parameters
+        ----------
+        host : str
+            The host (network location) of the URL to fetch.
+        """
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def async_crawl(seed_url, max_pages=50, workers=DEFAULT_WORKERS, crawl_delay=DEFAULT_CRAWL_DELAY,
+                      output_file="output.json", state_file=None, on_page=None):
+    """
+    Asynchronous crawler fetching pages concurrently with per-host politeness.
+
+    Attributes
+    ----------
+    seed_url : str
+        Starting URL from which to begin the crawl.
+    max_pages : int, optional
+        Maximum number of pages to explore. Default is 50 pages.
+    workers : int, optional
+        Number of pages fetched concurrently. Default is 16.
+    crawl_delay : float, optional
+        Minimum delay (in seconds) between two requests to the same host. Default is 1 second.
+    output_file : str | None, optional
+        JSON file where the collected information is saved at the end of the crawl. Default is
+        "output.json", None to skip saving. With a ".jsonl" extension, each page is written as
+        a JSON line as soon as it is crawled instead.
+    state_file : str, optional
+        JSON file where the crawl state is persisted, to resume interrupted crawls and skip
+        unchanged pages (see `crawler.crawl`). Default is None.
+    on_page : coroutine function, optional
+        Awaited with the data of each crawled page, e.g. to index pages while the crawl goes on
+        (see `streaming_index.py`). Default is None.
+
+    Returns
+    --------
+    list
+        The data extracted from each page (see `crawler.extract_data`), in crawl order.
+
+    Implementation Details
+    ----------------------------
+    The frontier is a `Frontier` ordered by `get_priority`, as in `crawler.crawl`, which
+    canonicalizes URLs and queues each page only once. A bounded pool of worker tasks takes
+    URLs from it, waiting while it is empty and other workers may still add links. The
+    blocking robots.txt download and `fetch_url` calls run in threads, so that a slow page
+    does not stall the other workers, and `HostPoliteness` spaces the requests to each host
+    instead of sleeping after every page. All the workers share a `RobotsCache`: robots.txt
+    is downloaded once per host, and its `Crawl-delay` (when larger than `crawl_delay`) sets
+    the delay of the host. They also share a `Fetcher`, whose pool keeps the connections to
+    each host open between pages.
+    The crawl ends when the frontier is empty and no page is being fetched, or when
+    `max_pages` pages have been collected.
+    """
+    politeness = HostPoliteness(crawl_delay)
+    fetcher = Fetcher()
+    robots_cache = RobotsCache(fetcher=fetcher)
+    to_visit = Frontier()
+
+    crawl_state = CrawlState.load(state_file) if state_file else None
+    if crawl_state is not None:
+        crawl_state.start(seed_url)
+        data_collected = crawl_state.collected_data()
+        for url in crawl_state.visited:
+            to_visit.mark_seen(url)
+        crawl_state.frontier = {canonicalize_url(url): priority for url, priority in crawl_state.frontier.items()}
+        for url, priority in crawl_state.frontier.items():
+            to_visit.push(url, priority)
+    else:
+        data_collected = []
+        to_visit.push(seed_url, 0)  # High priority for the first page
+    budget = {"pages": len(data_collected), "in_flight": 0}  # Pages collected or being fetched
+    frontier_changed = asyncio.Condition()
+
+    stream = open(output_file, "w", encoding="utf-8") if output_file and output_file.endswith(".jsonl") else None
+
+    async def emit(extracted_data):
+        if stream is not None:
+            stream.write(json.dumps(extracted_data, ensure_ascii=False) + "\n")
+            stream.flush()
+        if on_page is not None:
+            await on_page(extracted_data)
+
+    for extracted_data in data_collected:  # Pages collected before resuming the crawl
+        await emit(extracted_data)
+
+    def done_with(url):
+        if crawl_state is not None:
+            crawl_state.frontier.pop(url, None)
+
+    async def next_url():
+        """
+        Takes the next URL of the frontier, waiting while it is empty but other workers may still
+        add links. Returns None when the crawl is over.
+        """
+        async with frontier_changed:
+            while to_visit.empty() and budget["in_flight"] > 0:
+                await frontier_changed.wait()
+            if to_visit.empty() or budget["pages"] >= max_pages:
+                frontier_changed.notify_all()
+                return None
+            budget["in_flight"] += 1
+            budget["pages"] += 1
+            return to_visit.pop()[1]
+
+    async def crawl_url(url):
+        host = urlparse(url).netloc
+        if not robots_cache.is_cached(url):
+            await politeness.wait(host)
+            await asyncio.to_thread(robots_cache.get_parser, url)
+            host_delay = robots_cache.crawl_delay(url)
+            if host_delay is not None and host_delay > crawl_delay:
+                politeness.set_delay(host, host_delay)
+        if not robots_cache.can_fetch(url):
+            budget["pages"] -= 1
+            done_with(url)
+            return
+
+        print(f"Crawling: {url}")
+        await politeness.wait(host)
+        if crawl_state is not None:
+            headers = crawl_state.conditional_headers(url)
+            response = await asyncio.to_thread(fetcher.fetch, url, headers)
+            extracted_data = process_page_response(url, response, crawl_state)
+            done_with(url)
+        else:
+            html = await asyncio.to_thread(fetch_url, url, fetcher)
+            extracted_data = extract_data_fast(html, url) if html else None
+        if not extracted_data:
+            budget["pages"] -= 1
+            return
+
+        data_collected.append(extracted_data)
+
+        # Add new links with appropriate priority (already seen links are ignored by the frontier)
+        for link in extracted_data["links"]:
+            priority = get_priority(link)
+            queued_url = to_visit.push(link, priority)
+            if queued_url is not None and crawl_state is not None:
+                crawl_state.frontier[queued_url] = priority
+
+        if crawl_state is not None:
+            crawl_state.visited[url] = True
+            if len(crawl_state.visited) % CHECKPOINT_INTERVAL == 0:
+                crawl_state.save(state_file)
+
+        await emit(extracted_data)
+
+    async def worker():
+        while True:
+            url = await next_url()
+            if url is None:
+                return
+            try:
+                await crawl_url(url)
+            except Exception as e:
+                print(f"Error while crawling {url}: {e}")
+            finally:
+                async with frontier_changed:
+                    budget["in_flight"] -= 1
+                    frontier_changed.notify_all()
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    fetcher.close()
+    to_visit.close()
+
+    if crawl_state is not None:
+        crawl_state.complete = True
+        crawl_state.save(state_file)
+        print(f"{crawl_state.changed_pages} new or modified pages.")
+
+    # Save results to a JSON file
+    if stream is not None:
+        stream.close()
+    elif output_file:
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(data_collected, f, indent=4, ensure_ascii=False)
+
+    print(f"Crawl completed. {len(data_collected)} pages explored.")
+    return data_collected
+
+
+def crawl_async(seed_url, max_pages=50, workers=DEFAULT_WORKERS, crawl_delay=DEFAULT_CRAWL_DELAY,
+                output_file="output.json", state_file=None, on_page=None):
+    """
+    Runs `async_crawl` from synchronous code (same parameters and return value).
+    """
+    return asyncio.run(async_crawl(seed_url, max_pages, workers, crawl_delay, output_file, state_file, on_page))
+
+
+if __name__ == "__main__":
+    crawl_async("https://web-scraping.dev/products")
@@ -0,0 +1,275 @@
+import argparse
+import html
+import json
+import random
+import threading
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from async_crawler import crawl_async, DEFAULT_WORKERS
+from benchmark_extraction import time_extractor
+from crawler import extract_data_fast, get_priority
+from frontier import Frontier
+
+CATEGORIES = ["apparel", "consumables", "household"]
+VARIANTS = ["small", "medium", "large", "blue", "red", "one", "six-pack"]
+PRODUCTS_PER_PAGE = 5
+
+ROBOTS_TXT = "User-agent: *\nDisallow: /cart\nDisallow: /login\n"
+
+
+class SyntheticSite:
+    """
+    Generated website shaped like web-scraping.dev, served locally to benchmark the crawler offline.
+
+    Attributes
+    ----------
+    products : int
+        Number of products (each with up to 3 variants).
+    latency : float
+        Delay (in seconds) added before each response.
+    error_rate : float
+        Fraction of the page requests answered with a 500 error.
+    seed : int
+        Seed of the generated catalog and of the errors, so that runs are comparable.
+
+    Implementation Details
+    ----------------------------
+    The site has a home page, product listings paginated by 5 products (`/products?page=N`,
+    also per category), product pages (`/product/N`) and variant pages
+    (`/product/N?variant=V`) linking to each other, and a robots.txt forbidding `/cart` and
+    `/login`, which every page links to. The server runs in a background thread on a free port
+    of 127.0.0.1, and counts the requests, errors and bytes sent.
+    """
+
+    def __init__(self, products=100, latency=0.0, error_rate=0.0, seed=0):
+        self.products = products
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        catalog_random = random.Random(seed)
+        self.categories = {i: catalog_random.choice(CATEGORIES) for i in range(1, products + 1)}
+        self.variants = {i: catalog_random.sample(VARIANTS, catalog_random.randint(0, 3)) for i in range(1, products + 1)}
+        self._errors_random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        """
+        Starts the server in a background thread, and returns the URL of the site.
+        """
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, as the Fetcher expects
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, content_type, body = site.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """
+        Stops the server.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def respond(self, path):
+        """
+        Returns the status, content type and body of the response to a request path.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.requests += 1
+            failed = path != "/robots.txt" and self._errors_random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        if path == "/robots.txt":
+            status, content_type, body = 200, "text/plain", ROBOTS_TXT
+        elif failed:
+            status, content_type, body = 500, "text/html; charset=utf-8", "<html><body><p>Server error</p></body></html>"
+        else:
+            page = self.render_page(path)
+            if page is None:
+                status, content_type, body = 404, "text/html; charset=utf-8", "<html><body><p>Not found</p></body></html>"
+            else:
+                status, content_type, body = 200, "text/html; charset=utf-8", page
+
+        body = body.encode("utf-8")
+        with self._lock:
+            self.bytes_sent += len(body)
+        return status, content_type, body
+
+    def _page(self, title, paragraph, links):
+        navigation = ["/", "/products", "/reviews", "/cart", "/login"]
+        anchors = "".join(f'<li><a href="{html.escape(link)}">{html.escape(link)}</a></li>' for link in navigation + links)
+        return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>"
+                f"<body><nav><ul>{anchors}</ul></nav><h3>{html.escape(title)}</h3>"
+                f"<p>{html.escape(paragraph)}</p><footer><p>web-scraping.dev synthetic copy</p></footer></body></html>")
+
+    def _listing(self, category, page):
+        products = [i for i in range(1, self.products + 1) if category is None or self.categories[i] == category]
+        pages = max(1, -(-len(products) // PRODUCTS_PER_PAGE))
+        if page < 1 or page > pages:
+            return None
+        prefix = f"/products?category={category}&" if category else "/products?"
+        links = [f"/products?category={name}" for name in CATEGORIES]
+        links += [f"/product/{i}" for i in products[(page - 1) * PRODUCTS_PER_PAGE:page * PRODUCTS_PER_PAGE]]
+        links += [f"{prefix}page={number}" for number in range(max(1, page - 2), min(pages, page + 2) + 1)]
+        return self._page(f"web-scraping.dev product page {page}", "", links)
+
+    def render_page(self, path):
+        """
+        Returns the HTML of a page of the site, or None if it does not exist.
+        """
+        parsed_path = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(parsed_path.query).items()}
+
+        if parsed_path.path == "/":
+            return self._page("web-scraping.dev", "Practice web scraping on this mock e-commerce website.",
+                              ["/products", "/product/1"])
+        if parsed_path.path in ("/reviews", "/cart", "/login"):
+            return self._page(parsed_path.path.strip("/").capitalize(), "Nothing to see here.", [])
+        if parsed_path.path == "/products":
+            if query.get("category") not in (None, *CATEGORIES) or not query.get("page", "1").isdigit():
+                return None
+            return self._listing(query.get("category"), int(query.get("page", "1")))
+        if parsed_path.path.startswith("/product/"):
+            product_id = parsed_path.path[len("/product/"):]
+            if not product_id.isdigit() or not 1 <= int(product_id) <= self.products:
+                return None
+            product_id = int(product_id)
+            variant = query.get("variant")
+            if variant is not None and variant not in self.variants[product_id]:
+                return None
+            related = [1 + (product_id * 7 + k) % self.products for k in range(1, 4)]
+            links = [f"/product/{product_id}?variant={name}" for name in self.variants[product_id]]
+            links += [f"/product/{i}" for i in related] + [f"/products?category={self.categories[product_id]}"]
+            title = f"Product {product_id}" + (f" ({variant})" if variant else "")
+            paragraph = (f"Product {product_id} is one of our best {self.categories[product_id]} items, "
+                         f"loved by customers for its quality and value.")
+            return self._page(title, paragraph, links)
+        return None
+
+
+def measure_frontier_memory(urls):
+    """
+    Measures the memory used by a `Frontier` holding URLs.
+
+    Parameters
+    ----------
+    urls : list
+        The URLs to push, e.g. all the links discovered by the crawl.
+
+    Returns
+    -------
+    dict
+        The number of distinct URLs queued and the memory (in bytes) allocated by the frontier.
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    frontier = Frontier()
+    queued = sum(frontier.push(url, get_priority(url)) is not None for url in urls)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frontier.close()
+    return {"frontier_urls": queued, "frontier_bytes": current - start}
+
+
+def run_benchmark(products=100, max_pages=200, workers=DEFAULT_WORKERS, crawl_delay=0.0, latency=0.01,
+                  error_rate=0.0, seed=0):
+    """
+    Crawls a local synthetic site and measures the throughput of the crawler.
+
+    Parameters
+    ----------
+    products : int, optional
+        Number of products of the site (default is 100).
+    max_pages : int, optional
+        Maximum number of pages to crawl (default is 200).
+    workers : int, optional
+        Number of pages fetched concurrently (default is 16).
+    crawl_delay : float, optional
+        Politeness delay (in seconds) between two requests to the site (default is 0).
+    latency : float, optional
+        Delay (in seconds) of each response of the site (default is 0.01).
+    error_rate : float, optional
+        Fraction of the pages answered with a 500 error (default is 0).
+    seed : int, optional
+        Seed of the generated site (default is 0).
+
+    Returns
+    -------
+    dict
+        The pages crawled, requests and errors served, pages and bytes per second, mean parse
+        time per page (in milliseconds) and frontier memory for the discovered links.
+    """
+    site = SyntheticSite(products, latency, error_rate, seed)
+    seed_url = site.start()
+    try:
+        start = time.perf_counter()
+        data = crawl_async(f"{seed_url}/products", max_pages=max_pages, workers=workers, crawl_delay=crawl_delay,
+                           output_file=None)
+        elapsed = time.perf_counter() - start
+
+        # Parse time is measured on the crawled pages, without the network
+        pages = []
+        for page in data[:50]:
+            html_page = site.render_page(page["url"][len(seed_url):] or "/")
+            if html_page:
+                pages.append((html_page, page["url"]))
+        parse_ms = time_extractor(extract_data_fast, pages) if pages else 0.0
+    finally:
+        site.stop()
+
+    results = {
+        "pages": len(data),
+        "requests": site.requests,
+        "errors": site.errors,
+        "seconds": elapsed,
+        "pages_per_second": len(data) / elapsed,
+        "bytes_per_second": site.bytes_sent / elapsed,
+        "parse_ms_per_page": parse_ms
+    }
+    results.update(measure_frontier_memory([link for page in data for link in page["links"]]))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against a local synthetic site.")
+    parser.add_argument("--products", type=int, default=100, help="number of products of the site")
+    parser.add_argument("--max-pages", type=int, default=200, help="maximum number of pages to crawl")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="number of concurrent workers")
+    parser.add_argument("--crawl-delay", type=float, default=0.0, help="politeness delay in seconds")
+    parser.add_argument("--latency", type=float, default=0.01, help="response latency of the site in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of pages answered with a 500 error")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated site")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.products, args.max_pages, args.workers, args.crawl_delay, args.latency,
+                            args.error_rate, args.seed)
+    print(json.dumps(results, indent=4))
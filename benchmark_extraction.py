@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import time
+from crawler import extract_data, extract_data_fast, fetch_url
+
+# Directory of the saved pages, and file mapping each saved page to its URL
+PAGES_FOLDER = "saved_pages"
+PAGES_INDEX_FILE = "pages.json"
+
+
+def save_pages(urls, folder=PAGES_FOLDER):
+    """
+    Downloads pages and saves their HTML, to benchmark the extractors offline.
+
+    Parameters
+    ----------
+    urls : list
+        The URLs of the pages to save.
+    folder : str, optional
+        The directory where the pages are saved (default is 'saved_pages').
+    """
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    pages = {}
+    for i, url in enumerate(urls):
+        html = fetch_url(url)
+        if html:
+            filename = f"page_{i}.html"
+            with open(os.path.join(folder, filename), "w", encoding="utf-8") as file:
+                file.write(html)
+            pages[filename] = url
+
+    with open(os.path.join(folder, PAGES_INDEX_FILE), "w", encoding="utf-8") as file:
+        json.dump(pages, file, indent=4)
+
+
+def load_pages(folder=PAGES_FOLDER):
+    """
+    Loads the pages saved with `save_pages`.
+
+    Parameters
+    ----------
+    folder : str, optional
+        The directory of the saved pages (default is 'saved_pages').
+
+    Returns
+    -------
+    list
+        A list of tuples (html, url).
+    """
+    with open(os.path.join(folder, PAGES_INDEX_FILE), "r", encoding="utf-8") as file:
+        pages = json.load(file)
+
+    loaded = []
+    for filename, url in pages.items():
+        with open(os.path.join(folder, filename), "r", encoding="utf-8") as file:
+            loaded.append((file.read(), url))
+    return loaded
+
+
+def time_extractor(extractor, pages, repeat=5):
+    """
+    Measures the mean time taken by an extractor to parse a page.
+
+    Parameters
+    ----------
+    extractor : callable
+        The extraction function (`extract_data` or `extract_data_fast`).
+    pages : list
+        A list of tuples (html, url).
+    repeat : int, optional
+        The number of passes over the pages (default is 5).
+
+    Returns
+    -------
+    float
+        The mean parse time per page, in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html, url in pages:
+            extractor(html, url)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+
+def run_benchmark(pages, repeat=5):
+    """
+    Checks that both extractors return the same data, and compares their parse time per page.
+
+    Parameters
+    ----------
+    pages : list
+        A list of tuples (html, url).
+    repeat : int, optional
+        The number of passes over the pages (default is 5).
+
+    Returns
+    -------
+    dict
+        The number of pages, the number of pages with different outputs, and the mean parse
+        time per page (in milliseconds) of each extractor.
+    """
+    mismatches = [url for html, url in pages if extract_data(html, url) != extract_data_fast(html, url)]
+    for url in mismatches:
+        print(f"Different output for {url}")
+
+    results = {
+        "pages": len(pages),
+        "mismatches": len(mismatches),
+        "beautifulsoup_ms_per_page": time_extractor(extract_data, pages, repeat),
+        "fast_ms_per_page": time_extractor(extract_data_fast, pages, repeat)
+    }
+    results["speedup"] = results["beautifulsoup_ms_per_page"] / results["fast_ms_per_page"]
+    return results
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else PAGES_FOLDER
+    if not os.path.exists(os.path.join(folder, PAGES_INDEX_FILE)):
+        print(f"No saved pages in {folder}, downloading product pages first.")
+        save_pages([f"https://web-scraping.dev/product/{i}" for i in range(1, 11)], folder)
+
+    results = run_benchmark(load_pages(folder))
+    print(json.dumps(results, indent=4))
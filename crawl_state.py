@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+
+# Default file of the persistent crawl state
+CRAWL_STATE_FILE = "crawl_state.json"
+
+# Number of pages crawled between two saves of the crawl state
+CHECKPOINT_INTERVAL = 10
+
+
+def pages_log_file(filename):
+    """
+    Returns the path of the log of extracted page data kept next to a state file
+    ('crawl_state.json' -> 'crawl_state_pages.jsonl').
+    """
+    return os.path.splitext(filename)[0] + "_pages.jsonl"
+
+
+def content_hash(body):
+    """
+    Returns the SHA-256 hash of a page body.
+
+    Parameters
+    ----------
+    body : bytes
+        The (decompressed) body of the page.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest of the body.
+    """
+    return hashlib.sha256(body).hexdigest()
+
+
+class CrawlState:
+    """
+    Persistent state of a crawl, used to resume it after an interruption and to re-crawl incrementally.
+
+    Attributes
+    ----------
+    frontier : dict
+        URLs waiting to be crawled, mapped to their priority (see `crawler.get_priority`).
+    visited : dict
+        URLs crawled during the current crawl, in crawl order (the values are unused).
+    pages : dict
+        For each page ever crawled, its validators ('etag', 'last_modified'), the hash of its
+        body ('content_hash') and the data extracted from it ('data').
+    changed_pages : int
+        Number of pages that are new or were modified during the current crawl.
+    complete : bool
+        False while a crawl is running, True once it has finished.
+
+    Implementation Details
+    ----------------------------
+    The state is split in two files, so that a checkpoint does not rewrite all the data
+    collected so far:
+    - the extracted data of the pages is appended to a JSON lines log (see `pages_log_file`),
+      one line per new or modified page, when the state is saved,
+    - the frontier, the visited set and the validators are then saved to a JSON file, through
+      a temporary file renamed over the previous one, so a crash never leaves a truncated
+      state, and the saved state never refers to data missing from the log.
+    Loading the state replays the log, the last line of a page winning. The log is compacted
+    (one line per page) when a new crawl starts. If the last crawl did not finish, `start`
+    resumes it from its frontier and visited set; otherwise a new crawl starts from the seed,
+    keeping the validators and hashes of the known pages so that unchanged pages are neither
+    downloaded again (304 Not Modified) nor re-extracted (identical hash).
+    """
+
+    def __init__(self, filename=CRAWL_STATE_FILE):
+        self.filename = filename
+        self.frontier = {}
+        self.visited = {}
+        self.pages = {}
+        self.changed_pages = 0
+        self.complete = True
+        self._pending = []  # URLs whose new data is not in the log yet
+
+    @classmethod
+    def load(cls, filename=CRAWL_STATE_FILE):
+        """
+        Loads a crawl state saved with `CrawlState.save`.
+
+        Parameters
+        ----------
+        filename : str, optional
+            The path to the state file (default is 'crawl_state.json').
+
+        Returns
+        -------
+        CrawlState
+            The loaded state, or a new empty state if the file does not exist or cannot be read.
+        """
+        state = cls(filename)
+        if not os.path.exists(filename):
+            return state
+
+        try:
+            with open(filename, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            state.frontier = data.get("frontier", {})
+            state.visited = dict.fromkeys(data.get("visited", []), True)
+            state.pages = data.get("pages", {})
+            # States saved before the log existed hold the page data, moved to the log on the next save
+            state._pending = [url for url, page in state.pages.items() if "data" in page]
+            state.changed_pages = data.get("changed_pages", 0)
+            state.complete = data.get("complete", True)
+        except Exception as e:
+            print(f"Error reading crawl state {filename}: {e}")
+            return state
+
+        log_file = pages_log_file(filename)
+        if os.path.exists(log_file):
+            with open(log_file, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Line cut by a crash while it was appended
+                    page = state.pages.setdefault(record["url"], {})
+                    page["content_hash"] = record["content_hash"]
+                    page["data"] = record["data"]
+        return state
+
+    def save(self, filename=None):
+        """
+        Appends the new page data to the log, then saves the rest of the crawl state atomically.
+
+        Parameters
+        ----------
+        filename : str, optional
+            The path to the state file (default is the file the state was loaded from).
+        """
+        filename = filename or self.filename
+        temporary_file = filename + ".tmp"
+        try:
+            if self._pending:
+                with open(pages_log_file(filename), "a", encoding="utf-8") as file:
+                    for url in self._pending:
+                        page = self.pages[url]
+                        file.write(json.dumps({"url": url, "content_hash": page["content_hash"], "data": page["data"]},
+                                              ensure_ascii=False) + "\n")
+                self._pending = []
+
+            validators = {
+                url: {"etag": page.get("etag"), "last_modified": page.get("last_modified")}
+                for url, page in self.pages.items()
+            }
+            with open(temporary_file, "w", encoding="utf-8") as file:
+                json.dump({
+                    "complete": self.complete,
+                    "frontier": self.frontier,
+                    "visited": list(self.visited),
+                    "changed_pages": self.changed_pages,
+                    "pages": validators
+                }, file, ensure_ascii=False)
+            os.replace(temporary_file, filename)
+        except Exception as e:
+            print(f"Error saving crawl state to {filename}: {e}")
+
+    def _compact_log(self):
+        """
+        Rewrites the log of page data with a single line per page.
+        """
+        log_file = pages_log_file(self.filename)
+        if not os.path.exists(log_file):
+            return
+        temporary_file = log_file + ".tmp"
+        try:
+            with open(temporary_file, "w", encoding="utf-8") as file:
+                for url, page in self.pages.items():
+                    if "data" in page:
+                        file.write(json.dumps({"url": url, "content_hash": page.get("content_hash"), "data": page["data"]},
+                                              ensure_ascii=False) + "\n")
+            os.replace(temporary_file, log_file)
+        except Exception as e:
+            print(f"Error compacting {log_file}: {e}")
+
+    def start(self, seed_url):
+        """
+        Starts a new crawl from the seed URL, or resumes the previous one if it did not finish.
+
+        Parameters
+        ----------
+        seed_url : str
+            Starting URL of the crawl.
+
+        Returns
+        -------
+        bool
+            True if an interrupted crawl is resumed, False if a new crawl starts.
+        """
+        if not self.complete and self.frontier:
+            print(f"Resuming crawl: {len(self.visited)} pages visited, {len(self.frontier)} in the frontier.")
+            return True
+
+        self._compact_log()
+        self.frontier = {seed_url: 0}
+        self.visited = {}
+        self.changed_pages = 0
+        self.complete = False
+        return False
+
+    def collected_data(self):
+        """
+        Returns the data extracted from the pages visited during the current crawl, in crawl order.
+        """
+        return [self.pages[url]["data"] for url in self.visited if url in self.pages]
+
+    def conditional_headers(self, url):
+        """
+        Returns the conditional request headers of a known page.
+
+        Parameters
+        ----------
+        url : str
+            URL of the page.
+
+        Returns
+        -------
+        dict
+            'If-None-Match' and/or 'If-Modified-Since' headers, empty for an unknown page.
+        """
+        page = self.pages.get(url, {})
+        headers = {}
+        if page.get("etag"):
+            headers["If-None-Match"] = page["etag"]
+        if page.get("last_modified"):
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def record_page(self, url, headers, body_hash, data):
+        """
+        Records a downloaded page, and whether it changed since the previous crawl.
+
+        Parameters
+        ----------
+        url : str
+            URL of the page.
+        headers : dict
+            Response headers (lowercase names), used for the 'etag' and 'last-modified' validators.
+        body_hash : str
+            Hash of the page body (see `content_hash`).
+        data : dict | None
+            Data extracted from the page, or None if it is unchanged (the stored data is kept).
+
+        Returns
+        -------
+        dict
+            The data extracted from the page (new or stored).
+        """
+        page = self.pages.setdefault(url, {})
+        page["etag"] = headers.get("etag", page.get("etag"))
+        page["last_modified"] = headers.get("last-modified", page.get("last_modified"))
+        if data is not None:
+            page["content_hash"] = body_hash
+            page["data"] = data
+            self.changed_pages += 1
+            self._pending.append(url)
+        return page["data"]
+
+    def is_unchanged(self, url, body_hash):
+        """
+        Returns True if the page was already crawled with the same content hash.
+        """
+        page = self.pages.get(url)
+        return page is not None and "data" in page and page.get("content_hash") == body_hash
@@ -1,14 +1,18 @@
 import time
 import json
-import queue
 import urllib
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 from urllib.parse import urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 from urllib.error import URLError, HTTPError
+from robots_cache import RobotsCache
+from fetcher import Fetcher
+from crawl_state import CrawlState, CHECKPOINT_INTERVAL, content_hash
+from frontier import Frontier, canonicalize_url
 
 
-def can_fetch(url, user_agent="CrawlerIndexationWeb/1.0"):
+def can_fetch(url, user_agent="CrawlerIndexationWeb/1.0", robots_cache=None):
     """
     Checks if the site allows crawling by reading the robots.txt file.
 
@@ -18,6 +22,9 @@ def can_fetch(url, user_agent="CrawlerIndexationWeb/1.0"):
         URL of the page to be crawled.
     user_agent : str, optional
         User-Agent used for the HTTP request. Default is "CrawlerIndexationWeb/1.0".
+    robots_cache : RobotsCache, optional
+        Cache of the robots.txt rules of each host. Default is None (robots.txt is downloaded
+        for every call).
 
     Returns
     --------
@@ -27,8 +34,12 @@ def can_fetch(url, user_agent="CrawlerIndexationWeb/1.0"):
     Implementation Details
     ----------------------------
     The function uses the `RobotFileParser` class to read the site's `robots.txt`
-    file and check if crawling is allowed for the specified URL.
+    file and check if crawling is allowed for the specified URL. With a `RobotsCache`,
+    `robots.txt` is only downloaded once per host and the check is an in-memory lookup.
     """
+    if robots_cache is not None:
+        return robots_cache.can_fetch(url)
+
     parsed_url = urlparse(url)
     robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
 
@@ -42,7 +53,7 @@ def can_fetch(url, user_agent="CrawlerIndexationWeb/1.0"):
         return False
 
 
-def fetch_url(url):
+def fetch_url(url, fetcher=None):
     """
     Makes HTTP requests and retrieves the HTML of a page.
 
@@ -50,6 +61,9 @@ def fetch_url(url):
     ----------
     url : str
         URL of the page to retrieve.
+    fetcher : Fetcher, optional
+        HTTP client with pooled keep-alive connections and compression. Default is None
+        (a new `urllib` connection is opened for the page).
 
     Returns
     --------
@@ -61,13 +75,19 @@ def fetch_url(url):
     ----------------------------
     The function makes an HTTP request to the specified URL using the
     `urllib` library. It handles HTTP and connection errors and
-    returns the HTML content of the page.
+    returns the HTML content of the page. With a `Fetcher`, the connection
+    to the host is reused, the page is downloaded compressed and decoded
+    using the charset of the response.
     """
+    if fetcher is not None:
+        return fetcher.fetch_text(url)
+
     try:
         headers = {"User-Agent": "CrawlerIndexationWeb/1.0"}
         req = urllib.request.Request(url, headers=headers)
         with urllib.request.urlopen(req) as response:
-            return response.read().decode('utf-8')
+            charset = response.headers.get_content_charset() or 'utf-8'
+            return response.read().decode(charset, errors='replace')
     except HTTPError as e:
         print(f"HTTP Error {e.code} while requesting {url}")
     except URLError as e:
@@ -146,6 +166,224 @@ def extract_data(html, base_url):
     }
 
 
+# Tags without content, which the BeautifulSoup tree builder never leaves open
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+                 "menuitem", "meta", "param", "source", "spacer", "track", "wbr", "basefont", "bgsound",
+                 "command", "frame", "image", "isindex", "nextid"}
+
+
+class _FastPageParser(HTMLParser):
+    """
+    Streaming HTML parser collecting only what `extract_data` needs, without building a tree.
+
+    Implementation Details
+    ----------------------------
+    The parser keeps the stack of open tags, closing them as the BeautifulSoup tree builder
+    does (an end tag closes everything up to the last open tag of the same name, unknown end
+    tags are ignored), so that the text of the first `<title>`, `<h1>` and `<p>` is the same as
+    their `get_text()`. Text inside `<script>` and `<style>` is ignored, as `get_text()` does.
+    Links are resolved and filtered on the fly, with the host of the page parsed only once.
+    The kinds of nodes directly inside the first `<title>` are recorded in `title_nodes`
+    (adjacent text merged into one node, as in the tree), because BeautifulSoup's `.string`
+    is only the text of the title when the title holds a single text node.
+    """
+
+    def __init__(self, base_url, dedupe_links=False):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.base_netloc = urlparse(base_url).netloc
+        self.dedupe_links = dedupe_links
+        self.stack = []
+        self.captures = {}  # Tag name -> [depth of the tag, collected text, closed]
+        self.title_nodes = []  # "text" or "markup" (tag or comment), for each node inside <title>
+        self.og_title = None
+        self.links = []
+        self.seen_links = set()
+
+    def _add_title_node(self, kind):
+        if "title" in self.captures and not self.captures["title"][2]:
+            if kind == "markup" or self.title_nodes[-1:] != ["text"]:
+                self.title_nodes.append(kind)
+
+    def handle_starttag(self, tag, attrs):
+        self._add_title_node("markup")
+
+        if tag == "meta" and self.og_title is None:
+            attributes = dict(attrs)
+            if attributes.get("property") == "og:title":
+                self.og_title = attributes.get("content") or ""
+        elif tag == "a":
+            href = dict(attrs).get("href", False)
+            if href is not False:
+                href = href or ""
+                full_url = urljoin(self.base_url, href)
+                if urlparse(full_url).netloc == self.base_netloc:
+                    if not self.dedupe_links:
+                        self.links.append(full_url)
+                    elif full_url not in self.seen_links:
+                        self.seen_links.add(full_url)
+                        self.links.append(full_url)
+
+        if tag in VOID_ELEMENTS:
+            return
+        if tag in ("title", "h1", "p") and tag not in self.captures:
+            self.captures[tag] = [len(self.stack), [], False]
+        self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return
+        while self.stack:
+            if self.stack.pop() == tag:
+                break
+        for capture in self.captures.values():
+            if not capture[2] and len(self.stack) <= capture[0]:
+                capture[2] = True
+
+    def handle_data(self, data):
+        if self.stack and self.stack[-1] in ("script", "style"):
+            return
+        self._add_title_node("text")
+        for capture in self.captures.values():
+            if not capture[2]:
+                capture[1].append(data)
+
+    def handle_comment(self, data):
+        self._add_title_node("markup")
+
+    def text(self, tag):
+        capture = self.captures.get(tag)
+        return "".join(capture[1]) if capture else None
+
+
+def extract_data_fast(html, base_url, dedupe_links=False):
+    """
+    Fast version of `extract_data`, returning the same result without building a BeautifulSoup tree.
+
+    Attributes
+    ----------
+    html : str
+        HTML content of the page to analyze.
+    base_url : str
+        Base URL of the page (used to resolve relative links).
+    dedupe_links : bool, optional
+        If True, each internal link is only returned once (in order of first appearance).
+        Default is False, to return exactly the same links as `extract_data`.
+
+    Returns
+    --------
+    dict
+        The same dictionary as `extract_data`: "title", "url", "first_paragraph" and "links".
+
+    Implementation Details
+    ----------------------------
+    The page is read once by a streaming `HTMLParser` that only records the text of the first
+    `<title>`, `<h1>` and `<p>` tags, the `og:title` meta tag and the links. The title priority
+    is the same as in `extract_data`. Pages whose `<title>` is empty or contains markup or
+    comments, where BeautifulSoup's `.string` behaves differently, are handed over to `extract_data`.
+    """
+    parser = _FastPageParser(base_url, dedupe_links)
+    parser.feed(html)
+    parser.close()
+
+    title = None
+    if "title" in parser.captures:
+        if parser.title_nodes != ["text"]:  # Empty title, or markup or comments in the title
+            data = extract_data(html, base_url)
+            if dedupe_links:
+                data["links"] = list(dict.fromkeys(data["links"]))
+            return data
+        title = parser.text("title").strip()
+
+    if not title and parser.text("h1") is not None:
+        title = parser.text("h1").strip()
+
+    if not title and parser.og_title:
+        title = parser.og_title.strip()
+
+    if not title:
+        title = "No title"
+
+    first_paragraph = parser.text("p").strip() if parser.text("p") is not None else ""
+
+    return {
+        "title": title,
+        "url": base_url,
+        "first_paragraph": first_paragraph,
+        "links": parser.links
+    }
+
+
+def fetch_page(url, fetcher, crawl_state):
+    """
+    Downloads and extracts a page, skipping the work if it did not change since the last crawl.
+
+    Attributes
+    ----------
+    url : str
+        URL of the page to retrieve.
+    fetcher : Fetcher
+        HTTP client used to download the page.
+    crawl_state : CrawlState
+        Persistent crawl state holding the validators and content hash of known pages.
+
+    Returns
+    --------
+    dict | None
+        The data extracted from the page (see `extract_data`), or None if the request fails.
+
+    Implementation Details
+    ----------------------------
+    The request is conditional (`If-None-Match` / `If-Modified-Since`) for pages seen in a
+    previous crawl, and the response is handled by `process_page_response`.
+    """
+    response = fetcher.fetch(url, headers=crawl_state.conditional_headers(url))
+    return process_page_response(url, response, crawl_state)
+
+
+def process_page_response(url, response, crawl_state):
+    """
+    Extracts the data of a downloaded page and records it in the crawl state.
+
+    Attributes
+    ----------
+    url : str
+        URL of the page.
+    response : FetchResponse | None
+        Response to the (conditional) request of the page.
+    crawl_state : CrawlState
+        Persistent crawl state holding the validators and content hash of known pages.
+
+    Returns
+    --------
+    dict | None
+        The data extracted from the page (see `extract_data`), or None if the request failed.
+
+    Implementation Details
+    ----------------------------
+    On a `304 Not Modified` answer, or if the downloaded body has the same hash as before,
+    the stored data is returned without parsing the page again. Otherwise the page is
+    extracted and recorded as changed in the crawl state.
+    """
+    if response is None:
+        return None
+    if response.status == 304 and url in crawl_state.pages:
+        return crawl_state.record_page(url, response.headers, None, None)
+    if response.status != 200:
+        print(f"HTTP Error {response.status} while requesting {url}")
+        return None
+
+    body_hash = content_hash(response.body)
+    if crawl_state.is_unchanged(url, body_hash):
+        return crawl_state.record_page(url, response.headers, body_hash, None)
+    return crawl_state.record_page(url, response.headers, body_hash, extract_data_fast(response.text, url))
+
+
 def get_priority(url):
     """
     Defines the priority of URLs to ensure a coherent order.
@@ -174,7 +412,7 @@ def get_priority(url):
         return 1  # Other site pages
 
 
-def crawl(seed_url, max_pages=50):
+def crawl(seed_url, max_pages=50, state_file=None):
     """
     Crawler that explores pages by prioritizing product links.
 
@@ -184,6 +422,9 @@ def crawl(seed_url, max_pages=50):
         Starting URL from which to begin the crawl.
     max_pages : int, optional
         Maximum number of pages to explore. Default is 50 pages.
+    state_file : str, optional
+        JSON file where the crawl state is persisted (see `CrawlState`). Default is None
+        (no persistent state, every crawl starts from scratch).
 
     Returns
     --------
@@ -197,34 +438,76 @@ def crawl(seed_url, max_pages=50):
     following a priority logic based on the nature of the pages. It retrieves
     the title, first paragraph, and internal links of each visited page, and
     saves this information in a JSON file. It stops the crawl after visiting a maximum of 50 pages
-    or when all relevant pages have been explored.
+    or when all relevant pages have been explored. The `robots.txt` of each host is downloaded
+    once and kept in a `RobotsCache` for the whole crawl, and pages are downloaded by a
+    `Fetcher` keeping one connection open per host. The URLs to visit are kept in a
+    `Frontier`, which canonicalizes them and queues each page only once.
+
+    With a `state_file`, the frontier, the visited pages and the validators of each page are
+    saved every few pages: an interrupted crawl is resumed where it stopped, and a new crawl
+    only downloads and extracts the pages that changed (see `fetch_page`).
     """
-    visited = set()
-    to_visit = queue.PriorityQueue()
-    to_visit.put((0, seed_url))  # High priority for the first page
-    data_collected = []
+    fetcher = Fetcher()
+    robots_cache = RobotsCache(fetcher=fetcher)
+    to_visit = Frontier()
+
+    crawl_state = CrawlState.load(state_file) if state_file else None
+    if crawl_state is not None:
+        crawl_state.start(seed_url)
+        visited = crawl_state.visited
+        data_collected = crawl_state.collected_data()
+        for url in visited:
+            to_visit.mark_seen(url)
+        crawl_state.frontier = {canonicalize_url(url): priority for url, priority in crawl_state.frontier.items()}
+        for url, priority in crawl_state.frontier.items():
+            to_visit.push(url, priority)
+    else:
+        visited = {}  # Visited URLs, in crawl order
+        data_collected = []
+        to_visit.push(seed_url, 0)  # High priority for the first page
 
     while not to_visit.empty() and len(visited) < max_pages:
-        _, url = to_visit.get()
-        if url in visited or not can_fetch(url):
+        _, url = to_visit.pop()
+        if not can_fetch(url, robots_cache=robots_cache):
+            if crawl_state is not None:
+                crawl_state.frontier.pop(url, None)
             continue
 
         print(f"Crawling: {url}")
-        html = fetch_url(url)
-        if not html:
-            continue
+        if crawl_state is not None:
+            extracted_data = fetch_page(url, fetcher, crawl_state)
+            crawl_state.frontier.pop(url, None)
+            if not extracted_data:
+                continue
+        else:
+            html = fetch_url(url, fetcher)
+            if not html:
+                continue
+            extracted_data = extract_data_fast(html, url)
 
-        extracted_data = extract_data(html, url)
         data_collected.append(extracted_data)
-        visited.add(url)
+        visited[url] = True
 
-        # Add new links with appropriate priority
+        # Add new links with appropriate priority (already seen links are ignored by the frontier)
         for link in extracted_data["links"]:
-            if link not in visited:
-                to_visit.put((get_priority(link), link))
+            priority = get_priority(link)
+            queued_url = to_visit.push(link, priority)
+            if queued_url is not None and crawl_state is not None:
+                crawl_state.frontier[queued_url] = priority
+
+        if crawl_state is not None and len(visited) % CHECKPOINT_INTERVAL == 0:
+            crawl_state.save(state_file)
 
         time.sleep(1)  # Politeness to avoid being blocked
 
+    fetcher.close()
+    to_visit.close()
+
+    if crawl_state is not None:
+        crawl_state.complete = True
+        crawl_state.save(state_file)
+        print(f"{crawl_state.changed_pages} new or modified pages.")
+
     # Save results to a JSON file
     with open("output.json", "w", encoding="utf-8") as f:
         json.dump(data_collected, f, indent=4, ensure_ascii=False)
@@ -232,13 +515,14 @@ def crawl(seed_url, max_pages=50):
     print(f"Crawl completed. {len(visited)} pages explored.")
 
 
-# Tests on a few different starting pages
-crawl("https://web-scraping.dev/review-policy", max_pages=10)
-crawl("https://web-scraping.dev/", max_pages=15)
-crawl("https://web-scraping.dev/testimonials", max_pages=20)
+if __name__ == "__main__":
+    # Tests on a few different starting pages
+    crawl("https://web-scraping.dev/review-policy", max_pages=10)
+    crawl("https://web-scraping.dev/", max_pages=15)
+    crawl("https://web-scraping.dev/testimonials", max_pages=20)
 
-# The results show that pages with 'product' in the URL are prioritized.
+    # The results show that pages with 'product' in the URL are prioritized.
 
 
-# Final crawler launch
-crawl("https://web-scraping.dev/products")
+    # Final crawler launch
+    crawl("https://web-scraping.dev/products")
@@ -4,15 +4,21 @@ import string
 import os
 from urllib.parse import urlparse, parse_qs
 from collections import defaultdict
+from reviews_store import ReviewsStore, REVIEWS_STORE_FILE
+from term_dictionary import TermDictionary, TERM_DICTIONARY_FILE
+from fuzzy_index import FuzzyIndex, FUZZY_INDEX_FILE
+from doc_store import DocumentStore, PostingsFile, DOC_STORE_FILE, DOC_STORE_OFFSETS_FILE, POSTINGS_FILE, POSTINGS_OFFSETS_FILE
+from index_stopwords import STOPWORDS
+from near_duplicates import deduplicate, DUPLICATES_INDEX_FILE
 
 # Input and output files
 INPUT_FILE = "products.jsonl"
 PROCESSED_FILE = "processed_products.jsonl"
 INDEX_FOLDER = "index"  # Directory for saving index files
 
-# Common English stopwords
-STOPWORDS = set(["the", "a", "an", "and", "or", "of", "to", "in", "on", "with", "for", "by", "at", "from", 
-                 "is", "it", "this", "that", "as", "are", "was", "were", "be", "been", "has", "have", "had"])
+# Index only one page of each group of near-duplicate pages (variants, pagination), see near_duplicates.py
+DEDUPLICATE_PAGES = True
+
 
 
 def extract_product_info_from_url(url):
@@ -192,43 +198,99 @@ def save_index_to_file(index, filename):
         print(f"Error saving index to {filename}: {e}")
 
 
-def build_reviews_index(data):
+def build_reviews_store(data, store=None):
     """
-    Builds an index for reviews with total count, average rating, and last rating.
+    Builds (or incrementally updates) the columnar reviews store from product reviews.
 
     Parameters
     ----------
     data : list
         A list of product data dictionaries containing review information.
+    store : ReviewsStore, optional
+        An existing store to update with the new reviews (default is a new empty store).
 
     Returns
     -------
-    dict
-        An index where each document ID maps to a dictionary containing the total number of reviews,
-        the average rating, and the last rating for the product.
+    ReviewsStore
+        A store holding, for each document ID, the total number of reviews, the average rating,
+        the last rating and the rating histogram of the product.
     """
-    reviews_index = {}
-    
+    if store is None:
+        store = ReviewsStore()
+
     for doc in data:
         reviews = doc.get("product_reviews", [])
-        
+
         if reviews:
             try:
-                total_reviews = len(reviews)
-                average_rating = sum(review.get("rating", 0) for review in reviews) / total_reviews
-                last_rating = reviews[-1].get("rating") if reviews else None
-                
-                reviews_index[doc['url']] = {
-                    "total_reviews": total_reviews,
-                    "average_rating": average_rating,
-                    "last_rating": last_rating
-                }
+                store.add_reviews(doc['url'], reviews)
             except Exception as e:
                 print(f"Error processing reviews for product with URL {doc['url']}. Error: {e}")
         else:
             print(f"No reviews for product with URL {doc['url']}")
-    
-    return reviews_index
+
+    return store
+
+
+def build_reviews_index(data):
+    """
+    Builds an index for reviews with total count, average rating, and last rating.
+
+    Parameters
+    ----------
+    data : list
+        A list of product data dictionaries containing review information.
+
+    Returns
+    -------
+    dict
+        An index where each document ID maps to a dictionary containing the total number of reviews,
+        the average rating ('mean_mark'), and the last rating for the product.
+    """
+    return build_reviews_store(data).to_index()
+
+
+def save_reviews_store_to_file(reviews_store, filename=REVIEWS_STORE_FILE):
+    """
+    Saves the columnar reviews store to a compressed NumPy file.
+
+    Parameters
+    ----------
+    reviews_store : ReviewsStore
+        The reviews store to save.
+    filename : str, optional
+        The path to the output .npz file (default is 'reviews_store.npz').
+    """
+    if not os.path.exists(INDEX_FOLDER):
+        os.makedirs(INDEX_FOLDER)
+
+    try:
+        reviews_store.save(os.path.join(INDEX_FOLDER, filename))
+    except Exception as e:
+        print(f"Error saving reviews store to {filename}: {e}")
+
+
+def update_reviews_store(data, filename=REVIEWS_STORE_FILE):
+    """
+    Adds new reviews to the reviews store saved in the index folder, without rebuilding it.
+
+    Parameters
+    ----------
+    data : list
+        A list of product data dictionaries containing only the new reviews.
+    filename : str, optional
+        The name of the store file in the index folder (default is 'reviews_store.npz').
+
+    Returns
+    -------
+    ReviewsStore
+        The updated reviews store.
+    """
+    path = os.path.join(INDEX_FOLDER, filename)
+    store = ReviewsStore.load(path) if os.path.exists(path) else ReviewsStore()
+    store = build_reviews_store(data, store)
+    save_reviews_store_to_file(store, filename)
+    return store
 
 
 def save_reviews_index_to_file(reviews_index, filename="reviews_index.json"):
@@ -295,6 +357,110 @@ def save_features_index_to_file(features_index, filename="features_index.json"):
         print(f"Error saving features index to {filename}: {e}")
 
 
+def save_term_dictionary_to_file(term_dictionary, filename=TERM_DICTIONARY_FILE):
+    """
+    Saves the term dictionary shared by all fields to a compressed NumPy file.
+
+    Parameters
+    ----------
+    term_dictionary : TermDictionary
+        The term dictionary to save.
+    filename : str, optional
+        The path to the output .npz file (default is 'term_dictionary.npz').
+    """
+    if not os.path.exists(INDEX_FOLDER):
+        os.makedirs(INDEX_FOLDER)
+
+    try:
+        term_dictionary.save(os.path.join(INDEX_FOLDER, filename))
+    except Exception as e:
+        print(f"Error saving term dictionary to {filename}: {e}")
+
+
+def save_fuzzy_index_to_file(fuzzy_index, filename=FUZZY_INDEX_FILE):
+    """
+    Saves the fuzzy (typo-tolerant) vocabulary index to a JSON file.
+
+    Parameters
+    ----------
+    fuzzy_index : FuzzyIndex
+        The fuzzy index to save.
+    filename : str, optional
+        The path to the output JSON file (default is 'fuzzy_index.json').
+    """
+    if not os.path.exists(INDEX_FOLDER):
+        os.makedirs(INDEX_FOLDER)
+
+    try:
+        fuzzy_index.save(os.path.join(INDEX_FOLDER, filename))
+    except Exception as e:
+        print(f"Error saving fuzzy index to {filename}: {e}")
+
+
+def save_doc_store_to_file(data, filename=DOC_STORE_FILE, offsets_filename=DOC_STORE_OFFSETS_FILE):
+    """
+    Saves the stored fields (title, description, features) of the products to a document store.
+
+    Parameters
+    ----------
+    data : list
+        The list of processed product data.
+    filename : str, optional
+        The path to the output data file (default is 'doc_store.bin').
+    offsets_filename : str, optional
+        The path to the output offset table (default is 'doc_store_offsets.npz').
+    """
+    if not os.path.exists(INDEX_FOLDER):
+        os.makedirs(INDEX_FOLDER)
+
+    try:
+        DocumentStore.write(data, os.path.join(INDEX_FOLDER, filename), os.path.join(INDEX_FOLDER, offsets_filename))
+    except Exception as e:
+        print(f"Error saving document store to {filename}: {e}")
+
+
+def save_postings_file(index, filename=POSTINGS_FILE, offsets_filename=POSTINGS_OFFSETS_FILE):
+    """
+    Saves a positional index to a postings file, read one token at a time when rendering results.
+
+    Parameters
+    ----------
+    index : dict
+        The positional index (e.g. the description index).
+    filename : str, optional
+        The path to the output data file (default is 'description_postings.bin').
+    offsets_filename : str, optional
+        The path to the output offset table (default is 'description_postings_offsets.npz').
+    """
+    if not os.path.exists(INDEX_FOLDER):
+        os.makedirs(INDEX_FOLDER)
+
+    try:
+        PostingsFile.write(index, os.path.join(INDEX_FOLDER, filename), os.path.join(INDEX_FOLDER, offsets_filename))
+    except Exception as e:
+        print(f"Error saving postings file to {filename}: {e}")
+
+
+def save_duplicates_index_to_file(duplicates_index, filename=DUPLICATES_INDEX_FILE):
+    """
+    Saves the near-duplicate pages and their canonical page to a JSON file.
+
+    Parameters
+    ----------
+    duplicates_index : SimHashIndex
+        The index linking each near-duplicate URL to its canonical URL.
+    filename : str, optional
+        The path to the output JSON file (default is 'duplicates_index.json').
+    """
+    if not os.path.exists(INDEX_FOLDER):
+        os.makedirs(INDEX_FOLDER)
+
+    try:
+        duplicates_index.save(os.path.join(INDEX_FOLDER, filename))
+    except Exception as e:
+        print(f"Error saving duplicates index to {filename}: {e}")
+
+
 def run_main_pipeline():
     """
     Main pipeline that processes product data, extracts product information, and builds inverted indices.
@@ -312,22 +478,45 @@ def run_main_pipeline():
     save_data_to_file(processed_data)
     print("Processing completed! Data saved to processed_products.jsonl")
 
-    indexed_data = load_data_from_file(PROCESSED_FILE)
+    indexed_data = processed_data  # Indexed from memory, without reading the processed file back
+    if DEDUPLICATE_PAGES:
+        indexed_data, duplicates_index = deduplicate(processed_data)
+        save_duplicates_index_to_file(duplicates_index)
+        print(f"{len(duplicates_index.canonical)} near-duplicate pages linked to {len(indexed_data)} canonical pages.")
+
     title_index = build_inverted_index_with_positions("title", indexed_data)
     description_index = build_inverted_index_with_positions("description", indexed_data)
 
     save_index_to_file(title_index, "index_title_with_positions.json")
     save_index_to_file(description_index, "index_description_with_positions.json")
-
-    reviews_index = build_reviews_index(indexed_data)
-    if reviews_index:
-        save_reviews_index_to_file(reviews_index)
+    save_postings_file(description_index)
+
+    # Near-duplicates are only left out of the inverted indexes: their reviews and stored
+    # document stay available, e.g. for a variant URL linked to its canonical page
+    reviews_store = build_reviews_store(processed_data)
+    if len(reviews_store):
+        save_reviews_index_to_file(reviews_store.to_index())
+        save_reviews_store_to_file(reviews_store)
         print("Reviews index creation completed!")
 
     features_index = build_features_index(indexed_data)
     save_features_index_to_file(features_index)
     print("Features index creation completed!")
 
+    term_dictionary = TermDictionary.build({
+        "title": title_index,
+        "description": description_index,
+        "features": features_index
+    })
+    save_term_dictionary_to_file(term_dictionary)
+    print("Term dictionary creation completed!")
+
+    save_fuzzy_index_to_file(FuzzyIndex.build(term_dictionary))
+    print("Fuzzy index creation completed!")
+
+    save_doc_store_to_file(processed_data)
+    print("Document store creation completed!")
+
     print("All indexing completed!")
 
 
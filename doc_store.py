@@ -0,0 +1,302 @@
+import json
+import os
+import string
+import zlib
+from functools import lru_cache
+import numpy as np
+
+# Default file names of the document store (saved in the index folder)
+DOC_STORE_FILE = "doc_store.bin"
+DOC_STORE_OFFSETS_FILE = "doc_store_offsets.npz"
+
+# Default file names of the description postings, read to locate the matches in the snippets
+POSTINGS_FILE = "description_postings.bin"
+POSTINGS_OFFSETS_FILE = "description_postings_offsets.npz"
+
+# Fields of the product data kept in the document store
+STORED_FIELDS = ["url", "title", "description", "product_features"]
+
+# Number of documents compressed together in a block
+DOCS_PER_BLOCK = 16
+
+# Number of decompressed blocks kept in memory
+BLOCK_CACHE_SIZE = 64
+
+# Number of words in a snippet, and markers around the highlighted words
+SNIPPET_WORDS = 20
+HIGHLIGHT_START = "<b>"
+HIGHLIGHT_END = "</b>"
+
+
+def highlight_snippet(text, query_tokens, positions=None, stopwords=(), window=SNIPPET_WORDS):
+    """
+    Builds a snippet of a text around the query tokens, with the matching words highlighted.
+
+    Parameters
+    ----------
+    text : str
+        The stored text (e.g. the product description).
+    query_tokens : list
+        The tokens of the query.
+    positions : list, optional
+        Token positions of the matches, as stored in a positional index (default is None, the
+        matches are then found by tokenizing the text).
+    stopwords : iterable, optional
+        The stopwords skipped when the positional index was built, used to map token positions
+        back to the words of the text (default is no stopwords).
+    window : int, optional
+        The number of words of the snippet (default is 20).
+
+    Returns
+    -------
+    str
+        The snippet, starting at most a few words before the first match, with "..." when the
+        text is cut.
+
+    Implementation Details
+    ----------------------------
+    The indexer splits the text on whitespace, removes punctuation and skips empty words and
+    stopwords, so the n-th token of the index is the n-th remaining word of the text. The same
+    walk over the words maps the stored positions to words without re-running the index.
+    """
+    if not text:
+        return ""
+
+    words = text.split()
+    query_tokens = set(query_tokens)
+    positions = set(positions) if positions is not None else None
+    punctuation = str.maketrans('', '', string.punctuation)
+
+    matches = []
+    token_position = 0
+    for word_position, word in enumerate(words):
+        token = word.lower().translate(punctuation)
+        if not token or token in stopwords:
+            continue
+        if (token_position in positions) if positions is not None else (token in query_tokens):
+            matches.append(word_position)
+        token_position += 1
+
+    start = max(0, matches[0] - window // 4) if matches else 0
+    end = min(len(words), start + window)
+    highlighted = set(matches)
+    snippet = " ".join(
+        f"{HIGHLIGHT_START}{words[i]}{HIGHLIGHT_END}" if i in highlighted else words[i]
+        for i in range(start, end)
+    )
+    return ("... " if start > 0 else "") + snippet + (" ..." if end < len(words) else "")
+
+
+class DocumentStore:
+    """
+    Random-access store of the product fields, used to render the top results.
+
+    Attributes
+    ----------
+    urls : list
+        Document URLs, the position of a URL in the list is its document ID.
+    doc_ids : dict
+        Reverse mapping from document URL to document ID.
+
+    Implementation Details
+    ----------------------------
+    Documents are grouped in blocks of `DOCS_PER_BLOCK` consecutive document IDs. Each block
+    is a zlib-compressed JSON list of the stored fields, and an offset table gives the start of
+    each block in the data file. Fetching a document reads and decompresses a single block
+    (found by integer division of its document ID), so rendering k results costs at most k
+    block reads, whatever the size of the catalog. Recently used blocks are cached.
+    """
+
+    def __init__(self, filename, block_offsets, urls):
+        self.filename = filename
+        self.urls = urls
+        self.doc_ids = {url: doc_id for doc_id, url in enumerate(urls)}
+        self._block_offsets = block_offsets
+        self._read_block = lru_cache(maxsize=BLOCK_CACHE_SIZE)(self._load_block)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, url):
+        return url in self.doc_ids
+
+    @staticmethod
+    def write(data, filename, offsets_filename):
+        """
+        Writes the stored fields of the product data to a document store.
+
+        Parameters
+        ----------
+        data : list
+            A list of product data dictionaries, the document ID of a product is its position.
+        filename : str
+            The path to the output data file.
+        offsets_filename : str
+            The path to the output offset table (.npz file).
+        """
+        block_offsets = [0]
+        with open(filename, "wb") as file:
+            for start in range(0, len(data), DOCS_PER_BLOCK):
+                block = [{field: doc.get(field) for field in STORED_FIELDS} for doc in data[start:start + DOCS_PER_BLOCK]]
+                compressed = zlib.compress(json.dumps(block, ensure_ascii=False).encode("utf-8"))
+                file.write(compressed)
+                block_offsets.append(block_offsets[-1] + len(compressed))
+
+        np.savez_compressed(
+            offsets_filename,
+            block_offsets=np.array(block_offsets, dtype=np.uint64),
+            urls=np.array([doc.get("url", "") for doc in data], dtype=str)
+        )
+
+    @classmethod
+    def open(cls, filename, offsets_filename):
+        """
+        Opens a document store written with `DocumentStore.write`.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the data file.
+        offsets_filename : str
+            The path to the offset table (.npz file).
+
+        Returns
+        -------
+        DocumentStore | None
+            The document store, or None if one of the files does not exist.
+        """
+        for path in (filename, offsets_filename):
+            if not os.path.exists(path):
+                print(f"Error: The file {path} does not exist.")
+                return None
+
+        with np.load(offsets_filename) as arrays:
+            return cls(filename, arrays["block_offsets"].tolist(), arrays["urls"].tolist())
+
+    def _load_block(self, block):
+        """
+        Reads and decompresses a block of documents (use the cached `_read_block`).
+        """
+        start, end = self._block_offsets[block], self._block_offsets[block + 1]
+        with open(self.filename, "rb") as file:
+            file.seek(start)
+            return json.loads(zlib.decompress(file.read(end - start)).decode("utf-8"))
+
+    def get(self, url):
+        """
+        Returns the stored fields of a document.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the document.
+
+        Returns
+        -------
+        dict | None
+            The stored fields (url, title, description, product_features), or None if the
+            document is not in the store.
+        """
+        doc_id = self.doc_ids.get(url)
+        if doc_id is None:
+            return None
+        block, position = divmod(doc_id, DOCS_PER_BLOCK)
+        return self._read_block(block)[position]
+
+
+class PostingsFile:
+    """
+    Random-access file of the postings of a positional index, read one token at a time.
+
+    Attributes
+    ----------
+    tokens : list
+        The tokens of the index, the position of a token in the list is its token ID.
+    token_ids : dict
+        Reverse mapping from token to token ID.
+
+    Implementation Details
+    ----------------------------
+    The postings of each token (URL -> positions) are stored as a zlib-compressed JSON object,
+    in token ID order, and an offset table gives the start of each one in the data file. Only
+    the postings of the query tokens are read to build the snippets, instead of loading the
+    whole positional index of the catalog.
+    """
+
+    def __init__(self, filename, offsets, tokens):
+        self.filename = filename
+        self.tokens = tokens
+        self.token_ids = {token: token_id for token_id, token in enumerate(tokens)}
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, token):
+        return token in self.token_ids
+
+    @staticmethod
+    def write(index, filename, offsets_filename):
+        """
+        Writes a positional index to a postings file.
+
+        Parameters
+        ----------
+        index : dict
+            The positional index (token -> URL -> positions).
+        filename : str
+            The path to the output data file.
+        offsets_filename : str
+            The path to the output offset table (.npz file).
+        """
+        tokens = sorted(index)
+        offsets = [0]
+        with open(filename, "wb") as file:
+            for token in tokens:
+                compressed = zlib.compress(json.dumps(index[token], ensure_ascii=False).encode("utf-8"))
+                file.write(compressed)
+                offsets.append(offsets[-1] + len(compressed))
+
+        np.savez_compressed(offsets_filename, offsets=np.array(offsets, dtype=np.uint64),
+                            tokens=np.array(tokens, dtype=str))
+
+    @classmethod
+    def open(cls, filename, offsets_filename):
+        """
+        Opens a postings file written with `PostingsFile.write`.
+
+        Returns
+        -------
+        PostingsFile | None
+            The postings file, or None if one of the files does not exist.
+        """
+        for path in (filename, offsets_filename):
+            if not os.path.exists(path):
+                print(f"Error: The file {path} does not exist.")
+                return None
+
+        with np.load(offsets_filename) as arrays:
+            return cls(filename, arrays["offsets"].tolist(), arrays["tokens"].tolist())
+
+    def load(self, tokens):
+        """
+        Reads the postings of some tokens.
+
+        Parameters
+        ----------
+        tokens : iterable
+            The tokens to read (e.g. the tokens of a query).
+
+        Returns
+        -------
+        dict
+            The positional index restricted to the tokens found in the file (token -> URL -> positions).
+        """
+        token_ids = sorted({self.token_ids[token] for token in tokens if token in self.token_ids})
+        postings = {}
+        with open(self.filename, "rb") as file:
+            for token_id in token_ids:
+                start, end = self._offsets[token_id], self._offsets[token_id + 1]
+                file.seek(start)
+                postings[self.tokens[token_id]] = json.loads(zlib.decompress(file.read(end - start)).decode("utf-8"))
+        return postings
@@ -1,14 +1,27 @@
+import argparse
 import json
+import os
 import string
 import math
 import nltk
 import random
+import numpy as np
 from collections import defaultdict
 from nltk.corpus import stopwords
+from reviews_store import ReviewsStore
+from fuzzy_index import FuzzyIndex, FUZZY_INDEX_FILE, expand_query_with_corrections
+from doc_store import (DocumentStore, PostingsFile, DOC_STORE_FILE, DOC_STORE_OFFSETS_FILE, POSTINGS_FILE,
+                       POSTINGS_OFFSETS_FILE, highlight_snippet)
+from index_stopwords import STOPWORDS as INDEX_STOPWORDS
 
 nltk.download("stopwords")
 STOPWORDS = stopwords.words("english")
 
+# Fuzzy (typo-tolerant) vocabulary index and document store built by create_index.py
+FUZZY_INDEX_PATH = os.path.join("index", FUZZY_INDEX_FILE)
+DOC_STORE_PATHS = (os.path.join("index", DOC_STORE_FILE), os.path.join("index", DOC_STORE_OFFSETS_FILE))
+DESCRIPTION_POSTINGS_PATHS = (os.path.join("index", POSTINGS_FILE), os.path.join("index", POSTINGS_OFFSETS_FILE))
+
 
 def load_json_file(file_path):
     """
@@ -28,6 +41,52 @@ def load_json_file(file_path):
         return json.load(file)
 
 
+def load_fuzzy_index(path=FUZZY_INDEX_PATH, vocabulary=()):
+    """
+    Loads the fuzzy index saved by create_index.py.
+
+    Parameters
+    ----------
+    path : str, optional
+        The path to the fuzzy index file (default is 'index/fuzzy_index.json').
+    vocabulary : iterable, optional
+        The terms indexed if the file does not exist, e.g. the tokens of the searched indexes
+        (default is empty).
+
+    Returns
+    -------
+    FuzzyIndex
+        The persisted fuzzy index, or a fuzzy index built from `vocabulary` if there is none.
+    """
+    if os.path.exists(path):
+        return FuzzyIndex.load(path)
+    print(f"{path} not found, building the fuzzy index from the searched vocabulary.")
+    return FuzzyIndex.build(vocabulary)
+
+
+def load_description_postings(query_tokens, paths=DESCRIPTION_POSTINGS_PATHS):
+    """
+    Loads the positional description postings of the query tokens, used to highlight the snippets.
+
+    Parameters
+    ----------
+    query_tokens : list
+        The tokens of the query.
+    paths : tuple, optional
+        The paths to the postings file and its offset table (default is the files of 'index/').
+
+    Returns
+    -------
+    dict | None
+        The description index restricted to the query tokens, or None if the postings file was
+        not built (the snippets then find the matches by tokenizing the descriptions).
+    """
+    if not os.path.exists(paths[0]):
+        return None
+    postings_file = PostingsFile.open(*paths)
+    return postings_file.load(query_tokens) if postings_file is not None else None
+
+
 def tokenize_text(text):
     """
     Tokenizes text by removing punctuation and stopwords.
@@ -104,7 +163,8 @@ def filter_documents(tokens, index_data, match_all=True):
     return matched_urls
 
 
-def compute_bm25(query_tokens, index_data, k1=1.5, b=0.75):
+def compute_bm25(query_tokens, index_data, k1=1.5, b=0.75, token_weights=None, candidate_docs=None,
+                 global_stats=None):
     """
     Computes BM25 ranking for documents based on the query tokens.
 
@@ -118,22 +178,38 @@ def compute_bm25(query_tokens, index_data, k1=1.5, b=0.75):
         The BM25 parameter for term frequency scaling (default is 1.5).
     b : float, optional
         The BM25 parameter for document length normalization (default is 0.75).
+    token_weights : dict, optional
+        Weights of the query tokens (e.g. fuzzy corrections), tokens missing from it have a weight of 1 (default is None).
+    candidate_docs : set, optional
+        If set, only these documents are scored (default is None, all documents).
+    global_stats : dict, optional
+        Collection statistics ('N', 'avgdl' and the document frequency 'df' of each token) of the
+        whole index, used when `index_data` is only one shard of it (default is None, the
+        statistics are computed from `index_data`).
 
     Returns
     -------
     dict
         A dictionary where the keys are document URLs and the values are their BM25 scores.
     """
-    N = len(index_data)  # Total number of documents
-    avgdl = sum(len(docs) for docs in index_data.values()) / N  # Average document length
+    if not index_data:
+        return defaultdict(float)  # Empty index (e.g. no feature indexed yet)
+    if global_stats is not None:
+        N, avgdl = global_stats["N"], global_stats["avgdl"]
+    else:
+        N = len(index_data)  # Total number of documents
+        avgdl = sum(len(docs) for docs in index_data.values()) / N  # Average document length
     scores = defaultdict(float)
+    token_weights = token_weights or {}
 
     for token in query_tokens:
         if token in index_data:
-            df = len(index_data[token])  # Document frequency
-            idf = math.log((N - df + 0.5) / (df + 0.5) + 1)
+            df = global_stats["df"][token] if global_stats is not None else len(index_data[token])  # Document frequency
+            idf = math.log((N - df + 0.5) / (df + 0.5) + 1) * token_weights.get(token, 1)
 
             for doc, doc_data in index_data[token].items():
+                if candidate_docs is not None and doc not in candidate_docs:
+                    continue
                 tf = doc_data.get(token, 0)  # How many times the token appears in the document
                 doc_len = len(doc_data)  # Document length (total number of terms in the document)
                 
@@ -143,7 +219,8 @@ def compute_bm25(query_tokens, index_data, k1=1.5, b=0.75):
     return scores
 
 
-def rank_documents(query_tokens, index_data, title_index, review_index):
+def rank_documents(query_tokens, index_data, title_index, review_index, token_weights=None, candidate_docs=None,
+                   global_stats=None):
     """
     Ranks documents based on BM25 scores, exact match, title presence, review scores, and other relevant signals.
     Includes humorous adjustments based on a 'discussion' between Elon Musk and Donald Trump.
@@ -158,37 +235,45 @@ def rank_documents(query_tokens, index_data, title_index, review_index):
         A dictionary where the keys are tokens and the values are lists of documents containing those tokens.
     title_index : dict
         A dictionary where the keys are tokens found in document titles and the values are lists of document URLs.
-    review_index : dict
-        A dictionary where the keys are document URLs and the values are review data for each document.
+    review_index : ReviewsStore | dict
+        The columnar reviews store, or a dictionary where the keys are document URLs and the values
+        are review data for each document.
+    token_weights : dict, optional
+        Weights of the query tokens (e.g. fuzzy corrections), tokens missing from it have a weight of 1 (default is None).
+    candidate_docs : set, optional
+        If set, only these documents are scored, e.g. the documents matching structured filters (default is None).
+    global_stats : dict, optional
+        BM25 statistics of the whole index when `index_data` is a shard (see `compute_bm25`, default is None).
 
     Returns
     -------
     list
         A sorted list of tuples, where each tuple contains a document URL and its corresponding score.
     """
-    bm25_scores = compute_bm25(query_tokens, index_data)
+    if not isinstance(review_index, ReviewsStore):
+        review_index = ReviewsStore.from_index(review_index)
+    token_weights = token_weights or {}
+
+    bm25_scores = compute_bm25(query_tokens, index_data, token_weights=token_weights, candidate_docs=candidate_docs,
+                               global_stats=global_stats)
 
     # Add score for presence in title
     for token in query_tokens:
         if token in title_index:
             for doc in title_index[token]:
-                bm25_scores[doc] += 2  # Strong weight for titles
-
-    # Add score for customer reviews
-    for doc, reviews in review_index.items():
-        if "mean_mark" in reviews:
-            # Normalize to a 5-star rating
-            bm25_scores[doc] += reviews["mean_mark"] / 5  
-            
-            # Add additional bonuses based on the review score
-            if reviews["mean_mark"] == 5:
-                bm25_scores[doc] += 5  # Bonus for perfect scores
-            elif reviews["mean_mark"] > 4.5:
-                bm25_scores[doc] += 3  # Bonus for scores greater than 4.5
-            elif reviews["mean_mark"] > 4:
-                bm25_scores[doc] += 2  # Bonus for scores greater than 4
-            elif reviews["mean_mark"] > 3:
-                bm25_scores[doc] += 1  # Bonus for scores greater than 3
+                if candidate_docs is not None and doc not in candidate_docs:
+                    continue
+                bm25_scores[doc] += 2 * token_weights.get(token, 1)  # Strong weight for titles
+
+    # Add score for customer reviews (normalized 5-star rating plus bonuses, precomputed per document),
+    # added to the scores of all the candidates at once
+    if candidate_docs is None:
+        candidates, boosts = review_index.urls, review_index.rating_boost()
+    else:
+        candidates = [doc for doc in candidate_docs if doc in review_index]
+        boosts = review_index.rating_boost()[review_index.lookup(candidates)]
+    scores = np.fromiter((bm25_scores.get(doc, 0.0) for doc in candidates), dtype=np.float64, count=len(candidates))
+    bm25_scores.update(zip(candidates, (scores + boosts).tolist()))
 
     # Humor: Boost score for USA-related terms 
     usa_keywords = ['usa', 'hamburgers', 'pizzas', 'new-york', 'america', 'freedom', 'bacon', 'rockets', 'tesla', 'trump']
@@ -255,7 +340,8 @@ def ensure_unique_scores(ranked_results):
     return adjusted_results
 
 
-def process_query(query, index_data, synonyms_dict, title_index, review_index, match_all=True):
+def process_query(query, index_data, synonyms_dict, title_index, review_index, match_all=True, min_rating=None,
+                  fuzzy_index=None, filters=None, facet_index=None, global_stats=None, unique_scores=True):
     """
     Processes a search query, expands it with synonyms, filters relevant documents, and ranks the results.
 
@@ -269,29 +355,113 @@ def process_query(query, index_data, synonyms_dict, title_index, review_index, m
         A dictionary containing tokens and their corresponding synonyms.
     title_index : dict
         A dictionary where the keys are tokens found in document titles and the values are lists of document URLs.
-    review_index : dict
-        A dictionary where the keys are document URLs and the values are review data for each document.
+    review_index : ReviewsStore | dict
+        The columnar reviews store, or a dictionary where the keys are document URLs and the values
+        are review data for each document.
     match_all : bool, optional
         If True, all query tokens must be present in the documents. If False, at least one token must be present (default is True).
+    min_rating : float, optional
+        If set, only documents with an average rating of at least `min_rating` are returned (default is None).
+    fuzzy_index : FuzzyIndex, optional
+        If set, unknown query tokens are expanded with the vocabulary terms within 1 or 2 edits,
+        weighted by their edit distance (default is None, exact matching only).
+    filters : str | dict, optional
+        Structured filters such as "brand=chocodelight AND origin=switzerland" (default is None).
+    facet_index : FacetIndex, optional
+        The bitmaps of the brand, origin and domain values, required when `filters` is set (default is None).
+    global_stats : dict, optional
+        BM25 statistics of the whole index when the indexes are one shard of it (see `compute_bm25`,
+        default is None).
+    unique_scores : bool, optional
+        If True, ties are broken with `ensure_unique_scores` (default is True). Shards return their
+        raw scores, and ties are broken once the results of all the shards are merged.
 
     Returns
     -------
     list
         A sorted list of tuples, where each tuple contains a document URL and its corresponding score.
     """
+    if not isinstance(review_index, ReviewsStore):
+        review_index = ReviewsStore.from_index(review_index)
+
+    # Structured filters are compiled to a bitmap first, so that only matching documents are scored
+    candidate_docs = None
+    if filters:
+        candidate_docs = facet_index.filter_urls(filters)
+        if not candidate_docs:
+            return []
+
     tokens = tokenize_text(query)
+    token_weights = {}
+    if fuzzy_index is not None:
+        tokens, token_weights = expand_query_with_corrections(tokens, fuzzy_index)
     expanded_tokens = expand_query_with_synonyms(tokens, synonyms_dict)
     matched_docs = filter_documents(expanded_tokens, index_data, match_all)
     
-    ranked_results = rank_documents(expanded_tokens, index_data, title_index, review_index)
+    ranked_results = rank_documents(expanded_tokens, index_data, title_index, review_index, token_weights,
+                                    candidate_docs, global_stats)
+
+    # Keep only well-rated documents ("rating >= min_rating"), as a vectorized lookup in the reviews store
+    if min_rating is not None:
+        scores = dict(ranked_results)
+        kept_docs = review_index.filter_min_rating([doc for doc, _ in ranked_results], min_rating)
+        ranked_results = [(doc, scores[doc]) for doc in kept_docs]
     
     # Ensure unique scores
-    ranked_results = ensure_unique_scores(ranked_results)
+    if unique_scores:
+        ranked_results = ensure_unique_scores(ranked_results)
 
     return ranked_results
 
 
-def main():
+def format_results(ranked_results, doc_store=None, query_tokens=None, description_index=None, k=None):
+    """
+    Formats ranked results for display, with the stored title and a highlighted snippet of each document.
+
+    Parameters
+    ----------
+    ranked_results : list
+        A sorted list of tuples, where each tuple contains a document URL and its score.
+    doc_store : DocumentStore, optional
+        The document store holding the title and description of each document (default is None,
+        the URL is then used as title and no snippet is built).
+    query_tokens : list, optional
+        The tokens of the query, highlighted in the snippets (default is None).
+    description_index : dict, optional
+        The positional description index, whose positions locate the matches in the snippets
+        (default is None, the matches are then found by tokenizing the description, as for the
+        documents that have no postings of the query tokens in the index).
+    k : int, optional
+        The number of results to format (default is None, all the results).
+
+    Returns
+    -------
+    list
+        A list of dictionaries with the title, URL, score (and snippet if a document store is given)
+        of each result. Only the top `k` documents are fetched from the store.
+    """
+    results = []
+    for doc, score in ranked_results[:k]:
+        stored = doc_store.get(doc) if doc_store is not None else None
+        if stored is None:
+            results.append({"title": doc, "url": doc, "score": score})
+            continue
+
+        # Documents without postings (e.g. near-duplicates left out of the index) are tokenized instead
+        positions = None
+        if description_index is not None and query_tokens:
+            postings = [description_index[token][doc] for token in query_tokens if doc in description_index.get(token, {})]
+            positions = [position for token_positions in postings for position in token_positions] if postings else None
+        results.append({
+            "title": stored.get("title") or doc,
+            "url": doc,
+            "score": score,
+            "snippet": highlight_snippet(stored.get("description"), query_tokens or [], positions, INDEX_STOPWORDS)
+        })
+    return results
+
+
+def main(use_fuzzy_search=False):
     # Paths to the JSON files
     paths = {
         "brand": 'index_provided/brand_index.json',
@@ -306,8 +476,12 @@ def main():
     # Load the index data
     origin_index = load_json_file(paths["origin"])
     origin_synonyms = load_json_file(paths["synonyms"])
-    review_index = load_json_file(paths["reviews"])
+    review_index = ReviewsStore.from_index(load_json_file(paths["reviews"]))
     title_index = load_json_file(paths["title"])
+    fuzzy_index = load_fuzzy_index(vocabulary=set(title_index) | set(origin_index)) if use_fuzzy_search else None
+
+    # Stored titles and descriptions of the results (URLs are shown instead if the store was not built)
+    doc_store = DocumentStore.open(*DOC_STORE_PATHS) if os.path.exists(DOC_STORE_PATHS[0]) else None
 
     # Test with three queries
     test_query = "Unleash the power within with our 'Dark Red Potion', an energy drink."
@@ -317,20 +491,15 @@ def main():
         origin_synonyms,
         title_index,
         review_index,
-        match_all=True
+        match_all=True,
+        fuzzy_index=fuzzy_index
     )
 
     # Format output as JSON
     output = {
         "total_documents": len(origin_index),
         "filtered_documents": len(ranked_results),
-        "results": [
-            {
-                "title": doc,
-                "url": doc,
-                "score": score
-            } for doc, score in ranked_results
-        ]
+        "results": format_results(ranked_results, doc_store, tokenize_text(test_query))
     }
 
     # Save the output to a JSON file
@@ -346,20 +515,15 @@ def main():
         origin_synonyms,
         title_index,
         review_index,
-        match_all=True
+        match_all=True,
+        fuzzy_index=fuzzy_index
     )
 
     # Format output as JSON
     output = {
         "total_documents": len(origin_index),
         "filtered_documents": len(ranked_results),
-        "results": [
-            {
-                "title": doc,
-                "url": doc,
-                "score": score
-            } for doc, score in ranked_results
-        ]
+        "results": format_results(ranked_results, doc_store, tokenize_text(test_query))
     }
 
     # Save the output to a JSON file
@@ -375,20 +539,15 @@ def main():
         origin_synonyms,
         title_index,
         review_index,
-        match_all=True
+        match_all=True,
+        fuzzy_index=fuzzy_index
     )
 
     # Format output as JSON
     output = {
         "total_documents": len(origin_index),
         "filtered_documents": len(ranked_results),
-        "results": [
-            {
-                "title": doc,
-                "url": doc,
-                "score": score
-            } for doc, score in ranked_results
-        ]
+        "results": format_results(ranked_results, doc_store, tokenize_text(test_query))
     }
 
     # Save the output to a JSON file
@@ -396,4 +555,7 @@ def main():
         json.dump(output, outfile, indent=2)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the test queries of the search engine.")
+    parser.add_argument("--fuzzy", action="store_true", help="tolerate typos in the queries")
+    args = parser.parse_args()
+    main(use_fuzzy_search=args.fuzzy)
\ No newline at end of file
@@ -0,0 +1,283 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import numpy as np
+from engine import process_query, load_json_file, tokenize_text, expand_query_with_synonyms
+from reviews_store import ReviewsStore
+from facets import FacetIndex, FACET_INDEX_FILES
+
+# Query set with graded judgments (3: the product, 2: one of its variants, 1: a related product)
+QUERIES_FILE = "evaluation_queries.json"
+
+# Metrics and rankings of a reference run, compared with each new run
+BASELINE_FILE = "evaluation_baseline.json"
+
+# Number of results considered by nDCG and recall
+K = 10
+
+# Largest accepted drop of a mean quality metric
+QUALITY_TOLERANCE = 0.001
+
+# Largest accepted ratio between the p95 latency and the baseline p95 latency, and smallest
+# increase (in milliseconds) reported, so that timer noise on sub-millisecond queries is ignored
+LATENCY_TOLERANCE = 1.5
+LATENCY_MIN_INCREASE_MS = 1.0
+
+INDEX_PATHS = {
+    "origin": "index_provided/origin_index.json",
+    "synonyms": "index_provided/origin_synonyms.json",
+    "reviews": "index_provided/reviews_index.json",
+    "title": "index_provided/title_index.json"
+}
+
+
+def load_indexes(paths=INDEX_PATHS):
+    """
+    Loads the indexes searched by `search_engine.py`.
+
+    Parameters
+    ----------
+    paths : dict, optional
+        The paths of the 'origin', 'synonyms', 'reviews' and 'title' index files.
+
+    Returns
+    -------
+    dict
+        The loaded indexes, with the reviews store and the facet index.
+    """
+    return {
+        "origin": load_json_file(paths["origin"]),
+        "synonyms": load_json_file(paths["synonyms"]),
+        "title": load_json_file(paths["title"]),
+        "reviews": ReviewsStore.from_index(load_json_file(paths["reviews"])),
+        "facets": FacetIndex.build({facet: load_json_file(path) for facet, path in FACET_INDEX_FILES.items()})
+    }
+
+
+def dcg(grades):
+    """
+    Returns the discounted cumulative gain of a list of grades, in ranking order.
+    """
+    return sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(grades))
+
+
+def ndcg_at_k(ranking, judgments, k=K):
+    """
+    Returns the normalized discounted cumulative gain of the first k results.
+
+    Parameters
+    ----------
+    ranking : list
+        The URLs of the results, best first.
+    judgments : dict
+        The grade of each relevant URL (missing URLs have a grade of 0).
+    k : int, optional
+        The number of results considered (default is 10).
+
+    Returns
+    -------
+    float
+        The DCG of the ranking divided by the DCG of the ideal ranking, between 0 and 1.
+    """
+    ideal = dcg(sorted(judgments.values(), reverse=True)[:k])
+    if ideal == 0:
+        return 0.0
+    return dcg([judgments.get(url, 0) for url in ranking[:k]]) / ideal
+
+
+def reciprocal_rank(ranking, judgments):
+    """
+    Returns 1 / rank of the first relevant result, or 0 if no result is relevant.
+    """
+    for rank, url in enumerate(ranking, start=1):
+        if judgments.get(url, 0) > 0:
+            return 1 / rank
+    return 0.0
+
+
+def recall_at_k(ranking, judgments, k=K):
+    """
+    Returns the fraction of the relevant URLs (up to k) found in the first k results.
+    """
+    relevant = {url for url, grade in judgments.items() if grade > 0}
+    if not relevant:
+        return 0.0
+    return len(relevant.intersection(ranking[:k])) / min(len(relevant), k)
+
+
+def count_postings(query, indexes):
+    """
+    Returns the number of postings read by the engine for a query, in the origin and title indexes.
+    """
+    tokens = expand_query_with_synonyms(tokenize_text(query), indexes["synonyms"])
+    return sum(len(indexes[name].get(token, ())) for token in tokens for name in ("origin", "title"))
+
+
+def evaluate_query(entry, indexes, repeat=5):
+    """
+    Runs a query of the query set and measures its quality and latency.
+
+    Parameters
+    ----------
+    entry : dict
+        The 'query', its 'judgments' and optionally the 'match_all', 'min_rating' and
+        'filters' arguments of `engine.process_query`.
+    indexes : dict
+        The indexes (see `load_indexes`).
+    repeat : int, optional
+        The number of runs of the query, for the latency (default is 5).
+
+    Returns
+    -------
+    dict
+        The top-k URLs, nDCG@k, reciprocal rank, recall@k, postings read and latencies (in
+        milliseconds) of the query, and the error message if it failed.
+    """
+    result = {"query": entry["query"], "ranking": [], "ndcg": 0.0, "mrr": 0.0, "recall": 0.0, "latencies_ms": [],
+              "postings": count_postings(entry["query"], indexes), "error": None}
+
+    for _ in range(repeat):
+        random.seed(0)  # Ties are broken randomly by the engine, the seed makes the rankings comparable
+        start = time.perf_counter()
+        try:
+            ranked_results = process_query(
+                entry["query"],
+                indexes["origin"],
+                indexes["synonyms"],
+                indexes["title"],
+                indexes["reviews"],
+                match_all=entry.get("match_all", True),
+                min_rating=entry.get("min_rating"),
+                filters=entry.get("filters"),
+                facet_index=indexes["facets"]
+            )
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            return result
+        result["latencies_ms"].append((time.perf_counter() - start) * 1000)
+
+    ranking = [url for url, _ in ranked_results]
+    judgments = entry["judgments"]
+    result.update({
+        "ranking": ranking[:K],
+        "ndcg": ndcg_at_k(ranking, judgments),
+        "mrr": reciprocal_rank(ranking, judgments),
+        "recall": recall_at_k(ranking, judgments)
+    })
+    return result
+
+
+def run_evaluation(queries, indexes, repeat=5):
+    """
+    Runs all the queries of a query set.
+
+    Parameters
+    ----------
+    queries : list
+        The query set (see `evaluate_query`).
+    indexes : dict
+        The indexes (see `load_indexes`).
+    repeat : int, optional
+        The number of runs of each query (default is 5).
+
+    Returns
+    -------
+    dict
+        The results of each query ('queries') and their 'summary': mean nDCG@k, MRR and recall@k,
+        p50/p95/p99 latencies (in milliseconds), mean postings read and number of failed queries.
+    """
+    results = [evaluate_query(entry, indexes, repeat) for entry in queries]
+    latencies = [latency for result in results for latency in result["latencies_ms"]] or [0.0]
+    summary = {
+        "queries": len(results),
+        "errors": sum(result["error"] is not None for result in results),
+        f"ndcg@{K}": float(np.mean([result["ndcg"] for result in results])),
+        "mrr": float(np.mean([result["mrr"] for result in results])),
+        f"recall@{K}": float(np.mean([result["recall"] for result in results])),
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "latency_p99_ms": float(np.percentile(latencies, 99)),
+        "mean_postings": float(np.mean([result["postings"] for result in results]))
+    }
+    return {"summary": summary, "queries": results}
+
+
+def compare_with_baseline(evaluation, baseline):
+    """
+    Compares an evaluation with the baseline.
+
+    Parameters
+    ----------
+    evaluation : dict
+        The current evaluation (see `run_evaluation`).
+    baseline : dict
+        The baseline evaluation.
+
+    Returns
+    -------
+    tuple
+        The list of regressions (lower quality, new errors, slower queries, more postings
+        read) and the list of
+        queries whose top-k ranking changed.
+    """
+    regressions = []
+    summary, baseline_summary = evaluation["summary"], baseline["summary"]
+
+    for metric in (f"ndcg@{K}", "mrr", f"recall@{K}"):
+        if summary[metric] < baseline_summary[metric] - QUALITY_TOLERANCE:
+            regressions.append(f"{metric} dropped from {baseline_summary[metric]:.4f} to {summary[metric]:.4f}")
+    if summary["errors"] > baseline_summary["errors"]:
+        regressions.append(f"{summary['errors']} failed queries instead of {baseline_summary['errors']}")
+    latency_limit = max(baseline_summary["latency_p95_ms"] * LATENCY_TOLERANCE,
+                        baseline_summary["latency_p95_ms"] + LATENCY_MIN_INCREASE_MS)
+    if summary["latency_p95_ms"] > latency_limit:
+        regressions.append(f"p95 latency rose from {baseline_summary['latency_p95_ms']:.2f} ms "
+                           f"to {summary['latency_p95_ms']:.2f} ms")
+
+    if summary["mean_postings"] > baseline_summary["mean_postings"]:
+        regressions.append(f"mean postings read rose from {baseline_summary['mean_postings']:.1f} "
+                           f"to {summary['mean_postings']:.1f}")
+
+    baseline_rankings = {result["query"]: result["ranking"] for result in baseline["queries"]}
+    changed = [result["query"] for result in evaluation["queries"]
+               if result["query"] in baseline_rankings and result["ranking"] != baseline_rankings[result["query"]]]
+    return regressions, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the relevance and latency of the search engine.")
+    parser.add_argument("--queries", default=QUERIES_FILE, help="query set with graded judgments")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline to compare with")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs of each query")
+    parser.add_argument("--update-baseline", action="store_true", help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    queries = load_json_file(args.queries)
+    evaluation = run_evaluation(queries, load_indexes(), args.repeat)
+    print(json.dumps(evaluation["summary"], indent=4))
+    for result in evaluation["queries"]:
+        if result["error"]:
+            print(f"Query '{result['query']}' failed: {result['error']}")
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(evaluation, file, indent=2, ensure_ascii=False)
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    regressions, changed = compare_with_baseline(evaluation, load_json_file(args.baseline))
+    for query in changed:
+        print(f"Ranking changed for '{query}'")
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if not regressions:
+        print(f"No regression compared with {args.baseline} ({len(changed)} rankings changed).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
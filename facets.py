@@ -0,0 +1,229 @@
+import re
+import numpy as np
+
+# Facet indexes provided with the project (facet name -> JSON file mapping values to URL lists)
+FACET_INDEX_FILES = {
+    "brand": "index_provided/brand_index.json",
+    "origin": "index_provided/origin_index.json",
+    "domain": "index_provided/domain_index.json"
+}
+
+
+def parse_filters(filters):
+    """
+    Parses a structured filter expression such as "brand=chocodelight AND origin=switzerland".
+
+    Parameters
+    ----------
+    filters : str | dict | None
+        The filter expression: clauses "facet=value" joined by "AND", where a value may list
+        alternatives separated by "|" (e.g. "origin=italy|france"). A dictionary mapping
+        facets to a value or a list of values is also accepted.
+
+    Returns
+    -------
+    dict
+        A dictionary where each facet name maps to the list of accepted (lowercased) values.
+    """
+    if not filters:
+        return {}
+    if isinstance(filters, dict):
+        return {
+            facet.lower(): [str(value).lower() for value in (values if isinstance(values, (list, tuple, set)) else [values])]
+            for facet, values in filters.items()
+        }
+
+    parsed = {}
+    for clause in re.split(r"\s+AND\s+", filters.strip(), flags=re.IGNORECASE):
+        if "=" not in clause:
+            print(f"Ignoring invalid filter clause: {clause}")
+            continue
+        facet, values = clause.split("=", 1)
+        parsed.setdefault(facet.strip().lower(), []).extend(
+            value.strip().lower() for value in values.split("|") if value.strip()
+        )
+    return parsed
+
+
+class FacetIndex:
+    """
+    Bitmaps over document IDs for the structured fields (brand, origin, domain).
+
+    Attributes
+    ----------
+    urls : list
+        Document URLs, the position of a URL in the list is its document ID.
+    doc_ids : dict
+        Reverse mapping from document URL to document ID.
+    bitmaps : dict
+        Mapping facet name -> value -> bitmap of the documents having this value.
+
+    Implementation Details
+    ----------------------------
+    A bitmap is a NumPy array of 64-bit words where bit `i` is set if document `i` matches.
+    A conjunction of filters is a bitwise AND of a few small arrays, and counting the documents
+    of a value in the current result set is a popcount of `result & value_bitmap`, so none of
+    these operations iterates over URLs. The catalog is small and dense enough that plain
+    bitmaps are smaller than compressed (run-length or roaring) ones would be.
+    """
+
+    def __init__(self, urls, bitmaps):
+        self.urls = urls
+        self.doc_ids = {url: doc_id for doc_id, url in enumerate(urls)}
+        self.bitmaps = bitmaps
+        self._words = (len(urls) + 63) // 64
+
+    def __len__(self):
+        return len(self.urls)
+
+    @classmethod
+    def build(cls, facet_indexes):
+        """
+        Builds the facet bitmaps from value -> URLs indexes.
+
+        Parameters
+        ----------
+        facet_indexes : dict
+            A dictionary where each facet name maps to its index (a dictionary where the keys
+            are facet values and the values are lists of document URLs).
+
+        Returns
+        -------
+        FacetIndex
+            The facet index, with document IDs assigned in order of first appearance.
+        """
+        urls = []
+        doc_ids = {}
+        for index in facet_indexes.values():
+            for documents in index.values():
+                for url in documents:
+                    if url not in doc_ids:
+                        doc_ids[url] = len(urls)
+                        urls.append(url)
+
+        facet_index = cls(urls, {})
+        for facet, index in facet_indexes.items():
+            facet_index.bitmaps[facet.lower()] = {
+                value.lower(): facet_index.bitmap_of(documents) for value, documents in index.items()
+            }
+        return facet_index
+
+    def empty_bitmap(self):
+        return np.zeros(self._words, dtype=np.uint64)
+
+    def full_bitmap(self):
+        """
+        Returns the bitmap of all the documents of the index.
+        """
+        bitmap = np.full(self._words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if len(self.urls) % 64:
+            bitmap[-1] = np.uint64((1 << (len(self.urls) % 64)) - 1)
+        return bitmap
+
+    def bitmap_of(self, urls):
+        """
+        Converts document URLs to a bitmap (URLs unknown to the index are ignored).
+
+        Parameters
+        ----------
+        urls : iterable
+            The document URLs.
+
+        Returns
+        -------
+        numpy.ndarray
+            The bitmap of the documents.
+        """
+        ids = np.fromiter((self.doc_ids.get(url, -1) for url in urls), dtype=np.int64)
+        ids = ids[ids >= 0]
+        bits = np.zeros(self._words * 64, dtype=bool)
+        bits[ids] = True
+        return np.packbits(bits, bitorder="little").view(np.uint64)
+
+    def urls_of(self, bitmap):
+        """
+        Converts a bitmap to the list of document URLs, in document ID order.
+
+        Parameters
+        ----------
+        bitmap : numpy.ndarray
+            The bitmap of the documents.
+
+        Returns
+        -------
+        list
+            The URLs of the documents whose bit is set.
+        """
+        bits = np.unpackbits(bitmap.view(np.uint8), bitorder="little")
+        return [self.urls[doc_id] for doc_id in np.flatnonzero(bits[:len(self.urls)])]
+
+    def filter_bitmap(self, filters):
+        """
+        Compiles a structured filter to the bitmap of the matching documents.
+
+        Parameters
+        ----------
+        filters : str | dict
+            The filter expression (see `parse_filters`).
+
+        Returns
+        -------
+        numpy.ndarray
+            The bitmap of the documents matching every clause. Values of a same facet are
+            combined with OR, and unknown facets or values match no document.
+        """
+        result = self.full_bitmap()
+        for facet, values in parse_filters(filters).items():
+            clause = self.empty_bitmap()
+            for value in values:
+                value_bitmap = self.bitmaps.get(facet, {}).get(value)
+                if value_bitmap is not None:
+                    clause |= value_bitmap
+            result &= clause
+        return result
+
+    def filter_urls(self, filters):
+        """
+        Returns the set of document URLs matching a structured filter.
+
+        Parameters
+        ----------
+        filters : str | dict
+            The filter expression (see `parse_filters`).
+
+        Returns
+        -------
+        set
+            The URLs of the matching documents.
+        """
+        return set(self.urls_of(self.filter_bitmap(filters)))
+
+    def facet_counts(self, urls, facets=None):
+        """
+        Counts, for each facet value, the documents of a result set having that value.
+
+        Parameters
+        ----------
+        urls : iterable
+            The URLs of the result set (e.g. the documents returned by `engine.process_query`).
+        facets : list, optional
+            The facets to count (default is all the facets).
+
+        Returns
+        -------
+        dict
+            A dictionary where each facet name maps to a dictionary of value -> number of
+            documents, sorted by decreasing count. Values absent from the result set are left out.
+        """
+        result = self.bitmap_of(urls)
+        counts = {}
+        for facet in facets or self.bitmaps:
+            value_counts = {
+                value: int(np.bitwise_count(result & bitmap).sum())
+                for value, bitmap in self.bitmaps.get(facet, {}).items()
+            }
+            counts[facet] = dict(sorted(
+                ((value, count) for value, count in value_counts.items() if count),
+                key=lambda item: item[1], reverse=True
+            ))
+        return counts
@@ -0,0 +1,277 @@
+import http.client
+import re
+import threading
+import zlib
+from urllib.parse import urljoin, urlparse
+
+try:
+    import brotli  # Optional: only used if the server sends brotli-compressed pages
+except ImportError:
+    brotli = None
+
+# Default timeout (in seconds) of the connection and of each read
+DEFAULT_TIMEOUT = 10
+
+# Maximum size (in bytes) of a decompressed page, larger pages are dropped
+MAX_BODY_SIZE = 5 * 1024 * 1024
+
+# Maximum number of idle connections kept open per host
+MAX_IDLE_CONNECTIONS = 4
+
+# Maximum number of redirects followed for a URL
+MAX_REDIRECTS = 5
+
+# Size (in bytes) of the chunks read from the network
+CHUNK_SIZE = 64 * 1024
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([a-zA-Z0-9_\-]+)""", re.IGNORECASE)
+
+
+class FetchResponse:
+    """
+    Response of a `Fetcher` request.
+
+    Attributes
+    ----------
+    url : str
+        Final URL of the page (after redirects).
+    status : int
+        HTTP status code.
+    headers : dict
+        Response headers, with lowercase names.
+    body : bytes
+        Decompressed body of the response.
+    """
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def charset(self):
+        """
+        Returns the charset of the body: from the Content-Type header, then from a `<meta>`
+        tag at the start of the page, and UTF-8 by default.
+        """
+        match = re.search(r"charset=([^\s;]+)", self.headers.get("content-type", ""), re.IGNORECASE)
+        if match:
+            return match.group(1).strip("\"'")
+        match = META_CHARSET.search(self.body[:2048])
+        if match:
+            return match.group(1).decode("ascii")
+        return "utf-8"
+
+    @property
+    def text(self):
+        """
+        Returns the body decoded with its charset (undecodable bytes are replaced).
+        """
+        try:
+            return self.body.decode(self.charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class Fetcher:
+    """
+    HTTP client keeping connections open between requests to a same host.
+
+    Attributes
+    ----------
+    user_agent : str
+        User-Agent sent with each request.
+    timeout : float
+        Timeout (in seconds) of the connection and of each read.
+    max_body_size : int
+        Maximum size (in bytes) of a decompressed body.
+
+    Implementation Details
+    ----------------------------
+    Idle HTTP/1.1 connections are kept in a pool per scheme and host, so a crawl pays the
+    TCP (and TLS) setup once per host instead of once per page. The pool is protected by a
+    lock and can be shared by the threads of a crawl. Pages are requested compressed
+    (gzip, deflate, and brotli when the `brotli` package is installed), read in chunks and
+    decompressed on the fly, and dropped as soon as their size exceeds `max_body_size`.
+    """
+
+    def __init__(self, user_agent="CrawlerIndexationWeb/1.0", timeout=DEFAULT_TIMEOUT, max_body_size=MAX_BODY_SIZE):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_body_size = max_body_size
+        self._idle = {}  # (scheme, host) -> idle connections
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.bytes_received = 0
+
+    def _get_connection(self, scheme, host):
+        with self._lock:
+            idle = self._idle.get((scheme, host))
+            if idle:
+                return idle.pop(), True
+            self.connections_opened += 1
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, timeout=self.timeout), False
+
+    def _release_connection(self, scheme, host, connection):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, host), [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """
+        Closes all the idle connections.
+        """
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _read_body(self, response):
+        """
+        Reads and decompresses a response body, chunk by chunk.
+
+        Returns
+        -------
+        bytes | None
+            The decompressed body, or None if it is larger than `max_body_size`.
+        """
+        encoding = response.getheader("Content-Encoding", "").lower()
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decompressor = zlib.decompressobj()
+        elif encoding == "br" and brotli is not None:
+            decompressor = brotli.Decompressor()
+        else:
+            decompressor = None
+
+        chunks = []
+        size = 0
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            self.bytes_received += len(chunk)
+            if encoding == "br" and decompressor is not None:
+                chunk = decompressor.process(chunk)
+            elif decompressor is not None:
+                # The output is bounded, so that a small compressed chunk cannot expand past the limit
+                # in memory: input left over once the limit is reached means the body is too large
+                chunk = decompressor.decompress(chunk, self.max_body_size - size + 1)
+                if decompressor.unconsumed_tail:
+                    return None
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+        if decompressor is not None and encoding != "br":
+            chunk = decompressor.flush()
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _request(self, url, headers):
+        """
+        Sends one GET request (without following redirects), retrying once on a stale pooled connection.
+        """
+        parsed_url = urlparse(url)
+        path = parsed_url.path or "/"
+        if parsed_url.query:
+            path += "?" + parsed_url.query
+        request_headers = {"User-Agent": self.user_agent, "Accept-Encoding": ACCEPT_ENCODING}
+        request_headers.update(headers or {})
+
+        for attempt in range(2):
+            connection, reused = self._get_connection(parsed_url.scheme, parsed_url.netloc)
+            try:
+                connection.request("GET", path, headers=request_headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused and attempt == 0:
+                    continue  # The server closed the idle connection, retry with a new one
+                raise
+            except Exception:
+                connection.close()
+                raise
+
+            try:
+                content_length = response.getheader("Content-Length")
+                if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+                    body = None
+                else:
+                    body = self._read_body(response)
+            except Exception:
+                connection.close()
+                raise
+
+            headers_dict = {name.lower(): value for name, value in response.getheaders()}
+            if body is None or response.will_close:
+                connection.close()
+            else:
+                self._release_connection(parsed_url.scheme, parsed_url.netloc, connection)
+            return response.status, headers_dict, body
+
+    def fetch(self, url, headers=None):
+        """
+        Fetches a URL, following redirects.
+
+        Parameters
+        ----------
+        url : str
+            URL of the page to retrieve.
+        headers : dict, optional
+            Additional request headers (e.g. conditional request headers).
+
+        Returns
+        --------
+        FetchResponse | None
+            The response (including error statuses such as 304 or 404), or None if the
+            connection failed or the body is larger than `max_body_size`.
+        """
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                status, response_headers, body = self._request(url, headers)
+                if status in (301, 302, 303, 307, 308) and "location" in response_headers:
+                    url = urljoin(url, response_headers["location"])
+                    continue
+                if body is None:
+                    print(f"Page too large (more than {self.max_body_size} bytes) while requesting {url}")
+                    return None
+                return FetchResponse(url, status, response_headers, body)
+            print(f"Too many redirects while requesting {url}")
+        except Exception as e:
+            print(f"Connection error: {e} while requesting {url}")
+        return None
+
+    def fetch_text(self, url):
+        """
+        Fetches a page and returns its decoded HTML.
+
+        Parameters
+        ----------
+        url : str
+            URL of the page to retrieve.
+
+        Returns
+        --------
+        str | None
+            The HTML content of the page, or None if the request fails.
+        """
+        response = self.fetch(url)
+        if response is None:
+            return None
+        if response.status != 200:
+            print(f"HTTP Error {response.status} while requesting {url}")
+            return None
+        return response.text
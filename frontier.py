@@ -0,0 +1,280 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import tempfile
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Maximum number of URLs kept in memory before the least urgent ones are spilled to disk
+MAX_IN_MEMORY = 100000
+
+# Query parameters that never change the content of a page
+IGNORED_QUERY_PARAMETERS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "fbclid", "gclid"}
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def canonicalize_url(url):
+    """
+    Normalizes a URL so that equivalent URLs are crawled only once.
+
+    Parameters
+    ----------
+    url : str
+        The URL to normalize.
+
+    Returns
+    -------
+    str
+        The canonical URL: lowercase scheme and host, without default port, fragment, tracking
+        parameters or trailing slash (except for the root path), with sorted query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port is not None and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in IGNORED_QUERY_PARAMETERS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def url_fingerprint(url):
+    """
+    Returns a 64-bit fingerprint of a URL.
+
+    Parameters
+    ----------
+    url : str
+        The (canonical) URL.
+
+    Returns
+    -------
+    int
+        The first 8 bytes of the BLAKE2b hash of the URL, as an integer.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class FingerprintSet:
+    """
+    Exact set of seen URLs, storing 64-bit fingerprints instead of the URL strings.
+    """
+
+    def __init__(self):
+        self._fingerprints = set()
+
+    def __contains__(self, url):
+        return url_fingerprint(url) in self._fingerprints
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def add(self, url):
+        self._fingerprints.add(url_fingerprint(url))
+
+
+class BloomFilter:
+    """
+    Approximate set of seen URLs with a fixed memory size, for very large crawls.
+
+    Attributes
+    ----------
+    capacity : int
+        Expected number of URLs.
+    error_rate : float
+        Probability that an unseen URL is reported as seen (and therefore never crawled).
+
+    Implementation Details
+    ----------------------------
+    The filter is a bit array of `-capacity * ln(error_rate) / ln(2)^2` bits, and each URL sets
+    `k` bits derived from two 64-bit halves of its hash (double hashing). It never forgets a
+    URL, but may report a few unseen URLs as seen.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, url):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def __len__(self):
+        return self._count
+
+    def add(self, url):
+        for position in self._positions(url):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+
+class _SpillRun:
+    """
+    Sorted run of frontier entries spilled to a JSONL file, read back one entry at a time.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, "r", encoding="utf-8")
+        self.head = None
+        self.advance()
+
+    def advance(self):
+        line = self._file.readline()
+        self.head = tuple(json.loads(line)) if line else None
+        if self.head is None:
+            self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self.filename)
+
+
+class Frontier:
+    """
+    Priority frontier of a crawl, with URL canonicalization, deduplication and bounded memory.
+
+    Attributes
+    ----------
+    seen : FingerprintSet | BloomFilter
+        URLs already added to the frontier (each URL is added at most once per crawl).
+
+    Implementation Details
+    ----------------------------
+    URLs are canonicalized (`canonicalize_url`) and checked against the seen-set before being
+    queued, so a URL linked from many pages is queued once: the frontier grows with the number
+    of distinct pages, not with the number of links. Entries are ordered by (priority, URL), as
+    the `queue.PriorityQueue` of `crawler.crawl`. At most `max_in_memory` entries stay in an
+    in-memory heap: beyond that, the least urgent half is written as a sorted run to a
+    temporary file, and `pop` merges the heap with the heads of the runs, so the order is kept.
+    """
+
+    def __init__(self, max_in_memory=MAX_IN_MEMORY, bloom_capacity=None, error_rate=0.001, spill_folder=None):
+        self.max_in_memory = max_in_memory
+        self.seen = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else FingerprintSet()
+        self.spill_folder = spill_folder
+        self._heap = []
+        self._runs = []
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
+
+    def __contains__(self, url):
+        return canonicalize_url(url) in self.seen
+
+    def mark_seen(self, url):
+        """
+        Marks a URL as seen without queuing it (e.g. pages visited before resuming a crawl).
+        """
+        self.seen.add(canonicalize_url(url))
+
+    def push(self, url, priority):
+        """
+        Queues a URL if it was never seen before.
+
+        Parameters
+        ----------
+        url : str
+            The URL to crawl.
+        priority : int
+            The priority of the URL (see `crawler.get_priority`), lower is more urgent.
+
+        Returns
+        -------
+        str | None
+            The canonical URL if it was queued, None if it was already seen.
+        """
+        url = canonicalize_url(url)
+        if url in self.seen:
+            return None
+        self.seen.add(url)
+        heapq.heappush(self._heap, (priority, url))
+        self._size += 1
+        if len(self._heap) > self.max_in_memory:
+            self._spill()
+        return url
+
+    def _spill(self):
+        """
+        Writes the least urgent half of the in-memory entries to a sorted run on disk.
+        """
+        self._heap.sort()
+        keep = self.max_in_memory // 2
+        spilled = self._heap[keep:]
+        self._heap = self._heap[:keep]  # A sorted list is a valid heap
+
+        file_descriptor, filename = tempfile.mkstemp(prefix="frontier_", suffix=".jsonl", dir=self.spill_folder)
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            for entry in spilled:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._runs.append(_SpillRun(filename))
+
+    def pop(self):
+        """
+        Removes and returns the most urgent URL.
+
+        Returns
+        -------
+        tuple | None
+            A tuple (priority, url), or None if the frontier is empty.
+        """
+        best_run = None
+        for run in self._runs:
+            if run.head is not None and (best_run is None or run.head < best_run.head):
+                best_run = run
+
+        if best_run is not None and (not self._heap or best_run.head < self._heap[0]):
+            entry = best_run.head
+            best_run.advance()
+            self._runs = [run for run in self._runs if run.head is not None]
+        elif self._heap:
+            entry = heapq.heappop(self._heap)
+        else:
+            return None
+
+        self._size -= 1
+        return entry
+
+    def items(self):
+        """
+        Returns all the queued entries (priority, url), without removing them.
+        """
+        entries = list(self._heap)
+        for run in self._runs:
+            with open(run.filename, "r", encoding="utf-8") as file:
+                file.seek(run._file.tell())
+                entries.append(run.head)
+                entries.extend(tuple(json.loads(line)) for line in file)
+        return entries
+
+    def close(self):
+        """
+        Deletes the spilled runs still on disk.
+        """
+        for run in self._runs:
+            run.close()
+        self._runs = []
@@ -0,0 +1,241 @@
+import json
+import os
+from collections import defaultdict
+from functools import lru_cache
+
+# Default file name of the fuzzy index (saved in the index folder)
+FUZZY_INDEX_FILE = "fuzzy_index.json"
+
+# Maximum edit distance of a correction
+MAX_EDIT_DISTANCE = 2
+
+# Only the first characters of a term are used to generate deletions (keeps the index small)
+PREFIX_LENGTH = 7
+
+# Weight of a correction in the query, according to its edit distance
+DISTANCE_WEIGHTS = {0: 1.0, 1: 0.5, 2: 0.25}
+
+# Number of query tokens whose corrections are kept in memory
+CACHE_SIZE = 4096
+
+
+def generate_deletes(word, max_distance):
+    """
+    Generates all the strings obtained by deleting up to `max_distance` characters from a word.
+
+    Parameters
+    ----------
+    word : str
+        The word to generate deletions from.
+    max_distance : int
+        The maximum number of deleted characters.
+
+    Returns
+    -------
+    set
+        The deletions, including the word itself.
+    """
+    deletes = {word}
+    current = {word}
+    for _ in range(max_distance):
+        following = set()
+        for candidate in current:
+            if len(candidate) > 1:
+                for i in range(len(candidate)):
+                    following.add(candidate[:i] + candidate[i + 1:])
+        following -= deletes
+        deletes |= following
+        current = following
+    return deletes
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Computes the Damerau-Levenshtein distance (optimal string alignment) between two words.
+
+    Parameters
+    ----------
+    a : str
+        The first word.
+    b : str
+        The second word.
+    max_distance : int
+        Distances above this value are not computed exactly.
+
+    Returns
+    -------
+    int
+        The edit distance, or `max_distance + 1` if it is larger than `max_distance`.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class FuzzyIndex:
+    """
+    Deletion index (SymSpell-style) over the vocabulary, for typo-tolerant search.
+
+    Attributes
+    ----------
+    terms : list
+        The vocabulary, the position of a term in the list is its ID in `deletes`.
+    deletes : dict
+        Mapping from each deletion of a term prefix to the IDs of the terms producing it.
+    max_distance : int
+        The maximum edit distance of a correction.
+    prefix_length : int
+        The number of leading characters of a term used to generate deletions.
+
+    Implementation Details
+    ----------------------------
+    All the deletions of up to `max_distance` characters of every term are precomputed at
+    index time. At query time, the deletions of the misspelled token are looked up in this
+    table: the candidates are the terms sharing a deletion with the token, and only those are
+    checked with an exact edit distance. The work therefore depends on the token length, not
+    on the vocabulary size. The corrections of each token are cached.
+    """
+
+    def __init__(self, terms, deletes, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.terms = terms
+        self.deletes = deletes
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.vocabulary = set(terms)
+        self.lookup = lru_cache(maxsize=CACHE_SIZE)(self._lookup)
+
+    def __contains__(self, term):
+        return term in self.vocabulary
+
+    @classmethod
+    def build(cls, terms, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+        """
+        Builds the deletion index of a vocabulary.
+
+        Parameters
+        ----------
+        terms : iterable
+            The vocabulary (e.g. a `TermDictionary` or the keys of an inverted index).
+        max_distance : int, optional
+            The maximum edit distance of a correction (default is 2).
+        prefix_length : int, optional
+            The number of leading characters used to generate deletions (default is 7).
+
+        Returns
+        -------
+        FuzzyIndex
+            The fuzzy index of the vocabulary.
+        """
+        terms = sorted(set(terms))
+        deletes = defaultdict(list)
+        for term_id, term in enumerate(terms):
+            for delete in generate_deletes(term[:prefix_length], max_distance):
+                deletes[delete].append(term_id)
+        return cls(terms, dict(deletes), max_distance, prefix_length)
+
+    def _lookup(self, token):
+        """
+        Finds the terms within `max_distance` edits of a token (use the cached `lookup`).
+
+        Parameters
+        ----------
+        token : str
+            The (possibly misspelled) query token.
+
+        Returns
+        -------
+        tuple
+            Tuples (term, distance) sorted by increasing distance, then alphabetically.
+        """
+        candidates = set()
+        for delete in generate_deletes(token[:self.prefix_length], self.max_distance):
+            candidates.update(self.deletes.get(delete, []))
+
+        corrections = []
+        for term_id in candidates:
+            term = self.terms[term_id]
+            distance = edit_distance(token, term, self.max_distance)
+            if distance <= self.max_distance:
+                corrections.append((term, distance))
+        return tuple(sorted(corrections, key=lambda correction: (correction[1], correction[0])))
+
+    def save(self, filename):
+        """
+        Saves the fuzzy index to a JSON file.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the output JSON file.
+        """
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump({
+                "max_distance": self.max_distance,
+                "prefix_length": self.prefix_length,
+                "terms": self.terms,
+                "deletes": self.deletes
+            }, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Loads a fuzzy index saved with `FuzzyIndex.save`.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the JSON file.
+
+        Returns
+        -------
+        FuzzyIndex | None
+            The loaded fuzzy index, or None if the file does not exist.
+        """
+        if not os.path.exists(filename):
+            print(f"Error: The file {filename} does not exist.")
+            return None
+
+        with open(filename, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        return cls(data["terms"], data["deletes"], data["max_distance"], data["prefix_length"])
+
+
+def expand_query_with_corrections(query_tokens, fuzzy_index):
+    """
+    Adds to the query the vocabulary terms close to its unknown tokens.
+
+    Parameters
+    ----------
+    query_tokens : list
+        A list of tokens representing the query.
+    fuzzy_index : FuzzyIndex
+        The fuzzy index of the vocabulary.
+
+    Returns
+    -------
+    tuple
+        The expanded list of tokens, and a dictionary giving the weight of each correction
+        (`DISTANCE_WEIGHTS` of its edit distance). Tokens of the vocabulary are kept as is.
+    """
+    expanded_query = []
+    token_weights = {}
+    for token in query_tokens:
+        expanded_query.append(token)
+        if token in fuzzy_index:
+            continue
+        for term, distance in fuzzy_index.lookup(token):
+            if term not in token_weights and term not in query_tokens:
+                expanded_query.append(term)
+                token_weights[term] = DISTANCE_WEIGHTS.get(distance, 0)
+    return expanded_query, token_weights
@@ -0,0 +1,5 @@
+# Common English stopwords skipped by create_index.py when it builds the positional indexes.
+# They are shared with the engine, which needs them to map the stored token positions back to
+# the words of a description (see doc_store.highlight_snippet), without importing the indexer.
+STOPWORDS = set(["the", "a", "an", "and", "or", "of", "to", "in", "on", "with", "for", "by", "at", "from",
+                 "is", "it", "this", "that", "as", "are", "was", "were", "be", "been", "has", "have", "had"])
@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+import numpy as np
+from frontier import canonicalize_url
+
+# Folders inspected by default: the indexes built by create_index.py and the provided indexes
+INDEX_FOLDERS = ["index", "index_provided"]
+
+# Terms found in at least this fraction of the documents of an index are stopword candidates
+STOPWORD_DOCUMENT_RATIO = 0.5
+
+# Share of the memory of a positional index taken by positions above which compression is recommended
+POSITION_OVERHEAD_WARNING = 0.3
+
+
+def deep_sizeof(obj):
+    """
+    Estimates the memory used by a loaded JSON structure.
+
+    Parameters
+    ----------
+    obj : object
+        The structure (dicts, lists, strings, numbers).
+
+    Returns
+    -------
+    int
+        The total size (in bytes) of the objects reachable from `obj`, each counted once
+        (strings shared between entries, such as the keys memoized by `json.load`, are only
+        counted once, as in memory).
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+    return total
+
+
+def is_url(value):
+    return isinstance(value, str) and value.startswith(("http://", "https://"))
+
+
+def index_kind(data):
+    """
+    Recognizes the structure of an index file.
+
+    Returns
+    -------
+    str
+        'positional' (token -> URL -> positions), 'postings' (token -> URLs), 'documents'
+        (URL -> fields, e.g. the reviews index) or 'other'.
+    """
+    if not isinstance(data, dict) or not data:
+        return "other"
+    key, value = next(iter(data.items()))
+    if is_url(key) and isinstance(value, dict):
+        return "documents"
+    if isinstance(value, dict) and value and is_url(next(iter(value))):
+        return "positional"
+    if isinstance(value, list) and value and is_url(value[0]):
+        return "postings"
+    return "other"
+
+
+def distribution(values):
+    """
+    Summarizes a distribution of counts (min, mean, percentiles and max).
+    """
+    if not values:
+        return {}
+    values = np.asarray(values)
+    return {
+        "min": int(values.min()),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": int(values.max())
+    }
+
+
+def url_statistics(urls):
+    """
+    Measures how many documents of an index are variants or duplicates of another URL.
+
+    Parameters
+    ----------
+    urls : set
+        The document URLs of the index.
+
+    Returns
+    -------
+    dict
+        The number of documents, the share of product variants ('?variant=') and the share of
+        URLs that are equal to another one once canonicalized (see `frontier.canonicalize_url`).
+    """
+    if not urls:
+        return {"documents": 0}
+    variants = sum("variant=" in url for url in urls)
+    canonical_urls = {canonicalize_url(url) for url in urls}
+    return {
+        "documents": len(urls),
+        "variant_ratio": variants / len(urls),
+        "duplicate_url_ratio": 1 - len(canonical_urls) / len(urls)
+    }
+
+
+def inspect_index_file(path, top=10):
+    """
+    Inspects an index file.
+
+    Parameters
+    ----------
+    path : str
+        The path to the index file (JSON indexes are analyzed, other files only measured).
+    top : int, optional
+        The number of heaviest terms and of recommendations listed (default is 10).
+
+    Returns
+    -------
+    dict
+        The file size on disk, and for JSON indexes the kind of index, its estimated size in
+        memory, vocabulary size, posting-length distribution, heaviest terms, position-list
+        overhead, variant and duplicate URL ratios and pruning recommendations.
+    """
+    report = {"file": os.path.basename(path), "disk_bytes": os.path.getsize(path)}
+    if not path.endswith(".json"):
+        report["kind"] = "binary"
+        return report
+
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    kind = index_kind(data)
+    report["kind"] = kind
+    report["memory_bytes"] = deep_sizeof(data)
+    report["entries"] = len(data) if isinstance(data, (dict, list)) else 1
+
+    if kind == "documents":
+        report.update(url_statistics(set(data)))
+        return report
+    if kind not in ("positional", "postings"):
+        return report
+
+    posting_lengths = {token: len(postings) for token, postings in data.items()}
+    urls = {url for postings in data.values() for url in postings}
+    report["vocabulary"] = len(data)
+    report["postings"] = sum(posting_lengths.values())
+    report["posting_lengths"] = distribution(list(posting_lengths.values()))
+    report["heaviest_terms"] = [[token, length] for token, length in Counter(posting_lengths).most_common(top)]
+    report.update(url_statistics(urls))
+
+    if kind == "positional":
+        positions = [len(positions) for postings in data.values() for positions in postings.values()]
+        position_lists = [positions for postings in data.values() for positions in postings.values()]
+        report["positions"] = sum(positions)
+        report["positions_per_posting"] = distribution(positions)
+        report["position_bytes"] = deep_sizeof(position_lists) - sys.getsizeof(position_lists)
+        report["position_overhead"] = report["position_bytes"] / report["memory_bytes"]
+
+    report["recommendations"] = recommend(posting_lengths, len(urls), report, top)
+    return report
+
+
+def recommend(posting_lengths, num_documents, report, top=10):
+    """
+    Suggests stopwords, pruning and compression settings for an inverted index.
+
+    Parameters
+    ----------
+    posting_lengths : dict
+        The number of documents of each term.
+    num_documents : int
+        The number of documents of the index.
+    report : dict
+        The report of the index (see `inspect_index_file`).
+    top : int, optional
+        The maximum number of stopword candidates listed (default is 10).
+
+    Returns
+    -------
+    dict
+        'stopword_candidates' (terms in at least half of the documents, which barely change the
+        ranking but have the longest postings), 'rare_terms' (terms of a single document),
+        the share of postings each group accounts for, and 'notes'.
+    """
+    total_postings = sum(posting_lengths.values()) or 1
+    frequent = sorted((token for token, length in posting_lengths.items()
+                       if length >= STOPWORD_DOCUMENT_RATIO * num_documents and num_documents > 1),
+                      key=lambda token: -posting_lengths[token])
+    rare = [token for token, length in posting_lengths.items() if length == 1]
+    numeric = [token for token in posting_lengths if token.isdigit()]
+
+    notes = []
+    if frequent:
+        notes.append(f"{len(frequent)} terms appear in at least {STOPWORD_DOCUMENT_RATIO:.0%} of the documents and "
+                     f"hold {sum(posting_lengths[t] for t in frequent) / total_postings:.0%} of the postings: "
+                     f"add them to the stopwords or prune their postings.")
+    if rare:
+        notes.append(f"{len(rare) / len(posting_lengths):.0%} of the vocabulary appears in a single document: "
+                     f"pruning these terms shrinks the vocabulary but makes them unsearchable.")
+    if numeric:
+        notes.append(f"{len(numeric)} terms are numbers (sizes, pagination): consider dropping them at indexing time.")
+    if report.get("position_overhead", 0) > POSITION_OVERHEAD_WARNING:
+        notes.append(f"Positions take {report['position_overhead']:.0%} of the memory of the index: store them "
+                     f"delta-encoded in arrays, or drop them if phrase queries are not needed.")
+    if report.get("variant_ratio", 0) > 0.5:
+        notes.append(f"{report['variant_ratio']:.0%} of the documents are product variants: index only one page per "
+                     f"product (see near_duplicates.py).")
+
+    return {
+        "stopword_candidates": frequent[:top],
+        "stopword_postings_share": sum(posting_lengths[token] for token in frequent) / total_postings,
+        "rare_terms": len(rare),
+        "rare_postings_share": len(rare) / total_postings,
+        "numeric_terms": len(numeric),
+        "notes": notes
+    }
+
+
+def inspect_folder(folder, top=10):
+    """
+    Inspects all the index files of a folder.
+
+    Parameters
+    ----------
+    folder : str
+        The directory of the index files (e.g. 'index' or 'index_provided').
+    top : int, optional
+        The number of heaviest terms and of recommendations listed per index (default is 10).
+
+    Returns
+    -------
+    dict
+        The report of each file ('files'), and the total size on disk and estimated size in
+        memory of the JSON indexes of the folder.
+    """
+    if not os.path.isdir(folder):
+        print(f"Error: The folder {folder} does not exist.")
+        return {"folder": folder, "files": []}
+
+    files = [inspect_index_file(os.path.join(folder, name), top) for name in sorted(os.listdir(folder))
+             if os.path.isfile(os.path.join(folder, name)) and name.endswith((".json", ".npz", ".bin"))]
+    return {
+        "folder": folder,
+        "disk_bytes": sum(report["disk_bytes"] for report in files),
+        "memory_bytes": sum(report.get("memory_bytes", 0) for report in files),
+        "files": files
+    }
+
+
+def format_report(folder_report):
+    """
+    Formats the report of a folder as readable text.
+    """
+    lines = [f"== {folder_report['folder']}: {folder_report.get('disk_bytes', 0) / 1024:.1f} KB on disk, "
+             f"~{folder_report.get('memory_bytes', 0) / 1024:.1f} KB in memory"]
+    for report in folder_report["files"]:
+        line = f"- {report['file']} ({report['kind']}): {report['disk_bytes'] / 1024:.1f} KB on disk"
+        if "memory_bytes" in report:
+            line += f", ~{report['memory_bytes'] / 1024:.1f} KB in memory"
+        lines.append(line)
+        if "vocabulary" in report:
+            lengths = report["posting_lengths"]
+            lines.append(f"    {report['vocabulary']} terms, {report['postings']} postings, {report['documents']} "
+                         f"documents, posting length mean {lengths['mean']:.1f} / p50 {lengths['p50']:.0f} / "
+                         f"p99 {lengths['p99']:.0f} / max {lengths['max']}")
+            lines.append("    heaviest terms: " + ", ".join(f"{token} ({length})" for token, length in report["heaviest_terms"]))
+        if "positions" in report:
+            lines.append(f"    {report['positions']} positions, {report['position_overhead']:.0%} of the memory")
+        if "variant_ratio" in report:
+            lines.append(f"    variants {report['variant_ratio']:.0%}, duplicate URLs {report['duplicate_url_ratio']:.0%}")
+        for note in report.get("recommendations", {}).get("notes", []):
+            lines.append(f"    * {note}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the size and content of the index files.")
+    parser.add_argument("folders", nargs="*", default=INDEX_FOLDERS, help="index folders to inspect")
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest terms listed per index")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    reports = [inspect_folder(folder, args.top) for folder in args.folders]
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+    else:
+        print("\n\n".join(format_report(report) for report in reports))
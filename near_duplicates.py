@@ -0,0 +1,200 @@
+import hashlib
+import json
+import re
+import numpy as np
+from collections import Counter
+
+# Number of bits of a SimHash fingerprint
+SIMHASH_BITS = 64
+
+# Maximum number of differing bits between two near-duplicate pages
+MAX_DISTANCE = 6
+
+# Length (in characters) of the shingles hashed into the fingerprint
+SHINGLE_SIZE = 4
+
+DUPLICATES_INDEX_FILE = "duplicates_index.json"
+
+
+def page_text(doc):
+    """
+    Returns the normalized indexed text of a page: title, description (or first paragraph) and features.
+
+    Parameters
+    ----------
+    doc : dict
+        A product document, or the data extracted from a page by the crawler.
+
+    Returns
+    -------
+    str
+        The lowercase words of the page, joined by single spaces.
+    """
+    fields = [doc.get("title", ""), doc.get("description") or doc.get("first_paragraph", "")]
+    fields.extend(str(value) for value in (doc.get("product_features") or {}).values())
+    return " ".join(re.findall(r"\w+", " ".join(field for field in fields if field).lower()))
+
+
+def simhash(text, shingle_size=SHINGLE_SIZE):
+    """
+    Computes the 64-bit SimHash fingerprint of a text.
+
+    Parameters
+    ----------
+    text : str
+        The normalized text of the page (see `page_text`).
+    shingle_size : int, optional
+        Length of the character shingles (default is 4).
+
+    Returns
+    -------
+    int
+        The fingerprint: bit i is set if the shingles whose hash has bit i set outweigh the others.
+
+    Implementation Details
+    ----------------------------
+    Character shingles rather than words are hashed, because the indexed text of a page is
+    short: "product page 1" and "product page 2" differ by one word out of three, but only by
+    a few shingles out of a dozen. Similar texts therefore get fingerprints differing by a few
+    bits, while unrelated texts differ by about half of the bits.
+    """
+    shingles = Counter(text[i:i + shingle_size] for i in range(max(1, len(text) - shingle_size + 1)))
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(shingles), 8), axis=1)
+    counts = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles))
+    weights = counts @ (2 * bits.astype(np.int64) - 1)  # +count where the bit is set, -count otherwise
+    return int.from_bytes(np.packbits(weights > 0).tobytes(), "big")
+
+
+def hamming_distance(first, second):
+    """
+    Returns the number of differing bits between two fingerprints.
+    """
+    return (first ^ second).bit_count()
+
+
+class SimHashIndex:
+    """
+    Banded index of SimHash fingerprints, used to find the near-duplicates of a page.
+
+    Attributes
+    ----------
+    max_distance : int
+        Maximum Hamming distance between the fingerprints of two near-duplicate pages.
+    canonical : dict
+        Maps each near-duplicate URL to the URL of its canonical page (the first page seen).
+
+    Implementation Details
+    ----------------------------
+    The 64 bits of the fingerprints are split in `max_distance + 1` bands. Two fingerprints
+    differing by at most `max_distance` bits are equal on at least one band, so the candidates
+    of a page are the canonical pages sharing one of its bands, and only those are compared
+    bit by bit instead of all the pages.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        limits = [round(i * SIMHASH_BITS / bands) for i in range(bands + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in zip(limits, limits[1:])]
+        self._buckets = [{} for _ in self._bands]
+        self._fingerprints = {}  # Canonical URL -> fingerprint
+        self.canonical = {}
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def find(self, fingerprint):
+        """
+        Returns the canonical page closest to a fingerprint, within `max_distance` bits.
+
+        Parameters
+        ----------
+        fingerprint : int
+            The SimHash fingerprint of the page.
+
+        Returns
+        -------
+        str | None
+            The URL of the canonical page, or None if the page has no near-duplicate.
+        """
+        best_url, best_distance = None, self.max_distance + 1
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            for url in buckets.get(fingerprint >> shift & mask, ()):
+                distance = hamming_distance(fingerprint, self._fingerprints[url])
+                if distance < best_distance or (distance == best_distance and url < best_url):
+                    best_url, best_distance = url, distance
+        return best_url
+
+    def add(self, url, fingerprint):
+        """
+        Adds a canonical page to the index.
+        """
+        self._fingerprints[url] = fingerprint
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            buckets.setdefault(fingerprint >> shift & mask, []).append(url)
+
+    def check(self, doc):
+        """
+        Checks whether a page is a near-duplicate of a page already seen, and records it.
+
+        Parameters
+        ----------
+        doc : dict
+            The page (product document or crawled page data), with its 'url'.
+
+        Returns
+        -------
+        str | None
+            The URL of the canonical page if the page is a near-duplicate, None if it is new
+            (it then becomes a canonical page).
+        """
+        url = doc["url"]
+        if url in self._fingerprints:
+            return None
+        if url in self.canonical:
+            return self.canonical[url]
+
+        fingerprint = simhash(page_text(doc))
+        canonical_url = self.find(fingerprint)
+        if canonical_url is None:
+            self.add(url, fingerprint)
+        else:
+            self.canonical[url] = canonical_url
+        return canonical_url
+
+    def duplicates_of(self, url):
+        """
+        Returns the URLs of the near-duplicates linked to a canonical page.
+        """
+        return [duplicate for duplicate, canonical_url in self.canonical.items() if canonical_url == url]
+
+    def save(self, filename):
+        """
+        Saves the near-duplicate URLs and their canonical page to a JSON file.
+        """
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(self.canonical, file, indent=4, ensure_ascii=False)
+
+
+def deduplicate(data, index=None):
+    """
+    Separates the canonical pages from their near-duplicates.
+
+    Parameters
+    ----------
+    data : list
+        A list of product documents (or crawled page data).
+    index : SimHashIndex, optional
+        An index of the pages already seen (default is a new empty index).
+
+    Returns
+    -------
+    tuple
+        The list of canonical documents, in their original order, and the `SimHashIndex`
+        linking each near-duplicate URL to its canonical page.
+    """
+    if index is None:
+        index = SimHashIndex()
+    unique_docs = [doc for doc in data if index.check(doc) is None]
+    return unique_docs, index
@@ -0,0 +1,311 @@
+import os
+import numpy as np
+
+# Default file name of the columnar reviews store (saved in the index folder)
+REVIEWS_STORE_FILE = "reviews_store.npz"
+
+# Ratings are integers from 1 to 5, one histogram bin per rating
+RATING_LEVELS = 5
+
+# Keys of the JSON reviews index, shared by create_index.py and engine.py
+TOTAL_REVIEWS_KEY = "total_reviews"
+MEAN_RATING_KEY = "mean_mark"
+LAST_RATING_KEY = "last_rating"
+LEGACY_MEAN_RATING_KEY = "average_rating"  # Older index/reviews_index.json files
+
+
+class ReviewsStore:
+    """
+    Columnar store of review aggregates, indexed by document ID.
+
+    Attributes
+    ----------
+    urls : list
+        Document URLs, the position of a URL in the list is its document ID.
+    doc_ids : dict
+        Reverse mapping from document URL to document ID.
+    count : numpy.ndarray
+        Total number of reviews of each document (int32).
+    mean : numpy.ndarray
+        Average rating of each document (float64).
+    last : numpy.ndarray
+        Rating of the last review of each document, 0 if unknown (int8).
+    histogram : numpy.ndarray
+        Number of reviews per rating level, shape (documents, RATING_LEVELS) (int32).
+
+    Implementation Details
+    ----------------------------
+    The arrays are over-allocated and grown by doubling, so that adding new documents
+    one at a time stays cheap. Only the first `len(urls)` rows are meaningful, and the
+    public arrays are views on that part.
+    """
+
+    def __init__(self, capacity=16):
+        self.urls = []
+        self.doc_ids = {}
+        self._count = np.zeros(capacity, dtype=np.int32)
+        self._mean = np.zeros(capacity, dtype=np.float64)
+        self._last = np.zeros(capacity, dtype=np.int8)
+        self._histogram = np.zeros((capacity, RATING_LEVELS), dtype=np.int32)
+        self._boost = None
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, url):
+        return url in self.doc_ids
+
+    @property
+    def count(self):
+        return self._count[:len(self.urls)]
+
+    @property
+    def mean(self):
+        return self._mean[:len(self.urls)]
+
+    @property
+    def last(self):
+        return self._last[:len(self.urls)]
+
+    @property
+    def histogram(self):
+        return self._histogram[:len(self.urls)]
+
+    def _grow(self, size):
+        """
+        Grows the underlying arrays so that they can hold at least `size` documents.
+
+        Parameters
+        ----------
+        size : int
+            The number of documents the arrays must be able to hold.
+        """
+        capacity = len(self._count)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._count = np.resize(self._count, capacity)
+        self._mean = np.resize(self._mean, capacity)
+        self._last = np.resize(self._last, capacity)
+        self._histogram = np.resize(self._histogram, (capacity, RATING_LEVELS))
+        self._count[len(self.urls):] = 0
+        self._mean[len(self.urls):] = 0
+        self._last[len(self.urls):] = 0
+        self._histogram[len(self.urls):] = 0
+
+    def get_or_add_doc(self, url):
+        """
+        Returns the document ID of a URL, adding an empty row for it if needed.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the document.
+
+        Returns
+        -------
+        int
+            The document ID of the URL.
+        """
+        doc_id = self.doc_ids.get(url)
+        if doc_id is None:
+            doc_id = len(self.urls)
+            self._grow(doc_id + 1)
+            self.urls.append(url)
+            self.doc_ids[url] = doc_id
+        return doc_id
+
+    def add_reviews(self, url, reviews):
+        """
+        Incrementally updates the aggregates of a document with new reviews.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the reviewed document.
+        reviews : list
+            A list of review dictionaries with a 'rating' key, in chronological order. Reviews
+            without a numeric rating are skipped.
+        """
+        doc_id = self.get_or_add_doc(url)
+        ratings = [review.get("rating") for review in reviews]
+        ratings = [rating for rating in ratings if isinstance(rating, (int, float)) and not isinstance(rating, bool)]
+        if not ratings:
+            return
+
+        previous_count = int(self._count[doc_id])
+        new_count = previous_count + len(ratings)
+        self._mean[doc_id] = (self._mean[doc_id] * previous_count + sum(ratings)) / new_count
+        self._count[doc_id] = new_count
+        self._last[doc_id] = ratings[-1]
+        for rating in ratings:
+            if 1 <= rating <= RATING_LEVELS:
+                self._histogram[doc_id, int(rating) - 1] += 1
+        self._boost = None
+
+    def set_aggregates(self, url, total_reviews, mean_rating, last_rating):
+        """
+        Sets the aggregates of a document directly (used when loading a JSON reviews index).
+
+        Parameters
+        ----------
+        url : str
+            The URL of the document.
+        total_reviews : int
+            The total number of reviews.
+        mean_rating : float
+            The average rating.
+        last_rating : int | None
+            The rating of the last review.
+        """
+        doc_id = self.get_or_add_doc(url)
+        self._count[doc_id] = total_reviews or 0
+        self._mean[doc_id] = mean_rating or 0
+        self._last[doc_id] = last_rating or 0
+        self._boost = None
+
+    def lookup(self, urls):
+        """
+        Maps document URLs to document IDs.
+
+        Parameters
+        ----------
+        urls : iterable
+            The document URLs to look up.
+
+        Returns
+        -------
+        numpy.ndarray
+            The document IDs, -1 for URLs that are not in the store.
+        """
+        return np.fromiter((self.doc_ids.get(url, -1) for url in urls), dtype=np.int64)
+
+    def rating_boost(self):
+        """
+        Returns the review boost of every document, as used by `engine.rank_documents`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The boost of each document: the rating normalized to 5 stars, plus a bonus
+            for perfect (5), excellent (> 4.5), very good (> 4) and good (> 3) ratings.
+
+        Implementation Details
+        ----------------------------
+        The boosts are computed once for all documents and cached until the store changes.
+        """
+        if self._boost is None:
+            mean = self.mean
+            bonus = np.select([mean == 5, mean > 4.5, mean > 4, mean > 3], [5, 3, 2, 1], default=0)
+            self._boost = mean / 5 + bonus
+        return self._boost
+
+    def filter_min_rating(self, urls, min_rating):
+        """
+        Keeps the URLs whose average rating is at least `min_rating`.
+
+        Parameters
+        ----------
+        urls : list
+            The document URLs to filter.
+        min_rating : float
+            The minimum average rating (e.g. 4 for "rating >= 4").
+
+        Returns
+        -------
+        list
+            The URLs with an average rating of at least `min_rating`, in their original order.
+        """
+        ids = self.lookup(urls)
+        mask = ids >= 0
+        mask[mask] = self.mean[ids[mask]] >= min_rating
+        return [url for url, keep in zip(urls, mask) if keep]
+
+    def to_index(self):
+        """
+        Converts the store to the JSON reviews index format.
+
+        Returns
+        -------
+        dict
+            A dictionary where each document URL maps to its total number of reviews,
+            its mean rating and its last rating.
+        """
+        return {
+            url: {
+                TOTAL_REVIEWS_KEY: int(count),
+                MEAN_RATING_KEY: float(mean),
+                LAST_RATING_KEY: int(last)
+            } for url, count, mean, last in zip(self.urls, self.count, self.mean, self.last)
+        }
+
+    @classmethod
+    def from_index(cls, reviews_index):
+        """
+        Builds a store from a JSON reviews index.
+
+        Parameters
+        ----------
+        reviews_index : dict
+            A dictionary where each document URL maps to its review data, using either the
+            'mean_mark' key or the older 'average_rating' key for the mean rating.
+
+        Returns
+        -------
+        ReviewsStore
+            The columnar store holding the same aggregates (without rating histograms).
+        """
+        store = cls(capacity=max(16, len(reviews_index)))
+        for url, reviews in reviews_index.items():
+            mean_rating = reviews.get(MEAN_RATING_KEY, reviews.get(LEGACY_MEAN_RATING_KEY))
+            store.set_aggregates(url, reviews.get(TOTAL_REVIEWS_KEY), mean_rating, reviews.get(LAST_RATING_KEY))
+        return store
+
+    def save(self, filename):
+        """
+        Saves the store to a compressed NumPy file.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the output .npz file.
+        """
+        np.savez_compressed(
+            filename,
+            urls=np.array(self.urls, dtype=str),
+            count=self.count,
+            mean=self.mean,
+            last=self.last,
+            histogram=self.histogram
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Loads a store saved with `ReviewsStore.save`.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the .npz file.
+
+        Returns
+        -------
+        ReviewsStore
+            The loaded store, or an empty store if the file does not exist.
+        """
+        if not os.path.exists(filename):
+            print(f"Error: The file {filename} does not exist.")
+            return cls()
+
+        with np.load(filename) as arrays:
+            urls = arrays["urls"].tolist()
+            store = cls(capacity=max(16, len(urls)))
+            store.urls = urls
+            store.doc_ids = {url: doc_id for doc_id, url in enumerate(urls)}
+            store._count[:len(urls)] = arrays["count"]
+            store._mean[:len(urls)] = arrays["mean"]
+            store._last[:len(urls)] = arrays["last"]
+            store._histogram[:len(urls)] = arrays["histogram"]
+        return store
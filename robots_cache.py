@@ -0,0 +1,168 @@
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+# Time (in seconds) during which a downloaded robots.txt is reused
+ROBOTS_CACHE_TTL = 24 * 3600
+
+# Time (in seconds) during which a robots.txt that could not be read keeps its host blocked
+NEGATIVE_CACHE_TTL = 10 * 60
+
+
+class RobotsCache:
+    """
+    Cache of the robots.txt rules of each host, shared by all the workers of a crawl.
+
+    Attributes
+    ----------
+    user_agent : str
+        User-Agent whose rules are checked.
+    ttl : float
+        Time (in seconds) during which a downloaded robots.txt is reused.
+    negative_ttl : float
+        Time (in seconds) during which a failed robots.txt download blocks its host.
+    fetcher : Fetcher | None
+        HTTP client used to download robots.txt (reusing the crawl's connections), or None to
+        let `RobotFileParser` open its own connection.
+
+    Implementation Details
+    ----------------------------
+    Entries are keyed by scheme and host ("https://web-scraping.dev"), so robots.txt is
+    downloaded once per host and checking a URL afterwards is an in-memory lookup. As in
+    `crawler.can_fetch`, a robots.txt that cannot be read forbids the crawl of its host; this
+    negative result is cached too (for a shorter time), so an unreachable host is not retried
+    for every URL, and a transient server error (5xx) only blocks the host for `negative_ttl`.
+    A lock per host makes concurrent workers wait for a single download.
+    """
+
+    def __init__(self, user_agent="CrawlerIndexationWeb/1.0", ttl=ROBOTS_CACHE_TTL, negative_ttl=NEGATIVE_CACHE_TTL,
+                 fetcher=None):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.fetcher = fetcher
+        self._entries = {}  # scheme://host -> (parser or None, expiry time)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.downloads = 0
+
+    @staticmethod
+    def host_key(url):
+        """
+        Returns the cache key of a URL: its scheme and host.
+        """
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def _cached_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry
+        return None
+
+    def is_cached(self, url):
+        """
+        Returns True if the robots.txt of the URL's host is in the cache and not expired.
+        """
+        return self._cached_entry(self.host_key(url)) is not None
+
+    def get_parser(self, url):
+        """
+        Returns the robots.txt parser of the URL's host, downloading robots.txt if needed.
+
+        Parameters
+        ----------
+        url : str
+            URL of a page of the host.
+
+        Returns
+        -------
+        RobotFileParser | None
+            The parsed rules of the host, or None if its robots.txt could not be read.
+        """
+        key = self.host_key(url)
+        entry = self._cached_entry(key)
+        if entry is not None:
+            return entry[0]
+
+        with self._lock:
+            host_lock = self._locks.setdefault(key, threading.Lock())
+        with host_lock:
+            # Another worker may have downloaded it while we were waiting
+            entry = self._cached_entry(key)
+            if entry is not None:
+                return entry[0]
+
+            rp = RobotFileParser()
+            self.downloads += 1
+            try:
+                rp.set_url(f"{key}/robots.txt")
+                if self.fetcher is None:
+                    rp.read()
+                else:
+                    self._read_with_fetcher(rp)
+                if not (rp.allow_all or rp.disallow_all or rp.mtime()):
+                    # Server errors leave the parser unset, and it would then forbid the host for `ttl`
+                    raise OSError(f"no rules read from {rp.url}")
+                self._entries[key] = (rp, time.monotonic() + self.ttl)
+                return rp
+            except Exception as e:
+                print(f"Unable to read robots.txt: {e}")
+                self._entries[key] = (None, time.monotonic() + self.negative_ttl)
+                return None
+
+    def _read_with_fetcher(self, rp):
+        """
+        Downloads and parses robots.txt with the crawl's fetcher, with the same rules as
+        `RobotFileParser.read`: 401 and 403 forbid everything, other 4xx allow everything.
+        Other statuses (5xx) raise an `OSError`, and are cached as a failed download.
+        """
+        response = self.fetcher.fetch(rp.url)
+        if response is None:
+            raise OSError(f"unable to download {rp.url}")
+        if response.status in (401, 403):
+            rp.disallow_all = True
+        elif 400 <= response.status < 500:
+            rp.allow_all = True
+        elif response.status == 200:
+            rp.parse(response.text.splitlines())
+        else:
+            raise OSError(f"HTTP status {response.status} for {rp.url}")
+
+    def can_fetch(self, url):
+        """
+        Checks if the robots.txt of the URL's host allows crawling it.
+
+        Parameters
+        ----------
+        url : str
+            URL of the page to be crawled.
+
+        Returns
+        -------
+        bool
+            True if crawling is allowed, False otherwise (including when robots.txt cannot be read).
+        """
+        rp = self.get_parser(url)
+        return rp is not None and rp.can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """
+        Returns the `Crawl-delay` of the URL's host for our User-Agent.
+
+        Parameters
+        ----------
+        url : str
+            URL of a page of the host.
+
+        Returns
+        -------
+        float | None
+            The delay (in seconds) between two requests asked by the host, or None if it does not set one.
+        """
+        rp = self.get_parser(url)
+        if rp is None:
+            return None
+        delay = rp.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
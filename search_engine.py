@@ -1,5 +1,10 @@
 import json
-from engine import process_query, load_json_file
+import os
+from engine import (process_query, load_json_file, format_results, tokenize_text, load_fuzzy_index,
+                    load_description_postings, DOC_STORE_PATHS)
+from reviews_store import ReviewsStore
+from facets import FacetIndex, FACET_INDEX_FILES
+from doc_store import DocumentStore
 
 # Load index data from JSON files
 paths = {
@@ -13,13 +18,26 @@ paths = {
 origin_index = load_json_file(paths["origin"])
 origin_synonyms = load_json_file(paths["synonyms"])
 title_index = load_json_file(paths["title"])
-review_index = load_json_file(paths["reviews"])
+review_index = ReviewsStore.from_index(load_json_file(paths["reviews"]))
+facet_index = FacetIndex.build({facet: load_json_file(path) for facet, path in FACET_INDEX_FILES.items()})
 
+# Stored fields (titles, descriptions) used to render the results, built by create_index.py
+doc_store = DocumentStore.open(*DOC_STORE_PATHS) if os.path.exists(DOC_STORE_PATHS[0]) else None
 
 
 
-# Request
+
+# Request, and number of results rendered with their stored title and snippet
 test_query = "Dragon Energy Potion"
+top_k = 10
+
+# Typo-tolerant search: misspelled tokens are matched to vocabulary terms within 1-2 edits,
+# using the fuzzy index built by create_index.py (or the searched vocabulary if it was not built)
+use_fuzzy_search = False
+fuzzy_index = load_fuzzy_index(vocabulary=set(title_index) | set(origin_index)) if use_fuzzy_search else None
+
+# Structured filters on brand, origin and domain (e.g. "brand=chocodelight AND origin=switzerland")
+filters = None
 
 
 
@@ -31,20 +49,22 @@ ranked_results = process_query(
     origin_synonyms,
     title_index,
     review_index,
-    match_all=True
+    match_all=True,
+    fuzzy_index=fuzzy_index,
+    filters=filters,
+    facet_index=facet_index
 )
 
+# Only the description postings of the query tokens are read, to highlight the snippets of the top k results
+query_tokens = tokenize_text(test_query)
+description_index = load_description_postings(query_tokens) if doc_store is not None else None
+
 # Format the results for display or to save them in a file
 output = {
     "total_documents": len(origin_index),
     "filtered_documents": len(ranked_results),
-    "results": [
-        {
-            "title": doc,
-            "url": doc,
-            "score": score
-        } for doc, score in ranked_results
-    ]
+    "facets": facet_index.facet_counts([doc for doc, _ in ranked_results]),
+    "results": format_results(ranked_results, doc_store, query_tokens, description_index, k=top_k)
 }
 
 # Save the results to a JSON file
@@ -0,0 +1,305 @@
+import hashlib
+import heapq
+import json
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from engine import process_query, load_json_file, ensure_unique_scores
+
+# Directory of the shards, and file describing them (number of shards, global statistics, synonyms)
+SHARDS_FOLDER = os.path.join("index", "shards")
+SHARDS_MANIFEST = "shards.json"
+
+# Indexes searched by `search_engine.py`, split between the shards
+INDEX_PATHS = {
+    "origin": "index_provided/origin_index.json",
+    "synonyms": "index_provided/origin_synonyms.json",
+    "reviews": "index_provided/reviews_index.json",
+    "title": "index_provided/title_index.json"
+}
+
+SHARD_FILES = {
+    "origin": "origin_index.json",
+    "title": "title_index.json",
+    "reviews": "reviews_index.json"
+}
+
+
+def shard_of(url, num_shards):
+    """
+    Returns the shard of a document: a stable hash of its URL modulo the number of shards.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big") % num_shards
+
+
+def compute_global_stats(index_data):
+    """
+    Computes the BM25 statistics of a whole index, shared by all its shards.
+
+    Parameters
+    ----------
+    index_data : dict
+        The index scored by BM25 (token -> documents).
+
+    Returns
+    -------
+    dict
+        'N' and 'avgdl' as computed by `engine.compute_bm25`, and the document frequency 'df' of each token.
+    """
+    N = len(index_data)
+    return {
+        "N": N,
+        "avgdl": sum(len(docs) for docs in index_data.values()) / N if N else 0.0,
+        "df": {token: len(docs) for token, docs in index_data.items()}
+    }
+
+
+def split_index(index, num_shards):
+    """
+    Splits an inverted index (token -> list of URLs or URL -> positions) by document.
+
+    Returns
+    -------
+    list
+        One index per shard, holding only the postings of the documents of that shard.
+    """
+    shards = [{} for _ in range(num_shards)]
+    for token, postings in index.items():
+        for url in postings:
+            shard = shards[shard_of(url, num_shards)]
+            if isinstance(postings, dict):
+                shard.setdefault(token, {})[url] = postings[url]
+            else:
+                shard.setdefault(token, []).append(url)
+    return shards
+
+
+def build_shards(num_shards, paths=INDEX_PATHS, folder=SHARDS_FOLDER):
+    """
+    Splits the indexes into document-partitioned shards.
+
+    Parameters
+    ----------
+    num_shards : int
+        The number of shards.
+    paths : dict, optional
+        The paths of the 'origin', 'synonyms', 'reviews' and 'title' index files.
+    folder : str, optional
+        The directory of the shards (default is 'index/shards').
+
+    Implementation Details
+    ----------------------------
+    Each document is assigned to one shard by a hash of its URL, and every shard holds all
+    the postings, positions and review aggregates of its documents, so its local statistics
+    (document length, title and review boosts) are those of the whole index. The BM25
+    statistics that depend on the other documents (collection size, average length and
+    document frequencies) are computed once on the whole index and saved in the manifest,
+    so that a document gets the same score whichever shard it is in.
+    """
+    indexes = {name: load_json_file(path) for name, path in paths.items()}
+    origin_shards = split_index(indexes["origin"], num_shards)
+    title_shards = split_index(indexes["title"], num_shards)
+    reviews_shards = [{} for _ in range(num_shards)]
+    for url, reviews in indexes["reviews"].items():
+        reviews_shards[shard_of(url, num_shards)][url] = reviews
+
+    for shard_id in range(num_shards):
+        shard_folder = os.path.join(folder, f"shard_{shard_id:03d}")
+        os.makedirs(shard_folder, exist_ok=True)
+        shard_indexes = {"origin": origin_shards[shard_id], "title": title_shards[shard_id],
+                         "reviews": reviews_shards[shard_id]}
+        for name, filename in SHARD_FILES.items():
+            with open(os.path.join(shard_folder, filename), "w", encoding="utf-8") as file:
+                json.dump(shard_indexes[name], file, ensure_ascii=False)
+
+    with open(os.path.join(folder, SHARDS_MANIFEST), "w", encoding="utf-8") as file:
+        json.dump({
+            "num_shards": num_shards,
+            "global_stats": compute_global_stats(indexes["origin"]),
+            "synonyms": indexes["synonyms"]
+        }, file, ensure_ascii=False)
+    print(f"{num_shards} shards saved to {folder}.")
+
+
+class ShardSearcher:
+    """
+    Searches one shard, on the node (process or machine) holding it.
+
+    Attributes
+    ----------
+    shard_folder : str
+        The directory of the shard.
+    """
+
+    def __init__(self, shard_folder, manifest):
+        self.shard_folder = shard_folder
+        self.global_stats = manifest["global_stats"]
+        self.synonyms = manifest["synonyms"]
+        self.indexes = {name: load_json_file(os.path.join(shard_folder, filename))
+                        for name, filename in SHARD_FILES.items()}
+
+    def search(self, request):
+        """
+        Runs a query on the shard.
+
+        Parameters
+        ----------
+        request : dict
+            The 'query', the number 'k' of results to return, and the 'match_all' and
+            'min_rating' arguments of `engine.process_query`.
+
+        Returns
+        -------
+        list
+            The k best (url, score) pairs of the shard, with their raw scores.
+        """
+        ranked_results = process_query(
+            request["query"],
+            self.indexes["origin"],
+            self.synonyms,
+            self.indexes["title"],
+            self.indexes["reviews"],
+            match_all=request.get("match_all", True),
+            min_rating=request.get("min_rating"),
+            global_stats=self.global_stats,
+            unique_scores=False
+        )
+        return ranked_results[:request["k"]]
+
+
+def load_manifest(folder=SHARDS_FOLDER):
+    """
+    Loads the manifest of the shards saved by `build_shards`.
+    """
+    return load_json_file(os.path.join(folder, SHARDS_MANIFEST))
+
+
+class LocalTransport:
+    """
+    Transport running the shards in the coordinator process, one after the other.
+
+    Implementation Details
+    ----------------------------
+    Requests and responses are serialized to JSON as they would be sent to remote nodes, so
+    this transport can stand in for a network transport in tests: a transport only needs a
+    `submit(shard_id, request)` method returning a `concurrent.futures.Future` of the shard
+    results, and a `close()` method.
+    """
+
+    def __init__(self, folder=SHARDS_FOLDER):
+        manifest = load_manifest(folder)
+        self.searchers = [ShardSearcher(os.path.join(folder, f"shard_{shard_id:03d}"), manifest)
+                          for shard_id in range(manifest["num_shards"])]
+
+    def submit(self, shard_id, request):
+        future = Future()
+        try:
+            response = self.searchers[shard_id].search(json.loads(json.dumps(request)))
+            future.set_result([tuple(result) for result in json.loads(json.dumps(response))])
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        pass
+
+
+_shard_searcher = None  # Searcher of the shard held by a worker process
+
+
+def _load_shard(shard_folder, manifest):
+    global _shard_searcher
+    _shard_searcher = ShardSearcher(shard_folder, manifest)
+
+
+def _search_shard(request):
+    return _shard_searcher.search(request)
+
+
+class ProcessTransport:
+    """
+    Transport running each shard in its own worker process, so that shards are searched in parallel.
+
+    Implementation Details
+    ----------------------------
+    Each shard has a dedicated single-process pool whose initializer loads the shard once:
+    the indexes stay in the memory of the worker, and only the requests and the top-k results
+    cross process boundaries.
+    """
+
+    def __init__(self, folder=SHARDS_FOLDER):
+        manifest = load_manifest(folder)
+        self.pools = [ProcessPoolExecutor(max_workers=1, initializer=_load_shard,
+                                          initargs=(os.path.join(folder, f"shard_{shard_id:03d}"), manifest))
+                      for shard_id in range(manifest["num_shards"])]
+
+    def submit(self, shard_id, request):
+        return self.pools[shard_id].submit(_search_shard, request)
+
+    def close(self):
+        for pool in self.pools:
+            pool.shutdown()
+
+
+class ShardedSearch:
+    """
+    Query coordinator scattering queries to the shards and merging their results.
+
+    Attributes
+    ----------
+    transport : LocalTransport | ProcessTransport
+        The transport used to reach the shards (any object with `submit` and `close`).
+    num_shards : int
+        The number of shards.
+    """
+
+    def __init__(self, folder=SHARDS_FOLDER, transport=None):
+        self.num_shards = load_manifest(folder)["num_shards"]
+        self.transport = transport if transport is not None else ProcessTransport(folder)
+
+    def search(self, query, k=10, match_all=True, min_rating=None):
+        """
+        Runs a query on all the shards and merges their top-k results.
+
+        Parameters
+        ----------
+        query : str
+            The search query.
+        k : int, optional
+            The number of results (default is 10).
+        match_all : bool, optional
+            If True, all query tokens must be present in the documents (default is True).
+        min_rating : float, optional
+            If set, only documents with an average rating of at least `min_rating` are returned.
+
+        Returns
+        -------
+        list
+            The k best (url, score) pairs over all the shards, best first.
+
+        Implementation Details
+        ----------------------------
+        The query is sent to all the shards before waiting for any of them, and each shard
+        returns only its k best documents: the global top-k is among them, since a document
+        lives in exactly one shard and is scored with the global statistics. Ties are broken
+        after the merge, as `process_query` does on a single index.
+        """
+        request = {"query": query, "k": k, "match_all": match_all, "min_rating": min_rating}
+        futures = [self.transport.submit(shard_id, request) for shard_id in range(self.num_shards)]
+        shard_results = [future.result() for future in futures]
+        merged = heapq.nlargest(k, (result for results in shard_results for result in results), key=lambda x: x[1])
+        return ensure_unique_scores(merged)
+
+    def close(self):
+        self.transport.close()
+
+
+if __name__ == "__main__":
+    num_shards = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    build_shards(num_shards)
+
+    coordinator = ShardedSearch()
+    try:
+        print(json.dumps(coordinator.search("Dragon Energy Potion"), indent=2))
+    finally:
+        coordinator.close()
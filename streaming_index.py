@@ -0,0 +1,371 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+from async_crawler import async_crawl, DEFAULT_WORKERS, DEFAULT_CRAWL_DELAY
+from create_index import (INDEX_FOLDER, extract_product_info_from_url, build_inverted_index_with_positions,
+                          build_features_index, build_reviews_store)
+from reviews_store import ReviewsStore
+from near_duplicates import SimHashIndex, DUPLICATES_INDEX_FILE
+
+# Directory of the index segments, and file listing the segments that are complete
+SEGMENTS_FOLDER = os.path.join(INDEX_FOLDER, "segments")
+SEGMENTS_MANIFEST = "segments.json"
+
+# Maximum number of documents per segment
+SEGMENT_SIZE = 25
+
+# Maximum time (in seconds) a crawled page waits before being written to a segment
+FLUSH_INTERVAL = 5.0
+
+# Maximum number of crawled pages waiting to be indexed (the crawler waits when it is full)
+QUEUE_SIZE = 100
+
+# Files of a segment, in the same format as the files of the index folder
+SEGMENT_FILES = {
+    "title": "index_title_with_positions.json",
+    "description": "index_description_with_positions.json",
+    "features": "features_index.json",
+    "reviews": "reviews_index.json"
+}
+
+
+def crawl_record_to_product(record):
+    """
+    Converts a page extracted by the crawler to a product document, as `create_index.process_data` does.
+
+    Parameters
+    ----------
+    record : dict
+        The data extracted from a page (see `crawler.extract_data`).
+
+    Returns
+    -------
+    dict
+        The product document, with the first paragraph as description and the product ID and
+        variant parsed from the URL.
+    """
+    doc = dict(record)
+    doc.setdefault("description", record.get("first_paragraph", ""))
+    doc.update(extract_product_info_from_url(doc.get("url", "")))
+    return doc
+
+
+def _write_json(data, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False)
+
+
+class SegmentWriter:
+    """
+    Builds index segments from product documents as they arrive.
+
+    Attributes
+    ----------
+    folder : str
+        The directory of the segments.
+    segment_size : int
+        Maximum number of documents per segment.
+    segments : list
+        Names of the segments written so far.
+
+    Implementation Details
+    ----------------------------
+    Documents are buffered until `segment_size` of them are available (or until `flush` is
+    called), then the title, description, features and reviews indexes of the buffer are built
+    with the functions of `create_index.py` and written to a new segment directory. The segment
+    is published by rewriting the manifest (through a temporary file renamed over it) only once
+    all its files are written, so a reader (`load_segments`) never sees a partial segment.
+    Segments are never modified afterwards. A new writer starts a new index: it empties the
+    manifest, then deletes the segments of the previous index.
+    """
+
+    def __init__(self, folder=SEGMENTS_FOLDER, segment_size=SEGMENT_SIZE):
+        self.folder = folder
+        self.segment_size = segment_size
+        self.segments = []
+        self._buffer = []
+        os.makedirs(folder, exist_ok=True)
+        _write_json({"segments": []}, os.path.join(folder, SEGMENTS_MANIFEST))
+        for name in os.listdir(folder):
+            if re.fullmatch(r"segment_\d+", name) and os.path.isdir(os.path.join(folder, name)):
+                shutil.rmtree(os.path.join(folder, name))
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def add(self, doc):
+        """
+        Adds a product document to the buffer.
+
+        Returns
+        -------
+        bool
+            True if the buffer is full and should be flushed.
+        """
+        self._buffer.append(doc)
+        return len(self._buffer) >= self.segment_size
+
+    def take_buffer(self):
+        """
+        Returns the buffered documents and empties the buffer.
+        """
+        docs, self._buffer = self._buffer, []
+        return docs
+
+    def write_segment(self, docs):
+        """
+        Builds the indexes of documents and publishes them as a new segment.
+
+        Parameters
+        ----------
+        docs : list
+            The product documents of the segment.
+
+        Returns
+        -------
+        str | None
+            The name of the new segment, or None if there was no document.
+        """
+        if not docs:
+            return None
+
+        name = f"segment_{len(self.segments):05d}"
+        segment_folder = os.path.join(self.folder, name)
+        os.makedirs(segment_folder, exist_ok=True)
+
+        indexes = {
+            "title": build_inverted_index_with_positions("title", docs),
+            "description": build_inverted_index_with_positions("description", docs),
+            "features": build_features_index(docs),
+            "reviews": build_reviews_store(docs).to_index()
+        }
+        for field, filename in SEGMENT_FILES.items():
+            _write_json(indexes[field], os.path.join(segment_folder, filename))
+
+        self.segments.append(name)
+        manifest = os.path.join(self.folder, SEGMENTS_MANIFEST)
+        _write_json({"segments": self.segments}, manifest + ".tmp")
+        os.replace(manifest + ".tmp", manifest)
+        return name
+
+    def flush(self):
+        """
+        Writes the buffered documents to a new segment.
+        """
+        return self.write_segment(self.take_buffer())
+
+
+def term_frequency_index(*positional_indexes):
+    """
+    Builds the index scored by `engine.process_query` from positional indexes.
+
+    Parameters
+    ----------
+    *positional_indexes : dict
+        Positional indexes (token -> URL -> positions), e.g. the title and description indexes.
+
+    Returns
+    -------
+    dict
+        An index where each token maps to the documents containing it, and each document to the
+        term frequencies of all its tokens (token -> URL -> token -> frequency), the shape
+        `engine.compute_bm25` reads term frequencies and document lengths from.
+    """
+    doc_terms = {}
+    for positional_index in positional_indexes:
+        for token, url_positions in positional_index.items():
+            for url, positions in url_positions.items():
+                terms = doc_terms.setdefault(url, {})
+                terms[token] = terms.get(token, 0) + len(positions)
+
+    index = {}
+    for url, terms in doc_terms.items():
+        for token in terms:
+            index.setdefault(token, {})[url] = terms  # The same dictionary is shared by all the tokens of a document
+    return index
+
+
+def load_segments(folder=SEGMENTS_FOLDER):
+    """
+    Loads and merges the published index segments, so they can be searched with `engine.process_query`.
+
+    Parameters
+    ----------
+    folder : str, optional
+        The directory of the segments (default is 'index/segments').
+
+    Returns
+    -------
+    dict
+        The merged 'title' and 'description' indexes (token -> URL -> positions), 'features'
+        index (token -> URLs) and 'reviews' store (`ReviewsStore`), and the 'terms' index of
+        the titles and descriptions (see `term_frequency_index`), to pass as the scored index
+        of `engine.process_query`.
+    """
+    merged = {"title": {}, "description": {}, "features": {}, "reviews": {}}
+    manifest = os.path.join(folder, SEGMENTS_MANIFEST)
+    if not os.path.exists(manifest):
+        print(f"Error: No index segments in {folder}.")
+        merged["reviews"] = ReviewsStore.from_index({})
+        merged["terms"] = {}
+        return merged
+
+    with open(manifest, "r", encoding="utf-8") as file:
+        segments = json.load(file)["segments"]
+
+    for name in segments:
+        for field, filename in SEGMENT_FILES.items():
+            with open(os.path.join(folder, name, filename), "r", encoding="utf-8") as file:
+                segment_index = json.load(file)
+            if field == "features":
+                for token, urls in segment_index.items():
+                    merged[field].setdefault(token, []).extend(urls)
+            elif field == "reviews":
+                merged[field].update(segment_index)
+            else:
+                for token, url_positions in segment_index.items():
+                    merged[field].setdefault(token, {}).update(url_positions)
+
+    merged["reviews"] = ReviewsStore.from_index(merged["reviews"])
+    merged["terms"] = term_frequency_index(merged["title"], merged["description"])
+    return merged
+
+
+async def index_pages(page_queue, writer, flush_interval=FLUSH_INTERVAL, duplicates_index=None):
+    """
+    Consumes crawled pages from a queue and writes them to index segments, until it receives None.
+
+    Parameters
+    ----------
+    page_queue : asyncio.Queue
+        The queue of pages extracted by the crawler.
+    writer : SegmentWriter
+        The segment writer.
+    flush_interval : float, optional
+        Maximum time (in seconds) a page waits in the buffer before a segment is written
+        (default is 5 seconds), so pages become searchable even when the crawl is slow.
+    duplicates_index : SimHashIndex, optional
+        If set, near-duplicates of pages already indexed are not indexed, only linked to their
+        canonical page (default is None).
+    """
+    deadline = None
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            record = await asyncio.wait_for(page_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            record = False  # The flush interval expired
+
+        if record is None:
+            await asyncio.to_thread(writer.write_segment, writer.take_buffer())
+            return
+        if record is not False:
+            if duplicates_index is not None and duplicates_index.check(record) is not None:
+                continue
+            full = writer.add(crawl_record_to_product(record))
+            if deadline is None:
+                deadline = time.monotonic() + flush_interval
+            if not full:
+                continue
+        # Segments are built in a thread, so the crawler keeps running meanwhile
+        await asyncio.to_thread(writer.write_segment, writer.take_buffer())
+        deadline = None
+
+
+async def streaming_crawl_and_index(seed_url, max_pages=50, workers=DEFAULT_WORKERS, crawl_delay=DEFAULT_CRAWL_DELAY,
+                                    output_file="output.jsonl", segments_folder=SEGMENTS_FOLDER,
+                                    segment_size=SEGMENT_SIZE, flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE,
+                                    deduplicate_pages=True):
+    """
+    Crawls pages and indexes them at the same time.
+
+    Parameters
+    ----------
+    seed_url : str
+        Starting URL from which to begin the crawl.
+    max_pages : int, optional
+        Maximum number of pages to explore. Default is 50 pages.
+    workers : int, optional
+        Number of pages fetched concurrently. Default is 16.
+    crawl_delay : float, optional
+        Minimum delay (in seconds) between two requests to the same host. Default is 1 second.
+    output_file : str | None, optional
+        JSONL file where each page is written as soon as it is crawled. Default is "output.jsonl".
+    segments_folder : str, optional
+        The directory of the index segments. Default is 'index/segments'.
+    segment_size : int, optional
+        Maximum number of documents per segment. Default is 25.
+    flush_interval : float, optional
+        Maximum time (in seconds) between the crawl of a page and its indexing. Default is 5 seconds.
+    queue_size : int, optional
+        Maximum number of pages waiting to be indexed. Default is 100.
+    deduplicate_pages : bool, optional
+        If True, near-duplicate pages are not indexed, and their canonical page is saved in
+        the 'duplicates_index.json' file of the segments folder. Default is True.
+
+    Returns
+    -------
+    list
+        The names of the segments written.
+
+    Implementation Details
+    ----------------------------
+    The crawler (`async_crawl`) hands each extracted page to a bounded `asyncio.Queue`, consumed
+    by `index_pages` in the same event loop: when the indexer falls behind, the crawler waits
+    instead of accumulating pages in memory. Pages are indexed in small segments while the crawl
+    goes on, so the data is searchable (`load_segments`) shortly after it is crawled, without
+    writing the whole crawl to a file and reading it back before indexing. Both run as tasks
+    watched together: if the indexer fails, nothing consumes the queue any more, so the crawl
+    is cancelled and the error of the indexer is raised instead of waiting on a full queue.
+    """
+    page_queue = asyncio.Queue(maxsize=queue_size)
+    writer = SegmentWriter(segments_folder, segment_size)
+    duplicates_index = SimHashIndex() if deduplicate_pages else None
+    indexer = asyncio.create_task(index_pages(page_queue, writer, flush_interval, duplicates_index))
+    crawler = asyncio.create_task(async_crawl(seed_url, max_pages, workers, crawl_delay, output_file,
+                                              on_page=page_queue.put))
+
+    try:
+        await asyncio.wait({crawler, indexer}, return_when=asyncio.FIRST_COMPLETED)
+        if not crawler.done():
+            # The indexer only returns once it gets the end of the crawl: it failed
+            crawler.cancel()
+            await asyncio.gather(crawler, return_exceptions=True)
+            indexer.result()
+            raise RuntimeError("The indexer stopped before the end of the crawl.")
+
+        # End of the crawl (even if it failed): index the remaining pages, unless the indexer failed too
+        end_of_crawl = asyncio.ensure_future(page_queue.put(None))
+        await asyncio.wait({end_of_crawl, indexer}, return_when=asyncio.FIRST_COMPLETED)
+        end_of_crawl.cancel()
+        await indexer
+        crawler.result()
+    finally:
+        tasks = [task for task in (crawler, indexer) if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if duplicates_index is not None:
+        duplicates_index.save(os.path.join(segments_folder, DUPLICATES_INDEX_FILE))
+        print(f"{len(duplicates_index.canonical)} near-duplicate pages were not indexed.")
+    print(f"Streaming indexing completed. {len(writer.segments)} segments written to {segments_folder}.")
+    return writer.segments
+
+
+def run_streaming_pipeline(seed_url, max_pages=50, workers=DEFAULT_WORKERS, crawl_delay=DEFAULT_CRAWL_DELAY,
+                           output_file="output.jsonl", segments_folder=SEGMENTS_FOLDER, segment_size=SEGMENT_SIZE,
+                           flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE, deduplicate_pages=True):
+    """
+    Runs `streaming_crawl_and_index` from synchronous code (same parameters and return value).
+    """
+    return asyncio.run(streaming_crawl_and_index(seed_url, max_pages, workers, crawl_delay, output_file,
+                                                 segments_folder, segment_size, flush_interval, queue_size,
+                                                 deduplicate_pages))
+
+
+if __name__ == "__main__":
+    run_streaming_pipeline("https://web-scraping.dev/products")
@@ -0,0 +1,397 @@
+import os
+import numpy as np
+
+# Default file name of the term dictionary (saved in the index folder)
+TERM_DICTIONARY_FILE = "term_dictionary.npz"
+
+# Number of terms per front-coded block, the first term of each block is stored in full
+BLOCK_SIZE = 16
+
+
+def _encode_varint(value, output):
+    """
+    Appends an unsigned integer to a bytearray using a variable-length encoding.
+
+    Parameters
+    ----------
+    value : int
+        The integer to encode.
+    output : bytearray
+        The buffer to which the encoded bytes are appended.
+    """
+    while value >= 0x80:
+        output.append((value & 0x7F) | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def _decode_varint(buffer, offset):
+    """
+    Reads an unsigned integer encoded with `_encode_varint`.
+
+    Parameters
+    ----------
+    buffer : bytes
+        The buffer to read from.
+    offset : int
+        The position of the first byte of the integer.
+
+    Returns
+    -------
+    tuple
+        The decoded integer and the position right after it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _shared_prefix_length(a, b):
+    """
+    Returns the length of the common prefix of two byte strings.
+    """
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+class TermDictionary:
+    """
+    Sorted, front-coded vocabulary shared by all the indexed fields.
+
+    Attributes
+    ----------
+    fields : list
+        Names of the fields whose document frequencies are stored (e.g. 'title', 'description').
+    df : dict
+        Mapping from field name to a NumPy array of document frequencies indexed by term ID.
+    total_df : numpy.ndarray
+        Document frequency of each term summed over all the fields.
+
+    Implementation Details
+    ----------------------------
+    Terms are sorted (UTF-8 byte order, which is also code point order) and the term ID of a
+    term is its rank. They are stored in blocks of `BLOCK_SIZE` terms in a single bytes
+    buffer: the first term of a block is stored in full, the following ones as the length of
+    the prefix shared with the previous term plus the remaining suffix. An offset table gives
+    the start of each block, so that:
+    - an exact lookup is a binary search over the block heads followed by a scan of one block,
+    - all the terms starting with a prefix form a contiguous range of term IDs, found with two
+      binary searches, and ranking them by document frequency is a NumPy operation on a slice.
+    """
+
+    def __init__(self, blob, block_offsets, size, df):
+        self._blob = bytes(blob)
+        self._block_offsets = np.asarray(block_offsets, dtype=np.uint32)
+        self._size = int(size)
+        self.df = {field: np.asarray(frequencies, dtype=np.int32) for field, frequencies in df.items()}
+        self.fields = list(self.df)
+        if self.df:
+            self.total_df = np.sum([frequencies for frequencies in self.df.values()], axis=0, dtype=np.int64)
+        else:
+            self.total_df = np.zeros(self._size, dtype=np.int64)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, term):
+        return self.lookup(term) >= 0
+
+    def __iter__(self):
+        for block in range(len(self._block_offsets)):
+            for term in self._decode_block(block):
+                yield term.decode("utf-8")
+
+    @classmethod
+    def build(cls, indexes):
+        """
+        Builds a term dictionary from several inverted indexes.
+
+        Parameters
+        ----------
+        indexes : dict
+            A dictionary where each field name maps to the inverted index of that field
+            (token -> postings, where the postings are a list or a dict of documents).
+
+        Returns
+        -------
+        TermDictionary
+            The term dictionary holding every token of every field, with its document frequency per field.
+        """
+        terms = sorted(set().union(*[index.keys() for index in indexes.values()]))
+        term_ids = {term: term_id for term_id, term in enumerate(terms)}
+
+        df = {}
+        for field, index in indexes.items():
+            frequencies = np.zeros(len(terms), dtype=np.int32)
+            for term, postings in index.items():
+                frequencies[term_ids[term]] = len(postings)
+            df[field] = frequencies
+
+        blob = bytearray()
+        block_offsets = []
+        previous = b""
+        for term_id, term in enumerate(terms):
+            encoded = term.encode("utf-8")
+            if term_id % BLOCK_SIZE == 0:
+                block_offsets.append(len(blob))
+                shared = 0
+            else:
+                shared = _shared_prefix_length(previous, encoded)
+            _encode_varint(shared, blob)
+            _encode_varint(len(encoded) - shared, blob)
+            blob += encoded[shared:]
+            previous = encoded
+
+        return cls(blob, block_offsets, len(terms), df)
+
+    def _decode_block(self, block, stop=BLOCK_SIZE):
+        """
+        Decodes the first `stop` terms of a block.
+
+        Parameters
+        ----------
+        block : int
+            The block number.
+        stop : int, optional
+            The number of terms to decode (default is the whole block).
+
+        Returns
+        -------
+        list
+            The decoded terms, as UTF-8 byte strings.
+        """
+        offset = int(self._block_offsets[block])
+        count = min(stop, BLOCK_SIZE, self._size - block * BLOCK_SIZE)
+        terms = []
+        previous = b""
+        for _ in range(count):
+            shared, offset = _decode_varint(self._blob, offset)
+            length, offset = _decode_varint(self._blob, offset)
+            previous = previous[:shared] + self._blob[offset:offset + length]
+            offset += length
+            terms.append(previous)
+        return terms
+
+    def _block_head(self, block):
+        """
+        Returns the first term of a block (stored in full, so no other term is decoded).
+        """
+        offset = int(self._block_offsets[block])
+        _, offset = _decode_varint(self._blob, offset)
+        length, offset = _decode_varint(self._blob, offset)
+        return self._blob[offset:offset + length]
+
+    def _first_term_id(self, is_after):
+        """
+        Returns the smallest term ID whose term satisfies a monotonic predicate.
+
+        Parameters
+        ----------
+        is_after : callable
+            A predicate on UTF-8 encoded terms, False for a (possibly empty) run of terms
+            at the start of the sorted vocabulary and True for all the following ones.
+
+        Returns
+        -------
+        int
+            The ID of the first term for which the predicate is True, or the vocabulary
+            size if there is none.
+        """
+        # Binary search for the last block whose head does not satisfy the predicate
+        low, high = 0, len(self._block_offsets)
+        while low < high:
+            middle = (low + high) // 2
+            if is_after(self._block_head(middle)):
+                high = middle
+            else:
+                low = middle + 1
+        if low == 0:
+            return 0
+
+        block = low - 1
+        for position, term in enumerate(self._decode_block(block)):
+            if is_after(term):
+                return block * BLOCK_SIZE + position
+        return min(low * BLOCK_SIZE, self._size)
+
+    def lookup(self, term):
+        """
+        Returns the term ID of a term.
+
+        Parameters
+        ----------
+        term : str
+            The term to look up.
+
+        Returns
+        -------
+        int
+            The term ID, or -1 if the term is not in the dictionary.
+        """
+        encoded = term.encode("utf-8")
+        term_id = self._first_term_id(lambda candidate: candidate >= encoded)
+        if term_id < self._size and self.term(term_id) == term:
+            return term_id
+        return -1
+
+    def term(self, term_id):
+        """
+        Returns the term with the given term ID.
+
+        Parameters
+        ----------
+        term_id : int
+            The term ID.
+
+        Returns
+        -------
+        str
+            The term.
+        """
+        block, position = divmod(int(term_id), BLOCK_SIZE)
+        return self._decode_block(block, position + 1)[position].decode("utf-8")
+
+    def document_frequency(self, term, field=None):
+        """
+        Returns the document frequency of a term.
+
+        Parameters
+        ----------
+        term : str
+            The term.
+        field : str, optional
+            The field to consider (default is the sum over all the fields).
+
+        Returns
+        -------
+        int
+            The number of documents containing the term, 0 if the term is unknown.
+        """
+        term_id = self.lookup(term)
+        if term_id < 0:
+            return 0
+        frequencies = self.total_df if field is None else self.df[field]
+        return int(frequencies[term_id])
+
+    def prefix_range(self, prefix):
+        """
+        Returns the range of term IDs of the terms starting with a prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The prefix.
+
+        Returns
+        -------
+        tuple
+            The first term ID and the term ID right after the last one (equal if no term matches).
+        """
+        encoded = prefix.encode("utf-8")
+        start = self._first_term_id(lambda candidate: candidate >= encoded)
+        end = self._first_term_id(lambda candidate: candidate[:len(encoded)] > encoded)
+        return start, end
+
+    def prefix_terms(self, prefix):
+        """
+        Enumerates, in sorted order, the terms starting with a prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The prefix.
+
+        Returns
+        -------
+        generator
+            The matching terms.
+        """
+        start, end = self.prefix_range(prefix)
+        term_id = start
+        while term_id < end:
+            block, position = divmod(term_id, BLOCK_SIZE)
+            for term in self._decode_block(block)[position:position + end - term_id]:
+                yield term.decode("utf-8")
+                term_id += 1
+
+    def suggest(self, prefix, k=10, field=None):
+        """
+        Suggests completions of a prefix, as the user types a query.
+
+        Parameters
+        ----------
+        prefix : str
+            The prefix typed by the user (lowercased before the lookup).
+        k : int, optional
+            The maximum number of completions (default is 10).
+        field : str, optional
+            The field whose document frequencies rank the completions (default is all fields).
+
+        Returns
+        -------
+        list
+            Up to `k` tuples (term, document frequency), sorted by decreasing document frequency
+            and then alphabetically. Terms absent from the requested field are left out.
+        """
+        start, end = self.prefix_range(prefix.lower())
+        if start >= end or k <= 0:
+            return []
+
+        frequencies = (self.total_df if field is None else self.df[field])[start:end]
+        if len(frequencies) > k:
+            best = np.argpartition(-frequencies, k - 1)[:k]
+        else:
+            best = np.arange(len(frequencies))
+        best = sorted((i for i in best.tolist() if frequencies[i] > 0), key=lambda i: (-frequencies[i], i))
+        return [(self.term(start + i), int(frequencies[i])) for i in best]
+
+    def save(self, filename):
+        """
+        Saves the term dictionary to a compressed NumPy file.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the output .npz file.
+        """
+        arrays = {f"df_{field}": frequencies for field, frequencies in self.df.items()}
+        np.savez_compressed(
+            filename,
+            blob=np.frombuffer(self._blob, dtype=np.uint8),
+            block_offsets=self._block_offsets,
+            size=np.array(self._size),
+            fields=np.array(self.fields, dtype=str),
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Loads a term dictionary saved with `TermDictionary.save`.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the .npz file.
+
+        Returns
+        -------
+        TermDictionary | None
+            The loaded term dictionary, or None if the file does not exist.
+        """
+        if not os.path.exists(filename):
+            print(f"Error: The file {filename} does not exist.")
+            return None
+
+        with np.load(filename) as arrays:
+            df = {field: arrays[f"df_{field}"] for field in arrays["fields"].tolist()}
+            return cls(arrays["blob"].tobytes(), arrays["block_offsets"], arrays["size"], df)
@@ -0,0 +1,82 @@
+import asyncio
+import time
+import pytest
+from async_crawler import HostPoliteness, crawl_async
+from benchmark_crawler import SyntheticSite
+
+
+class RecordingSite(SyntheticSite):
+    """
+    Synthetic site recording the path and arrival time of each request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.log = []
+
+    def respond(self, path):
+        with self._lock:
+            self.log.append((time.monotonic(), path))
+        return super().respond(path)
+
+    def page_requests(self):
+        return [(arrival, path) for arrival, path in self.log if path != "/robots.txt"]
+
+
+@pytest.fixture
+def site(request):
+    site = RecordingSite(**getattr(request, "param", {}))
+    site.start()
+    yield site
+    site.stop()
+
+
+def crawl(site, **kwargs):
+    return crawl_async(f"{site.url}/products", output_file=None, **kwargs)
+
+
+def test_max_pages_and_robots_txt(site):
+    data = crawl(site, max_pages=30, workers=8, crawl_delay=0)
+
+    assert len(data) == 30
+    assert len({page["url"] for page in data}) == 30
+    paths = [path for _, path in site.page_requests()]
+    assert len(paths) == 30  # Pages are only requested within the budget
+    assert [path for _, path in site.log].count("/robots.txt") == 1
+    assert not [path for path in paths if path.startswith(("/cart", "/login"))]
+    assert any(link.endswith("/cart") for page in data for link in page["links"])
+
+
+def test_requests_to_a_host_are_spaced(site):
+    crawl_delay = 0.05
+    crawl(site, max_pages=8, workers=8, crawl_delay=crawl_delay)
+
+    arrivals = [arrival for arrival, _ in site.log]
+    gaps = [second - first for first, second in zip(arrivals, arrivals[1:])]
+    assert len(arrivals) == 9  # robots.txt and 8 pages
+    assert min(gaps) > crawl_delay / 2  # Slots are spaced by the delay, arrivals by about as much
+    assert arrivals[-1] - arrivals[0] >= 7 * crawl_delay
+
+
+@pytest.mark.parametrize("site", [{"error_rate": 0.2, "seed": 0}], indirect=True)
+def test_page_errors_are_skipped(site):
+    data = crawl(site, max_pages=40, workers=8, crawl_delay=0)
+
+    assert site.errors > 0
+    assert len(data) == 40  # Failed pages do not count in the budget
+    assert len(site.page_requests()) == 40 + site.errors
+    assert all("Server error" not in page.get("first_paragraph", "") for page in data)
+
+
+def test_host_politeness_reserves_slots_per_host():
+    async def reserve():
+        politeness = HostPoliteness(default_delay=10)
+        politeness.set_delay("slow.example", 30)
+        return [politeness.reserve(host) for host in ("a.example", "a.example", "b.example", "a.example",
+                                                      "slow.example", "slow.example")]
+
+    delays = asyncio.run(reserve())
+    assert delays[0] == delays[2] == delays[4] == 0
+    assert delays[1] == pytest.approx(10, abs=0.1)
+    assert delays[3] == pytest.approx(20, abs=0.1)
+    assert delays[5] == pytest.approx(30, abs=0.1)
@@ -0,0 +1,32 @@
+from benchmark_crawler import SyntheticSite, measure_frontier_memory, run_benchmark
+
+
+def test_synthetic_site_pages():
+    site = SyntheticSite(products=10, seed=0)
+
+    assert "<title>Product 3</title>" in site.render_page("/product/3")
+    variant = site.variants[3][0]
+    assert f"<title>Product 3 ({variant})</title>" in site.render_page(f"/product/3?variant={variant}")
+    assert site.render_page("/product/3?variant=unknown") is None
+    assert site.render_page("/product/11") is None
+    assert site.respond("/missing")[0] == 404
+    assert site.respond("/robots.txt")[0] == 200
+
+
+def test_frontier_memory_counts_distinct_urls():
+    urls = [f"https://web-scraping.dev/product/{i}" for i in range(50)]
+
+    report = measure_frontier_memory(urls + urls)
+
+    assert report["frontier_urls"] == 50
+    assert report["frontier_bytes"] > 0
+
+
+def test_benchmark_crawls_the_synthetic_site():
+    results = run_benchmark(products=20, max_pages=25, workers=4, latency=0.0)
+
+    assert results["pages"] == 25
+    assert results["errors"] == 0
+    assert results["requests"] == 26  # robots.txt and one request per page
+    assert results["pages_per_second"] > 0
+    assert results["frontier_urls"] > 0
@@ -0,0 +1,94 @@
+import json
+import os
+from async_crawler import crawl_async
+from benchmark_crawler import SyntheticSite
+from crawl_state import CrawlState, content_hash, pages_log_file
+
+
+def record(state, url, body, headers=None):
+    data = {"url": url, "title": body}
+    return state.record_page(url, headers or {}, content_hash(body.encode("utf-8")), data)
+
+
+def test_checkpoint_holds_validators_and_log_holds_data(tmp_path):
+    filename = str(tmp_path / "crawl_state.json")
+    state = CrawlState.load(filename)
+    state.start("https://example.com/")
+    for i in range(3):
+        state.visited[f"https://example.com/{i}"] = True
+        record(state, f"https://example.com/{i}", "x" * 10000, {"etag": f'"{i}"'})
+    state.save()
+
+    with open(filename, encoding="utf-8") as file:
+        saved = json.load(file)
+    assert saved["pages"]["https://example.com/1"] == {"etag": '"1"', "last_modified": None}
+    assert os.path.getsize(filename) < 1000  # The page data is not rewritten at each checkpoint
+    with open(pages_log_file(filename), encoding="utf-8") as file:
+        assert len(file.readlines()) == 3
+
+    state.save()  # Nothing new to append
+    with open(pages_log_file(filename), encoding="utf-8") as file:
+        assert len(file.readlines()) == 3
+
+    loaded = CrawlState.load(filename)
+    assert loaded.collected_data() == state.collected_data()
+    assert loaded.conditional_headers("https://example.com/2") == {"If-None-Match": '"2"'}
+    assert loaded.is_unchanged("https://example.com/0", content_hash(("x" * 10000).encode("utf-8")))
+    assert loaded.changed_pages == 3
+
+
+def test_resume_and_compaction(tmp_path):
+    filename = str(tmp_path / "crawl_state.json")
+    state = CrawlState.load(filename)
+    state.start("https://example.com/")
+    state.visited["https://example.com/"] = True
+    record(state, "https://example.com/", "v1")
+    state.frontier = {"https://example.com/next": 2}
+    state.save()
+
+    interrupted = CrawlState.load(filename)
+    assert interrupted.start("https://example.com/") is True
+    assert interrupted.frontier == {"https://example.com/next": 2}
+
+    record(interrupted, "https://example.com/", "v2")  # Modified page: a second line in the log
+    interrupted.complete = True
+    interrupted.save()
+    with open(pages_log_file(filename), encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+
+    new_crawl = CrawlState.load(filename)
+    assert new_crawl.start("https://example.com/") is False
+    assert new_crawl.visited == {} and new_crawl.changed_pages == 0
+    with open(pages_log_file(filename), encoding="utf-8") as file:
+        assert [json.loads(line)["data"]["title"] for line in file] == ["v2"]
+
+
+def test_legacy_state_data_moves_to_the_log(tmp_path):
+    filename = str(tmp_path / "crawl_state.json")
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump({"complete": True, "frontier": {}, "visited": ["https://example.com/"], "changed": [],
+                   "pages": {"https://example.com/": {"etag": None, "last_modified": None, "content_hash": "h",
+                                                      "data": {"title": "old"}}}}, file)
+
+    state = CrawlState.load(filename)
+    state.save()
+
+    loaded = CrawlState.load(filename)
+    assert loaded.pages["https://example.com/"]["data"] == {"title": "old"}
+    assert loaded.is_unchanged("https://example.com/", "h")
+
+
+def test_recrawl_skips_unchanged_pages(tmp_path):
+    filename = str(tmp_path / "crawl_state.json")
+    site = SyntheticSite(products=10)
+    site.start()
+    try:
+        first = crawl_async(f"{site.url}/products", max_pages=15, workers=1, crawl_delay=0, output_file=None, state_file=filename)
+        second = crawl_async(f"{site.url}/products", max_pages=15, workers=1, crawl_delay=0, output_file=None, state_file=filename)
+    finally:
+        site.stop()
+
+    assert {page["url"] for page in second} == {page["url"] for page in first}
+    state = CrawlState.load(filename)
+    assert state.complete and state.changed_pages == 0
+    assert len(state.collected_data()) == 15
@@ -0,0 +1,80 @@
+from create_index import build_inverted_index_with_positions
+from doc_store import DocumentStore, PostingsFile, DOCS_PER_BLOCK, highlight_snippet
+from engine import format_results, load_description_postings
+from index_stopwords import STOPWORDS
+
+# Enough documents to span several compressed blocks
+DOCS = [{
+    "url": f"https://example.com/product/{i}",
+    "title": f"Product {i}",
+    "description": f"The product {i} is a red potion, with a taste of the sea.",
+    "product_features": {"size": str(i)},
+    "reviews": [{"rating": 5}]
+} for i in range(2 * DOCS_PER_BLOCK + 3)]
+
+
+def write_store(tmp_path):
+    DocumentStore.write(DOCS, tmp_path / "doc_store.bin", tmp_path / "doc_store_offsets.npz")
+    return DocumentStore.open(tmp_path / "doc_store.bin", tmp_path / "doc_store_offsets.npz")
+
+
+def test_round_trip(tmp_path):
+    store = write_store(tmp_path)
+
+    assert len(store) == len(DOCS)
+    for doc in reversed(DOCS):
+        assert store.get(doc["url"]) == {field: doc[field] for field in ("url", "title", "description", "product_features")}
+    assert store.get("https://example.com/unknown") is None
+
+
+def test_missing_store():
+    assert DocumentStore.open("missing.bin", "missing_offsets.npz") is None
+
+
+def test_snippet_from_index_positions():
+    doc = DOCS[0]
+    description_index = build_inverted_index_with_positions("description", [doc])
+    positions = description_index["potion"][doc["url"]]
+
+    snippet = highlight_snippet(doc["description"], ["potion"], positions, STOPWORDS)
+    assert snippet == highlight_snippet(doc["description"], ["potion"])
+    assert "red <b>potion,</b> with" in snippet
+
+
+def test_format_results_uses_stored_titles(tmp_path):
+    store = write_store(tmp_path)
+    ranked_results = [(DOCS[20]["url"], 2.0), ("https://example.com/unknown", 1.0)]
+
+    results = format_results(ranked_results, store, ["potion"])
+    assert results[0]["title"] == "Product 20"
+    assert "<b>potion,</b>" in results[0]["snippet"]
+    assert results[1] == {"title": "https://example.com/unknown", "url": "https://example.com/unknown", "score": 1.0}
+    assert len(format_results(ranked_results, store, k=1)) == 1
+
+
+def test_postings_file_reads_only_requested_tokens(tmp_path):
+    description_index = build_inverted_index_with_positions("description", DOCS)
+    paths = (str(tmp_path / "description_postings.bin"), str(tmp_path / "description_postings_offsets.npz"))
+    PostingsFile.write(description_index, *paths)
+
+    postings_file = PostingsFile.open(*paths)
+    assert len(postings_file) == len(description_index)
+    assert postings_file.load(["sea", "potion", "unknown"]) == {
+        "potion": description_index["potion"],
+        "sea": description_index["sea"]
+    }
+    assert load_description_postings(["potion"], paths) == {"potion": description_index["potion"]}
+    assert load_description_postings(["potion"], ("missing.bin", "missing_offsets.npz")) is None
+
+
+def test_format_results_with_query_postings(tmp_path):
+    store = write_store(tmp_path)
+    description_index = build_inverted_index_with_positions("description", DOCS)
+    paths = (str(tmp_path / "description_postings.bin"), str(tmp_path / "description_postings_offsets.npz"))
+    PostingsFile.write(description_index, *paths)
+    ranked_results = [(doc["url"], 1.0) for doc in DOCS]
+
+    results = format_results(ranked_results, store, ["sea"], load_description_postings(["sea"], paths), k=3)
+
+    assert len(results) == 3
+    assert all("of the <b>sea.</b>" in result["snippet"] for result in results)
@@ -0,0 +1,24 @@
+from engine import rank_documents
+from reviews_store import ReviewsStore
+
+A, B, C = "https://example.com/a", "https://example.com/b", "https://example.com/c"
+INDEX = {"potion": {A: {"potion": 1}, B: {"potion": 1}}}
+REVIEWS = {
+    A: {"total_reviews": 1, "mean_mark": 5.0, "last_rating": 5},
+    C: {"total_reviews": 1, "mean_mark": 2.0, "last_rating": 2}
+}
+
+
+def test_review_boost_added_to_every_reviewed_document():
+    scores = dict(rank_documents(["potion"], INDEX, {}, ReviewsStore.from_index(REVIEWS)))
+
+    assert set(scores) == {A, B, C}
+    assert scores[C] == 2.0 / 5
+    assert scores[A] - scores[B] == 6.0
+
+
+def test_review_boost_limited_to_candidates():
+    scores = dict(rank_documents(["potion"], INDEX, {}, REVIEWS, candidate_docs={A, B}))
+
+    assert set(scores) == {A, B}
+    assert scores[A] - scores[B] == 6.0
@@ -0,0 +1,51 @@
+import copy
+import os
+import pytest
+from engine import load_json_file
+from evaluate import (BASELINE_FILE, QUERIES_FILE, compare_with_baseline, load_indexes, ndcg_at_k, recall_at_k,
+                      reciprocal_rank, run_evaluation)
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JUDGMENTS = {"a": 3, "b": 1, "c": 0}
+
+
+def test_ranking_metrics():
+    assert ndcg_at_k(["a", "b", "x"], JUDGMENTS) == pytest.approx(1.0)
+    assert 0 < ndcg_at_k(["b", "a"], JUDGMENTS) < 1
+    assert ndcg_at_k(["x"], {}) == 0.0
+
+    assert reciprocal_rank(["x", "c", "b", "a"], JUDGMENTS) == pytest.approx(1 / 3)
+    assert reciprocal_rank(["x"], JUDGMENTS) == 0.0
+
+    assert recall_at_k(["a", "x"], JUDGMENTS) == pytest.approx(0.5)
+    assert recall_at_k(["x", "a"], JUDGMENTS, k=1) == 0.0
+
+
+def test_compare_with_baseline_reports_regressions():
+    baseline = {
+        "summary": {"ndcg@10": 0.8, "mrr": 0.9, "recall@10": 0.7, "errors": 0, "latency_p95_ms": 2.0,
+                    "mean_postings": 40.0},
+        "queries": [{"query": "candy", "ranking": ["a", "b"]}, {"query": "potion", "ranking": ["c"]}]
+    }
+    evaluation = copy.deepcopy(baseline)
+
+    assert compare_with_baseline(evaluation, baseline) == ([], [])
+
+    evaluation["summary"].update({"ndcg@10": 0.7, "errors": 1, "latency_p95_ms": 10.0, "mean_postings": 41.0})
+    evaluation["queries"][0]["ranking"] = ["b", "a"]
+    regressions, changed = compare_with_baseline(evaluation, baseline)
+
+    assert len(regressions) == 4
+    assert changed == ["candy"]
+
+
+def test_engine_matches_the_baseline(monkeypatch):
+    monkeypatch.chdir(REPO_FOLDER)
+    evaluation = run_evaluation(load_json_file(QUERIES_FILE), load_indexes(), repeat=1)
+    baseline = load_json_file(BASELINE_FILE)
+
+    regressions, changed = compare_with_baseline(evaluation, baseline)
+
+    assert changed == []
+    assert not [regression for regression in regressions if "latency" not in regression]
@@ -0,0 +1,56 @@
+import pytest
+from benchmark_crawler import SyntheticSite
+from crawler import extract_data, extract_data_fast
+
+BASE_URL = "https://web-scraping.dev/products"
+
+EDGE_CASES = {
+    "links": """<html><head><title>Links</title></head><body>
+        <a href="/product/1">relative</a> <a href="product/2?variant=blue">relative path</a>
+        <a href="https://web-scraping.dev/product/3">absolute</a> <a href="//web-scraping.dev/product/4">protocol</a>
+        <a href=" //evil.com/y">space before protocol-relative</a> <a href="\t//evil.com/z">tab</a>
+        <a href="https://evil.com/x">external</a> <a href="mailto:a@b.c">mail</a> <a href="javascript:void(0)">js</a>
+        <a href="">empty</a> <a>no href</a> <a href="#top">anchor</a> <a href="/product/1">duplicate</a>
+        <a href="HTTPS://WEB-SCRAPING.DEV/product/5">upper case</a> <a href="http://web-scraping.dev:80/p">port</a>
+        </body></html>""",
+    "title markup": "<html><head><title>A <b>bold</b> title</title></head><body><h1>Heading</h1></body></html>",
+    "title comment": "<html><head><title><!-- c -->Commented</title></head><body></body></html>",
+    "empty title": "<html><head><title></title></head><body><h1> Heading &amp; more </h1></body></html>",
+    "blank title": "<html><head><title>   </title></head><body><h1>Heading</h1><p>Text</p></body></html>",
+    "og title": '<html><head><meta property="og:title" content=" Open Graph "></head><body><p></p></body></html>',
+    "no title": "<html><body><p>Only <i>a</i> paragraph</p></body></html>",
+    "entities": "<html><head><title>Caf&eacute; &lt;potion&gt; &#233;</title></head><body><p>a &amp; b</p></body></html>",
+    "script in paragraph": "<p>Before<script>var x = '<p>';</script> after<style>p {}</style></p><p>second</p>",
+    "unclosed tags": "<title>Unclosed<body><h1>Heading<p>First <b>bold<p>Second</p></h1>",
+    "stray end tags": "<html><title>Stray</title></span><p>Text</div> more</p></html>",
+    "nested headings": "<h1>Outer <span>inner <h1>nested</h1> tail</span></h1><p>x</p>"
+}
+
+
+def site_pages():
+    site = SyntheticSite(products=10)
+    paths = ["/", "/products", "/products?category=apparel", "/product/1", "/reviews"]
+    paths += [f"/product/{i}?variant={variant}" for i, variants in site.variants.items() for variant in variants]
+    return {path: (site.render_page(path), f"https://web-scraping.dev{path}") for path in paths}
+
+
+@pytest.mark.parametrize("html, url", [(html, BASE_URL) for html in EDGE_CASES.values()] + list(site_pages().values()),
+                         ids=list(EDGE_CASES) + list(site_pages()))
+def test_fast_extraction_matches_beautifulsoup(html, url):
+    def outcome(extractor):
+        try:
+            return extractor(html, url)
+        except Exception as e:  # extract_data fails on titles without a single string, so must the fast path
+            return type(e)
+
+    assert outcome(extract_data_fast) == outcome(extract_data)
+
+
+def test_external_links_with_leading_whitespace():
+    links = extract_data_fast(EDGE_CASES["links"], BASE_URL)["links"]
+    assert not [link for link in links if "evil.com" in link]
+
+
+def test_dedupe_links():
+    data = extract_data_fast(EDGE_CASES["links"], BASE_URL, dedupe_links=True)
+    assert data["links"] == list(dict.fromkeys(extract_data(EDGE_CASES["links"], BASE_URL)["links"]))
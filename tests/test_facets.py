@@ -0,0 +1,38 @@
+from facets import FacetIndex, parse_filters
+
+# More than 64 documents, so that the bitmaps span several words
+URLS = [f"https://example.com/product/{i}" for i in range(100)]
+FACETS = {
+    "brand": {"ChocoDelight": URLS[:10], "GameFuel": URLS[10:70], "CatCozies": URLS[70:]},
+    "origin": {"switzerland": URLS[:5] + URLS[65:75], "usa": URLS[5:65] + URLS[75:]}
+}
+
+
+def test_parse_filters():
+    assert parse_filters("brand=ChocoDelight AND origin=italy|france") == {
+        "brand": ["chocodelight"], "origin": ["italy", "france"]
+    }
+    assert parse_filters({"Brand": ["A", "B"], "origin": "USA"}) == {"brand": ["a", "b"], "origin": ["usa"]}
+    assert parse_filters(None) == {}
+
+
+def test_filter_urls():
+    index = FacetIndex.build(FACETS)
+
+    assert index.filter_urls("brand=chocodelight AND origin=switzerland") == set(URLS[:5])
+    assert index.filter_urls("brand=gamefuel AND origin=switzerland") == set(URLS[65:70])
+    assert index.filter_urls("brand=chocodelight|catcozies AND origin=usa") == set(URLS[5:10] + URLS[75:])
+    assert index.filter_urls("brand=unknown") == set()
+    assert index.filter_urls({}) == set(URLS)
+
+
+def test_facet_counts():
+    index = FacetIndex.build(FACETS)
+
+    assert index.facet_counts(URLS[60:80]) == {
+        "brand": {"gamefuel": 10, "catcozies": 10},
+        "origin": {"switzerland": 10, "usa": 10}
+    }
+    assert index.facet_counts(URLS[:3] + ["https://example.com/unknown"], facets=["brand"]) == {
+        "brand": {"chocodelight": 3}
+    }
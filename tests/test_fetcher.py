@@ -0,0 +1,98 @@
+import gzip
+import io
+import threading
+import tracemalloc
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from fetcher import Fetcher
+
+PAGE = ("<html><head><meta charset=\"utf-8\"></head><body><p>Café potion</p></body></html>" * 50).encode("utf-8")
+
+
+class FakeResponse:
+    """
+    Stand-in for `http.client.HTTPResponse`, serving a body in chunks.
+    """
+
+    def __init__(self, body, encoding):
+        self._body = io.BytesIO(body)
+        self._encoding = encoding
+
+    def read(self, size):
+        return self._body.read(size)
+
+    def getheader(self, name, default=None):
+        return self._encoding if name == "Content-Encoding" else default
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/redirect":
+                self.send_response(301)
+                self.send_header("Location", "/page")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = gzip.compress(PAGE) if compressed else PAGE
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            if compressed:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused(server):
+    fetcher = Fetcher()
+    try:
+        responses = [fetcher.fetch(f"{server}/page") for _ in range(3)]
+        redirected = fetcher.fetch(f"{server}/redirect")
+    finally:
+        fetcher.close()
+
+    assert [response.status for response in responses] == [200, 200, 200]
+    assert responses[0].text == PAGE.decode("utf-8")
+    assert redirected.url == f"{server}/page"
+    assert fetcher.connections_opened == 1
+    assert fetcher.bytes_received < len(PAGE)  # Pages are downloaded compressed
+
+
+@pytest.mark.parametrize("encoding, compress", [("gzip", gzip.compress), ("deflate", zlib.compress), ("", bytes)])
+def test_read_body(encoding, compress):
+    fetcher = Fetcher(max_body_size=len(PAGE))
+    assert fetcher._read_body(FakeResponse(compress(PAGE), encoding)) == PAGE
+
+    fetcher = Fetcher(max_body_size=len(PAGE) - 1)
+    assert fetcher._read_body(FakeResponse(compress(PAGE), encoding)) is None
+
+
+@pytest.mark.parametrize("encoding, compress", [("gzip", gzip.compress), ("deflate", zlib.compress)])
+def test_compression_bomb_is_not_decompressed(encoding, compress):
+    max_body_size = 1024 * 1024
+    bomb = compress(b"\0" * (100 * max_body_size))  # About 100 KB, expanding to 100 MB
+    fetcher = Fetcher(max_body_size=max_body_size)
+
+    tracemalloc.start()
+    body = fetcher._read_body(FakeResponse(bomb, encoding))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert body is None
+    assert peak < 5 * max_body_size
@@ -0,0 +1,65 @@
+import os
+import random
+from frontier import BloomFilter, Frontier, canonicalize_url
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("HTTPS://Web-Scraping.dev:443/products/?page=2&utm_source=x#reviews") \
+        == "https://web-scraping.dev/products?page=2"
+    assert canonicalize_url("http://web-scraping.dev:8080") == "http://web-scraping.dev:8080/"
+    assert canonicalize_url("https://web-scraping.dev/p?b=2&a=1") == canonicalize_url("https://web-scraping.dev/p?a=1&b=2")
+
+
+def test_urls_are_queued_once():
+    frontier = Frontier()
+    assert frontier.push("https://web-scraping.dev/product/1", 1) == "https://web-scraping.dev/product/1"
+    assert frontier.push("https://web-scraping.dev/product/1/#top", 0) is None
+    frontier.mark_seen("https://web-scraping.dev/product/2")
+    assert frontier.push("https://web-scraping.dev/product/2", 0) is None
+
+    assert len(frontier) == 1
+    assert "https://WEB-SCRAPING.dev/product/1" in frontier
+    assert frontier.pop() == (1, "https://web-scraping.dev/product/1")
+    assert frontier.pop() is None and frontier.empty()
+
+
+def test_spilled_runs_are_merged_in_order(tmp_path):
+    entries = [(random.Random(i).randint(0, 5), f"https://example.com/{i}") for i in range(1000)]
+    frontier = Frontier(max_in_memory=50, spill_folder=tmp_path)
+    popped = []
+    for i, (priority, url) in enumerate(entries):
+        frontier.push(url, priority)
+        if i % 7 == 0:
+            popped.append(frontier.pop())  # Interleaved pops, as during a crawl
+    assert len(os.listdir(tmp_path)) > 1
+    assert len(frontier) == len(entries) - len(popped)
+    assert sorted(frontier.items()) == sorted(set(entries) - set(popped))
+
+    remaining = []
+    while not frontier.empty():
+        remaining.append(frontier.pop())
+    assert remaining == sorted(remaining)
+    assert sorted(popped + remaining) == sorted(entries)
+    assert os.listdir(tmp_path) == []  # Exhausted runs are deleted
+
+
+def test_close_deletes_runs(tmp_path):
+    frontier = Frontier(max_in_memory=10, spill_folder=tmp_path)
+    for i in range(100):
+        frontier.push(f"https://example.com/{i}", i % 3)
+    frontier.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"https://example.com/{i}")
+
+    assert all(f"https://example.com/{i}" in bloom for i in range(10000))
+    false_positives = sum(f"https://other.com/{i}" in bloom for i in range(10000))
+    assert false_positives < 200
+
+    frontier = Frontier(bloom_capacity=1000)
+    assert frontier.push("https://example.com/", 0) is not None
+    assert frontier.push("https://example.com/", 0) is None
@@ -0,0 +1,34 @@
+from engine import load_fuzzy_index
+from fuzzy_index import FuzzyIndex, edit_distance, expand_query_with_corrections
+
+VOCABULARY = ["chocolate", "potion", "portion", "energy", "candy"]
+
+
+def test_lookup_finds_terms_within_two_edits():
+    index = FuzzyIndex.build(VOCABULARY)
+
+    assert index.lookup("potoin") == (("potion", 1), ("portion", 2))  # A transposition is one edit
+    assert index.lookup("chocolat") == (("chocolate", 1),)
+    assert index.lookup("xyz") == ()
+    assert edit_distance("energy", "enrgy", 2) == 1
+
+
+def test_expand_query_weights_corrections():
+    index = FuzzyIndex.build(VOCABULARY)
+
+    tokens, weights = expand_query_with_corrections(["chocolat", "energy"], index)
+    assert tokens == ["chocolat", "chocolate", "energy"]
+    assert weights == {"chocolate": 0.5}
+
+
+def test_load_persisted_index(tmp_path):
+    FuzzyIndex.build(VOCABULARY).save(tmp_path / "fuzzy_index.json")
+
+    index = load_fuzzy_index(tmp_path / "fuzzy_index.json", vocabulary=["unused"])
+    assert index.terms == sorted(VOCABULARY)
+    assert index.lookup("energi") == (("energy", 1),)
+
+
+def test_missing_index_is_built_from_vocabulary(tmp_path):
+    index = load_fuzzy_index(tmp_path / "missing.json", vocabulary=["potion"])
+    assert index.terms == ["potion"]
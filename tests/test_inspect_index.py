@@ -0,0 +1,62 @@
+import json
+import sys
+from inspect_index import deep_sizeof, format_report, index_kind, inspect_folder, inspect_index_file
+
+A = "https://example.com/product/1"
+B = "https://example.com/product/1?variant=blue"
+C = "https://example.com/product/2"
+
+POSITIONAL_INDEX = {
+    "box": {A: [0], B: [0], C: [0]},
+    "candy": {A: [1, 4], B: [1]},
+    "chocolate": {C: [2]},
+    "500": {C: [3]}
+}
+
+
+def test_index_kind():
+    assert index_kind(POSITIONAL_INDEX) == "positional"
+    assert index_kind({"candy": [A, B]}) == "postings"
+    assert index_kind({A: {"mean_mark": 4.5}}) == "documents"
+    assert index_kind({"candy": ["sweet"]}) == "other"
+    assert index_kind([]) == "other"
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    text = "x" * 1000
+    shared = [text, text]
+
+    assert deep_sizeof(shared) == sys.getsizeof(shared) + sys.getsizeof(text)
+    assert deep_sizeof({"key": shared}) > deep_sizeof(shared)
+
+
+def test_inspect_positional_index(tmp_path):
+    path = tmp_path / "index_title_with_positions.json"
+    path.write_text(json.dumps(POSITIONAL_INDEX), encoding="utf-8")
+
+    report = inspect_index_file(str(path), top=2)
+
+    assert report["kind"] == "positional"
+    assert report["vocabulary"] == 4
+    assert report["postings"] == 7
+    assert report["documents"] == 3
+    assert report["positions"] == 8
+    assert report["heaviest_terms"] == [["box", 3], ["candy", 2]]
+    assert report["variant_ratio"] == 1 / 3
+    recommendations = report["recommendations"]
+    assert recommendations["stopword_candidates"] == ["box", "candy"]
+    assert recommendations["rare_terms"] == 2
+    assert recommendations["numeric_terms"] == 1
+
+
+def test_inspect_folder(tmp_path):
+    (tmp_path / "title_index.json").write_text(json.dumps({"candy": [A, C]}), encoding="utf-8")
+    (tmp_path / "reviews_index.json").write_text(json.dumps({A: {"mean_mark": 4}}), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not an index", encoding="utf-8")
+
+    report = inspect_folder(str(tmp_path))
+
+    assert [file["file"] for file in report["files"]] == ["reviews_index.json", "title_index.json"]
+    assert report["disk_bytes"] == sum(file["disk_bytes"] for file in report["files"])
+    assert "title_index.json (postings)" in format_report(report)
+    assert inspect_folder(str(tmp_path / "missing"))["files"] == []
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import create_index
+from doc_store import DocumentStore, PostingsFile, DOC_STORE_FILE, DOC_STORE_OFFSETS_FILE, POSTINGS_FILE, POSTINGS_OFFSETS_FILE
+from engine import format_results, tokenize_text
+from near_duplicates import SimHashIndex, deduplicate, hamming_distance, page_text, simhash
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRODUCT = {"url": "https://example.com/product/1", "title": "Dark Red Energy Potion",
+           "description": "Bring out the best in your gaming performance with this energy potion.",
+           "product_features": {"flavor": "cherry"}}
+VARIANT = dict(PRODUCT, url="https://example.com/product/1?variant=six-pack", title="Dark Red Energy Potion (6 pack)")
+OTHER = {"url": "https://example.com/product/2", "title": "Box of Chocolate Candy",
+         "description": "Indulge your sweet tooth with our box of chocolate candy, handmade with cocoa."}
+
+
+def test_similar_pages_have_close_fingerprints():
+    assert page_text(PRODUCT).startswith("dark red energy potion bring out")
+    close = hamming_distance(simhash(page_text(PRODUCT)), simhash(page_text(VARIANT)))
+    far = hamming_distance(simhash(page_text(PRODUCT)), simhash(page_text(OTHER)))
+    assert close <= SimHashIndex().max_distance < far
+
+
+def test_check_links_duplicates_to_the_first_page():
+    index = SimHashIndex()
+
+    assert index.check(PRODUCT) is None
+    assert index.check(OTHER) is None
+    assert index.check(VARIANT) == PRODUCT["url"]
+    assert index.check(PRODUCT) is None  # A canonical page seen again stays canonical
+    assert index.duplicates_of(PRODUCT["url"]) == [VARIANT["url"]]
+
+
+def test_deduplicate_keeps_canonical_pages_in_order():
+    unique_docs, index = deduplicate([PRODUCT, VARIANT, OTHER])
+
+    assert unique_docs == [PRODUCT, OTHER]
+    assert index.canonical == {VARIANT["url"]: PRODUCT["url"]}
+
+
+def test_pipeline_keeps_documents_and_reviews_of_duplicates(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(REPO_FOLDER, "products.jsonl"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(create_index, "DEDUPLICATE_PAGES", True)
+    monkeypatch.setattr(create_index, "save_data_to_file", lambda data: None)
+
+    create_index.run_main_pipeline()
+
+    with open(tmp_path / "index" / "duplicates_index.json", "r", encoding="utf-8") as file:
+        canonical = json.load(file)
+    with open(tmp_path / "index" / "index_title_with_positions.json", "r", encoding="utf-8") as file:
+        indexed_urls = {url for postings in json.load(file).values() for url in postings}
+    with open(tmp_path / "index" / "reviews_index.json", "r", encoding="utf-8") as file:
+        reviewed_urls = set(json.load(file))
+    doc_store = DocumentStore.open(str(tmp_path / "index" / DOC_STORE_FILE),
+                                   str(tmp_path / "index" / DOC_STORE_OFFSETS_FILE))
+
+    variant = "https://web-scraping.dev/product/10?variant=blue-5"
+    assert canonical[variant] in indexed_urls
+    assert variant not in indexed_urls
+    assert variant in reviewed_urls
+    assert doc_store.get(variant)["title"] == "Kids' Light-Up Sneakers"
+    assert len(doc_store) == len(indexed_urls) + len(canonical)
+
+    # The variant has no postings in the description index, its snippet is highlighted from its text
+    postings_file = PostingsFile.open(str(tmp_path / "index" / POSTINGS_FILE), str(tmp_path / "index" / POSTINGS_OFFSETS_FILE))
+    query_tokens = tokenize_text("Dragon Energy Potion")
+    dragon_variant = "https://web-scraping.dev/product/18?variant=six-pack"
+    assert dragon_variant in canonical
+    results = format_results([(dragon_variant, 1.0), (canonical[dragon_variant], 0.5)], doc_store, query_tokens,
+                             postings_file.load(query_tokens))
+    assert all("<b>Potion',</b>" in result["snippet"] for result in results)
+    assert results[0]["snippet"] == results[1]["snippet"]
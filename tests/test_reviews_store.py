@@ -0,0 +1,46 @@
+import numpy as np
+from reviews_store import ReviewsStore
+
+
+def test_add_reviews_skips_missing_ratings():
+    store = ReviewsStore()
+    store.add_reviews("https://example.com/a", [{"rating": 4}, {"rating": None}, {"text": "no rating"}, {"rating": 5}])
+
+    assert store.count.tolist() == [2]
+    assert store.mean.tolist() == [4.5]
+    assert store.last.tolist() == [5]
+    assert store.histogram.tolist() == [[0, 0, 0, 1, 1]]
+
+
+def test_add_reviews_is_incremental():
+    store = ReviewsStore(capacity=1)
+    store.add_reviews("https://example.com/a", [{"rating": 2}])
+    store.add_reviews("https://example.com/b", [{"rating": 5}])
+    store.add_reviews("https://example.com/a", [{"rating": 4}])
+
+    assert store.urls == ["https://example.com/a", "https://example.com/b"]
+    assert store.count.tolist() == [2, 1]
+    assert store.mean.tolist() == [3.0, 5.0]
+
+
+def test_save_and_load(tmp_path):
+    store = ReviewsStore()
+    store.add_reviews("https://example.com/a", [{"rating": 3}, {"rating": 5}])
+    store.add_reviews("https://example.com/b", [{"rating": 1}])
+    store.save(tmp_path / "reviews_store.npz")
+
+    loaded = ReviewsStore.load(tmp_path / "reviews_store.npz")
+    assert loaded.urls == store.urls
+    assert loaded.to_index() == store.to_index()
+    assert np.array_equal(loaded.histogram, store.histogram)
+
+
+def test_rating_boost_and_min_rating():
+    store = ReviewsStore.from_index({
+        "https://example.com/a": {"total_reviews": 2, "mean_mark": 5.0, "last_rating": 5},
+        "https://example.com/b": {"total_reviews": 1, "average_rating": 3.5, "last_rating": 3}
+    })
+
+    assert store.rating_boost().tolist() == [6.0, 3.5 / 5 + 1]
+    assert store.filter_min_rating(["https://example.com/b", "https://example.com/a", "https://example.com/c"], 4) \
+        == ["https://example.com/a"]
@@ -0,0 +1,68 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from fetcher import Fetcher
+from robots_cache import RobotsCache
+
+ROBOTS_TXT = b"User-agent: *\nDisallow: /cart\nCrawl-delay: 2\n"
+
+
+@pytest.fixture
+def server():
+    """
+    Local server answering robots.txt with `server.status`.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = ROBOTS_TXT if httpd.status == 200 else b"error"
+            self.send_response(httpd.status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.status = 200
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(params=["fetcher", "urllib"])
+def cache(request):
+    fetcher = Fetcher() if request.param == "fetcher" else None
+    yield RobotsCache(negative_ttl=0.2, fetcher=fetcher)
+    if fetcher is not None:
+        fetcher.close()
+
+
+def test_rules_are_downloaded_once(server, cache):
+    assert cache.can_fetch(f"{server.url}/products")
+    assert not cache.can_fetch(f"{server.url}/cart")
+    assert cache.crawl_delay(f"{server.url}/products") == 2.0
+    assert cache.downloads == 1
+
+
+@pytest.mark.parametrize("status, allowed", [(404, True), (403, False)])
+def test_client_errors(server, cache, status, allowed):
+    server.status = status
+    assert cache.can_fetch(f"{server.url}/products") is allowed
+    assert cache.is_cached(f"{server.url}/products")
+
+
+def test_server_error_only_blocks_for_negative_ttl(server, cache):
+    server.status = 503
+    assert not cache.can_fetch(f"{server.url}/products")
+    assert cache.get_parser(f"{server.url}/products") is None
+    assert cache.downloads == 1
+
+    server.status = 200
+    time.sleep(0.3)
+    assert not cache.is_cached(f"{server.url}/products")
+    assert cache.can_fetch(f"{server.url}/products")
+    assert cache.downloads == 2
@@ -0,0 +1,65 @@
+import os
+import pytest
+import sharding
+from engine import process_query, load_json_file
+from sharding import (INDEX_PATHS, LocalTransport, ProcessTransport, ShardedSearch, build_shards, load_manifest,
+                      shard_of, split_index)
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = {name: os.path.join(REPO_FOLDER, path) for name, path in INDEX_PATHS.items()}
+QUERIES = ["chocolate", "italian leather", "box of chocolate candy", "energy potion", "kids sneakers"]
+
+
+@pytest.fixture(scope="module")
+def shards_folder(tmp_path_factory):
+    folder = str(tmp_path_factory.mktemp("shards"))
+    build_shards(3, paths=PATHS, folder=folder)
+    return folder
+
+
+@pytest.fixture(scope="module")
+def indexes():
+    return {name: load_json_file(path) for name, path in PATHS.items()}
+
+
+def unsharded_scores(indexes, query, match_all=True):
+    results = process_query(query, indexes["origin"], indexes["synonyms"], indexes["title"], indexes["reviews"],
+                            match_all=match_all, unique_scores=False)
+    return dict(results)
+
+
+def test_split_index_partitions_documents(indexes):
+    shards = split_index(indexes["title"], 3)
+
+    for token, postings in indexes["title"].items():
+        sharded = [url for shard in shards for url in shard.get(token, [])]
+        assert sorted(sharded) == sorted(postings)
+    for shard_id, shard in enumerate(shards):
+        assert all(shard_of(url, 3) == shard_id for postings in shard.values() for url in postings)
+
+
+@pytest.mark.parametrize("match_all", [True, False])
+def test_sharded_scores_equal_unsharded_scores(shards_folder, indexes, match_all, monkeypatch):
+    monkeypatch.setattr(sharding, "ensure_unique_scores", lambda results: results)  # Ties are broken randomly
+    assert load_manifest(shards_folder)["num_shards"] == 3
+    search = ShardedSearch(shards_folder, LocalTransport(shards_folder))
+
+    for query in QUERIES:
+        expected = unsharded_scores(indexes, query, match_all)
+        results = search.search(query, k=10, match_all=match_all)
+        assert len(results) == min(10, len(expected))
+        assert [score for _, score in results] == pytest.approx(sorted(expected.values(), reverse=True)[:10])
+        assert all(score == pytest.approx(expected[url]) for url, score in results)
+    search.close()
+
+
+def test_process_transport_returns_the_same_results(shards_folder, monkeypatch):
+    monkeypatch.setattr(sharding, "ensure_unique_scores", lambda results: results)
+    local = ShardedSearch(shards_folder, LocalTransport(shards_folder))
+    parallel = ShardedSearch(shards_folder, ProcessTransport(shards_folder))
+    try:
+        for query in QUERIES:
+            assert parallel.search(query, k=5) == local.search(query, k=5)
+    finally:
+        parallel.close()
+        local.close()
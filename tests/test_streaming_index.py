@@ -0,0 +1,75 @@
+import asyncio
+import json
+import os
+import pytest
+from benchmark_crawler import SyntheticSite
+from engine import process_query
+from streaming_index import (SegmentWriter, SEGMENTS_MANIFEST, load_segments, streaming_crawl_and_index,
+                             term_frequency_index)
+
+
+@pytest.fixture
+def site():
+    site = SyntheticSite(products=20)
+    site.start()
+    yield site
+    site.stop()
+
+
+def run(site, folder, **kwargs):
+    coroutine = streaming_crawl_and_index(f"{site.url}/products", max_pages=15, workers=4, crawl_delay=0,
+                                          output_file=None, segments_folder=str(folder), **kwargs)
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=30))
+
+
+def test_pages_are_indexed_in_segments(site, tmp_path):
+    segments = run(site, tmp_path, segment_size=4, deduplicate_pages=False)
+
+    with open(tmp_path / SEGMENTS_MANIFEST, "r", encoding="utf-8") as file:
+        assert json.load(file)["segments"] == segments
+    assert len(segments) == 4  # 15 pages, 4 per segment
+    index = load_segments(str(tmp_path))
+    urls = {url for postings in index["title"].values() for url in postings}
+    assert len(urls) == 15
+
+
+def test_loaded_segments_can_be_searched(site, tmp_path):
+    run(site, tmp_path, segment_size=4, deduplicate_pages=False)
+    segments = load_segments(str(tmp_path))
+
+    results = process_query("Product 3", segments["terms"], {}, segments["title"], segments["reviews"])
+
+    urls = [url for url, _ in results]
+    assert urls[0] == f"{site.url}/product/3"
+    assert set(urls) <= set(segments["terms"]["product"])
+
+
+def test_term_frequency_index():
+    title = {"candy": {"a": [0]}, "box": {"a": [1], "b": [0]}}
+    description = {"candy": {"a": [0, 3], "b": [2]}}
+
+    index = term_frequency_index(title, description)
+
+    assert index["candy"] == {"a": {"candy": 3, "box": 1}, "b": {"box": 1, "candy": 1}}
+    assert index["box"]["a"] is index["candy"]["a"]
+
+
+def test_indexer_failure_is_raised_instead_of_hanging(site, tmp_path, monkeypatch):
+    def write_segment(self, docs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(SegmentWriter, "write_segment", write_segment)
+    with pytest.raises(OSError, match="disk full"):
+        run(site, tmp_path, segment_size=1, queue_size=1, deduplicate_pages=False)
+
+
+def test_new_writer_deletes_previous_segments(tmp_path):
+    writer = SegmentWriter(str(tmp_path), segment_size=1)
+    writer.write_segment([{"url": "https://example.com/a", "title": "Candy", "description": "Sweet"}])
+    writer.write_segment([{"url": "https://example.com/b", "title": "Potion", "description": "Magic"}])
+    (tmp_path / "notes").mkdir()
+
+    SegmentWriter(str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["notes", SEGMENTS_MANIFEST]
+    assert load_segments(str(tmp_path))["title"] == {}
@@ -0,0 +1,50 @@
+from term_dictionary import TermDictionary, BLOCK_SIZE
+
+# Enough terms to span several front-coded blocks
+TERMS = sorted({f"term{i:03d}" for i in range(3 * BLOCK_SIZE)} | {"potion", "pot", "pottery", "portable", "été"})
+INDEXES = {
+    "title": {"potion": ["a", "b", "c"], "pot": ["a"], "pottery": ["b"]},
+    "description": {term: ["a"] for term in TERMS}
+}
+
+
+def build():
+    return TermDictionary.build(INDEXES)
+
+
+def test_lookup_and_iteration_follow_sorted_order():
+    dictionary = build()
+
+    assert len(dictionary) == len(TERMS)
+    assert list(dictionary) == TERMS
+    assert [dictionary.lookup(term) for term in TERMS] == list(range(len(TERMS)))
+    assert dictionary.lookup("poti") == -1
+    assert "été" in dictionary
+
+
+def test_prefix_range():
+    dictionary = build()
+
+    start, end = dictionary.prefix_range("pot")
+    assert [dictionary.term(term_id) for term_id in range(start, end)] == ["pot", "potion", "pottery"]
+    assert list(dictionary.prefix_terms("term01")) == [f"term{i:03d}" for i in range(10, 20)]
+    start, end = dictionary.prefix_range("zzz")
+    assert start == end
+
+
+def test_suggest_ranks_by_document_frequency():
+    dictionary = build()
+
+    assert dictionary.suggest("Pot", field="title") == [("potion", 3), ("pot", 1), ("pottery", 1)]
+    assert dictionary.suggest("pot", k=1) == [("potion", 4)]
+    assert dictionary.document_frequency("portable", field="title") == 0
+
+
+def test_save_and_load(tmp_path):
+    dictionary = build()
+    dictionary.save(tmp_path / "term_dictionary.npz")
+
+    loaded = TermDictionary.load(tmp_path / "term_dictionary.npz")
+    assert list(loaded) == TERMS
+    assert loaded.fields == ["title", "description"]
+    assert loaded.suggest("pot") == dictionary.suggest("pot")